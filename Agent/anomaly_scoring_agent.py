@@ -1,20 +1,15 @@
 # ml/anomaly_scoring_agent.py
 import os
-from typing import List
-from langchain_neo4j import Neo4jGraph
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
+import re
+from functools import lru_cache
+from typing import Dict, List
 
 from .prompts_v2 import anomaly_scoring_prompt
-import numpy as np
 
 # Initialize LLM and Neo4j Graph
 
-def extract_player_features(player_id: str, graph) -> dict:
-    """Extracts features from the knowledge graph for a given player."""
-    query = f"""
-    MATCH (p:Player {{Actor: toInteger('{player_id}')}})
-    RETURN
+# Columns returned for a player, shared by the single and batched lookups
+PLAYER_FEATURE_RETURN = """
         p.Actor AS player_id,
         p.A_Acc AS a_acc,
         p.Login_day_count AS login_day_count,
@@ -25,6 +20,13 @@ def extract_player_features(player_id: str, graph) -> dict:
         p.Login_count AS login_count,
         p.ip_count AS ip_count,
         p.Max_level AS max_level
+"""
+
+def extract_player_features(player_id: str, graph) -> dict:
+    """Extracts features from the knowledge graph for a given player."""
+    query = f"""
+    MATCH (p:Player {{Actor: toInteger('{player_id}')}})
+    RETURN{PLAYER_FEATURE_RETURN}
     """
     results = graph.query(query)
     if results:
@@ -32,28 +34,100 @@ def extract_player_features(player_id: str, graph) -> dict:
     else:
         return {}
 
-prompt_template = anomaly_scoring_prompt()
-
-if prompt_template:
-    prompt = ChatPromptTemplate.from_template(prompt_template)
-else:
-    prompt = None  # Handle the case where the prompt couldn't be loaded
-
-def assess_bot_likelihood(player_data: dict, llm, graph ,similar_player_ids: List[str] = []) -> tuple[int, str, str]:
-    """Assesses the likelihood of a player being a bot using LLM, considering player statistics and insights from similar players."""
+def extract_player_features_batch(player_ids: List[str], graph) -> Dict[str, dict]:
+    """Extracts features for many players in one round trip, keyed by the requested id."""
+    query = f"""
+    UNWIND $player_ids AS requested_id
+    MATCH (p:Player {{Actor: toInteger(requested_id)}})
+    RETURN requested_id,{PLAYER_FEATURE_RETURN}
+    """
+    results = graph.query(query, {"player_ids": [str(pid) for pid in player_ids]})
+    return {row.pop("requested_id"): row for row in results}
+
+# A player's precomputed SIMILAR_TO neighbours with their features and latest
+# classification, gathered in the same round trip as the player's own features
+NEIGHBOURHOOD_SUBQUERY = """
+    CALL {
+        WITH p
+        OPTIONAL MATCH (p)-[s:SIMILAR_TO]->(n:Player)
+        OPTIONAL MATCH (n)-[r:HAS_CLASSIFICATION]->(c:Classification)
+        WITH s, n, r, c ORDER BY r.timestamp DESC
+        WITH s, n, head(collect(c.type)) AS classification
+        ORDER BY s.rank
+        RETURN collect(CASE WHEN n IS NULL THEN NULL ELSE {
+            player_id: toString(toInteger(n.Actor)),
+            similarity: s.score,
+            classification: classification,
+            login_day_count: n.Login_day_count,
+            logout_day_count: n.Logout_day_count,
+            playtime: n.Playtime,
+            playtime_per_day: n.playtime_per_day,
+            avg_money: n.avg_money,
+            login_count: n.Login_count,
+            ip_count: n.ip_count,
+            max_level: n.Max_level
+        } END) AS neighbours
+    }
+"""
+
+def _neighbour_rows(neighbours: List[dict]) -> List[dict]:
+    """Keeps only the label of each neighbour's stored classifier output."""
+    rows = []
+    for neighbour in neighbours or []:
+        match = re.search(r"Classification:\s*\[?(\w+)", neighbour.get("classification") or "")
+        rows.append({**neighbour, "classification": match.group(1).capitalize() if match else None})
+    return rows
+
+def extract_player_neighbourhood(player_id: str, graph) -> tuple[dict, List[dict]]:
+    """Fetches a player's features and its SIMILAR_TO neighbours' features and classifications in one query."""
+    query = f"""
+    MATCH (p:Player {{Actor: toInteger($player_id)}})
+    {NEIGHBOURHOOD_SUBQUERY}
+    RETURN neighbours,{PLAYER_FEATURE_RETURN}
+    """
+    results = graph.query(query, {"player_id": str(player_id)})
+    if not results:
+        return {}, []
+    row = results[0]
+    return row, _neighbour_rows(row.pop("neighbours"))
+
+def extract_player_neighbourhood_batch(player_ids: List[str], graph) -> Dict[str, tuple[dict, List[dict]]]:
+    """Batched ``extract_player_neighbourhood``, keyed by the requested id."""
+    query = f"""
+    UNWIND $player_ids AS requested_id
+    MATCH (p:Player {{Actor: toInteger(requested_id)}})
+    {NEIGHBOURHOOD_SUBQUERY}
+    RETURN requested_id, neighbours,{PLAYER_FEATURE_RETURN}
+    """
+    results = graph.query(query, {"player_ids": [str(pid) for pid in player_ids]})
+    return {row.pop("requested_id"): (row, _neighbour_rows(row.pop("neighbours"))) for row in results}
+
+@lru_cache(maxsize=None)
+def get_prompt(score_only: bool = False):
+    """Builds the chat prompt on first use rather than at import time; ``score_only`` asks for the score alone."""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    prompt_template = anomaly_scoring_prompt(score_only)
+    if prompt_template:
+        return ChatPromptTemplate.from_template(prompt_template)
+    return None  # Handle the case where the prompt couldn't be loaded
+
+def format_anomaly_prompt(player_data: dict, similar_player_ids: List[str] = [], similar_player_data: List[dict] = [],
+                          score_only: bool = False):
+    """Formats the anomaly prompt messages, or returns None when the prompt couldn't be loaded."""
+    prompt = get_prompt(score_only)
     if prompt is None:
-        return None, "Prompt could not be loaded", None
+        return None
 
     # Get insights from similar players
     similar_player_insights = ""
     if similar_player_ids:
-        similar_player_data = [extract_player_features(pid, graph) for pid in similar_player_ids]
         # Combine insights (e.g., summarize their behaviors or anomaly scores)
         similar_player_insights = f"Similar players: {', '.join(similar_player_ids)}. " \
                                   f"Insights: {similar_player_data}"  # Simple concatenation for now
 
     # Format the prompt
-    formatted_prompt = prompt.format_messages(
+    return prompt.format_messages(
         actor=player_data['player_id'],
         a_acc=player_data['a_acc'],
         login_day_count=player_data['login_day_count'],
@@ -67,11 +141,8 @@ def assess_bot_likelihood(player_data: dict, llm, graph ,similar_player_ids: Lis
         similar_player_insights=similar_player_insights  # Pass insights
     )
 
-    # Call the LLM directly
-    response = llm.invoke(formatted_prompt)
-    full_analysis = response.content
-
-    # Extract Anomaly Score and Reasoning
+def parse_anomaly_response(full_analysis: str) -> tuple[int, str]:
+    """Extracts the Anomaly Score line and the reasoning that follows it."""
     try:
         score_line = next(line for line in full_analysis.split('\n') if "Anomaly Score" in line)
         anomaly_score = int(score_line.split(":")[1].strip())
@@ -80,7 +151,29 @@ def assess_bot_likelihood(player_data: dict, llm, graph ,similar_player_ids: Lis
     except Exception as e:
             anomaly_score = None
             reasoning = f"Could not reliably parse LLM response: {str(e)}"
+    return anomaly_score, reasoning
+
+def assess_bot_likelihood(player_data: dict, llm, graph ,similar_player_ids: List[str] = [],
+                          similar_player_data: List[dict] = None, score_only: bool = False) -> tuple[int, str, str]:
+    """
+    Assesses the likelihood of a player being a bot using LLM, considering player statistics and insights from similar players.
 
+    ``similar_player_data`` skips the per-neighbour feature queries when the neighbours
+    were already fetched, e.g. from precomputed SIMILAR_TO edges. ``score_only`` uses the
+    prompt variant that asks for the score without reasoning.
+    """
+    if similar_player_data is None:
+        similar_player_data = [extract_player_features(pid, graph) for pid in similar_player_ids]
+    formatted_prompt = format_anomaly_prompt(player_data, similar_player_ids, similar_player_data, score_only)
+    if formatted_prompt is None:
+        return None, "Prompt could not be loaded", None
+
+    # Call the LLM directly
+    response = llm.invoke(formatted_prompt)
+    full_analysis = response.content
+
+    # Extract Anomaly Score and Reasoning
+    anomaly_score, reasoning = parse_anomaly_response(full_analysis)
     return anomaly_score, reasoning, full_analysis
 
 def generate_bot_report(player_ids: list[str], faiss_index) -> list[dict]:
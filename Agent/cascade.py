@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from .score_fusion import ScoreFusion
+
+# Cheapest and most decisive agent first: the social-diversity prompt carries a single
+# feature, the anomaly prompt a handful plus similar-player context, and the
+# player-action prompt all 28 action features
+DEFAULT_AGENT_ORDER = ("social_diversity", "anomaly", "player_action")
+
+# State key holding each agent's score
+AGENT_SCORE_FIELDS = {
+    "anomaly": "anomaly_score",
+    "social_diversity": "social_diversity_score",
+    "player_action": "player_action_score",
+}
+
+
+class AgentCascade:
+    """
+    Runs the scoring agents one at a time and stops once the evidence is decisive.
+
+    After each agent, the scores gathered so far are fused into a bot probability
+    (see ``ScoreFusion.bot_probability``). The cascade stops when that probability
+    reaches ``bot_exit`` or drops to ``human_exit``, once enough agents have run for
+    that verdict; the remaining agents are skipped.
+
+    Args:
+        order: Agent names in the order they run, from ``AGENT_SCORE_FIELDS``
+        bot_exit: Fused bot probability at or above which the player is settled as a bot
+        human_exit: Fused bot probability at or below which the player is settled as human
+        min_agents_bot: Agents that must have run before a bot exit is taken, so a
+            single high score always gets a second agent that can contradict it
+        min_agents_human: Agents that must have run before a human exit is taken; a
+            missed bot costs more than an extra call, so one low score is not enough
+        fusion: Fusion used to combine partial scores; rule-based by default
+    """
+
+    def __init__(self, order: Sequence[str] = DEFAULT_AGENT_ORDER, bot_exit: float = 0.85,
+                 human_exit: float = 0.2, min_agents_bot: int = 2, min_agents_human: int = 2,
+                 fusion: ScoreFusion = None):
+        unknown = [name for name in order if name not in AGENT_SCORE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown agents in cascade order: {unknown}")
+        self.order = tuple(order)
+        self.bot_exit = bot_exit
+        self.human_exit = human_exit
+        self.min_agents_bot = min_agents_bot
+        self.min_agents_human = min_agents_human
+        self.fusion = fusion or ScoreFusion()
+
+    def decision(self, scores: Dict[str, Any]) -> Optional[str]:
+        """
+        Returns "Bot" or "Human" when the scores so far are decisive, otherwise None.
+        Scores that contradict each other are never decisive.
+        """
+        fused = self.fusion.fuse(scores)
+        probability = fused["bot_probability"]
+        if probability is None or fused["conflict"]:
+            return None
+        ran = sum(scores.get(AGENT_SCORE_FIELDS[name]) is not None for name in self.order)
+        if probability >= self.bot_exit and ran >= self.min_agents_bot:
+            return "Bot"
+        if probability <= self.human_exit and ran >= self.min_agents_human:
+            return "Human"
+        return None
+
+    def remaining(self, name: str) -> List[str]:
+        """Agents that come after ``name`` in the cascade."""
+        return list(self.order[self.order.index(name) + 1:])
@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Queries per FAISS assignment call
+ASSIGN_CHUNK_SIZE = 65536
+
+
+class PlayerClusterer:
+    """
+    Groups near-duplicate players, such as the accounts of a bot farm, so each tight
+    group is scored once.
+
+    Vectors (standardized numeric features from ``NumericFeatureIndex``, or embeddings)
+    are partitioned with FAISS k-means. Within each k-means cell, tight groups of
+    near-duplicates are formed around members near the centroid, whose representative
+    (the medoid-like member) is the only one sent to the agents. Everyone else is an
+    outlier and gets scored individually.
+
+    Args:
+        n_clusters: k-means cells; defaults to one per ``players_per_cell`` players, at most ``max_cells``
+        radius: Mean squared difference per dimension from the representative below which
+            a member counts as a near-duplicate (0.05 is about 0.2 standard deviations
+            per standardized feature)
+        min_cluster_size: Tight clusters smaller than this are scored individually
+        players_per_cell: Target cell size when ``n_clusters`` is not given
+        max_cells: Cap on the default number of cells, bounding k-means cost on large populations
+        niter: k-means iterations
+        seed: k-means seed, so repeated sweeps produce the same clusters
+    """
+
+    def __init__(self, n_clusters: int = None, radius: float = 0.05, min_cluster_size: int = 3,
+                 players_per_cell: int = 100, max_cells: int = 4096, niter: int = 20, seed: int = 1234):
+        self.n_clusters = n_clusters
+        self.max_cells = max_cells
+        self.radius = radius
+        self.min_cluster_size = min_cluster_size
+        self.players_per_cell = players_per_cell
+        self.niter = niter
+        self.seed = seed
+
+    def _assign(self, vectors: np.ndarray, threshold: float) -> tuple:
+        """
+        Runs k-means and returns each row's cell, the centroids, and whether the row is
+        dense: it has at least ``min_cluster_size - 1`` near-duplicates in its cell, the
+        precondition for representing a tight group. The density check is one kNN search
+        through an IVF index over the k-means cells, so it only compares within a cell.
+        """
+        import faiss
+
+        n, dimension = vectors.shape
+        k = self.n_clusters or min(max(1, n // self.players_per_cell), self.max_cells)
+        k = min(k, n)
+        kmeans = faiss.Kmeans(dimension, k, niter=self.niter, seed=self.seed, verbose=False)
+        kmeans.train(vectors)
+
+        quantizer = faiss.IndexFlatL2(dimension)
+        quantizer.add(kmeans.centroids)
+        ivf = faiss.IndexIVFFlat(quantizer, dimension, k)
+        ivf.is_trained = True
+        ivf.nprobe = 1
+        labels = np.empty(n, dtype="int64")
+        for start in range(0, n, ASSIGN_CHUNK_SIZE):
+            _, ids = quantizer.search(vectors[start:start + ASSIGN_CHUNK_SIZE], 1)
+            labels[start:start + ASSIGN_CHUNK_SIZE] = ids[:, 0]
+            ivf.add(vectors[start:start + ASSIGN_CHUNK_SIZE])
+
+        dense = np.empty(n, dtype=bool)
+        for start in range(0, n, ASSIGN_CHUNK_SIZE):
+            # The row itself comes back at distance 0, so the k-th hit is its (k-1)-th neighbour
+            distances, _ = ivf.search(vectors[start:start + ASSIGN_CHUNK_SIZE], self.min_cluster_size)
+            dense[start:start + ASSIGN_CHUNK_SIZE] = distances[:, -1] <= threshold
+        return labels, kmeans.centroids, dense
+
+    def similarity(self, squared_distance: np.ndarray, dimension: int) -> np.ndarray:
+        """Maps distance to the representative onto [0.5, 1]: 1 for an exact duplicate, 0.5 at the radius."""
+        return 1.0 - 0.5 * np.minimum(squared_distance / (self.radius * dimension), 1.0)
+
+    def _cell_groups(self, cell: np.ndarray, dense: np.ndarray, centre: np.ndarray, threshold: float) -> tuple:
+        """
+        Peels tight groups off one k-means cell: the remaining dense member nearest the
+        centroid is tried as a representative, and its near-duplicates form a group when
+        there are enough of them. Returns (groups, outlier rows), each group as
+        (representative row, member rows).
+        """
+        groups = []
+        remaining = np.arange(len(cell))
+        candidates = dense.copy()
+        while candidates[remaining].any():
+            pool = remaining[candidates[remaining]]
+            candidate = pool[np.argmin(((cell[pool] - centre) ** 2).sum(axis=1))]
+            tight = ((cell[remaining] - cell[candidate]) ** 2).sum(axis=1) <= threshold
+            if tight.sum() >= self.min_cluster_size:
+                groups.append((candidate, remaining[tight]))
+                remaining = remaining[~tight]
+            else:
+                candidates[candidate] = False
+        return groups, remaining.tolist()
+
+    def plan(self, player_ids: Sequence[str], vectors: np.ndarray) -> Dict[str, Any]:
+        """
+        Splits players into tight clusters and outliers.
+
+        k-means tends to cut a large farm across several cells, so groups whose
+        representatives are themselves near-duplicates are merged afterwards, largest
+        first; absorbed members get their similarity to the surviving representative.
+
+        Args:
+            player_ids: Player id per row of ``vectors``
+            vectors: 2D float array
+
+        Returns:
+            ``clusters``: list of dicts with ``cluster_id``, ``representative``, ``members``
+            (representative first) and each member's ``similarity`` to the representative;
+            ``outliers``: players to score individually.
+        """
+        import faiss
+
+        player_ids = [str(pid) for pid in player_ids]
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        if len(player_ids) < self.min_cluster_size:
+            return {"clusters": [], "outliers": player_ids}
+
+        dimension = vectors.shape[1]
+        threshold = self.radius * dimension
+        labels, centroids, dense = self._assign(vectors, threshold)
+        order = np.argsort(labels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+
+        groups: List[tuple] = []
+        outliers: List[str] = []
+        for rows in np.split(order, boundaries):
+            cell_groups, cell_outliers = self._cell_groups(vectors[rows], dense[rows], centroids[labels[rows[0]]],
+                                                           threshold)
+            groups.extend((rows[rep], rows[members]) for rep, members in cell_groups)
+            outliers.extend(player_ids[rows[i]] for i in cell_outliers)
+
+        # Merge groups split across cells: representatives within the radius of each other
+        groups.sort(key=lambda group: len(group[1]), reverse=True)
+        clusters: List[Dict[str, Any]] = []
+        if groups:
+            representatives = np.ascontiguousarray(vectors[[rep for rep, _ in groups]])
+            index = faiss.IndexFlatL2(dimension)
+            index.add(representatives)
+            limits, _, neighbours = index.range_search(representatives, threshold)
+            absorbed = np.zeros(len(groups), dtype=bool)
+            for g, (rep, members) in enumerate(groups):
+                if absorbed[g]:
+                    continue
+                merged = [g] + [n for n in neighbours[limits[g]:limits[g + 1]] if n > g and not absorbed[n]]
+                absorbed[merged] = True
+                rows = np.concatenate([groups[m][1] for m in merged])
+                distance = ((vectors[rows] - vectors[rep]) ** 2).sum(axis=1)
+                # Representative first, then members nearest to it
+                rank = np.argsort(distance, kind="stable")
+                clusters.append({
+                    "cluster_id": len(clusters),
+                    "representative": player_ids[rep],
+                    "members": [player_ids[r] for r in rows[rank]],
+                    "similarity": self.similarity(distance[rank], dimension).astype("float64").round(4).tolist(),
+                })
+
+        clustered = sum(len(c["members"]) for c in clusters)
+        print(f"Clustering: {clustered} players in {len(clusters)} tight clusters, {len(outliers)} outliers; "
+              f"{len(clusters) + len(outliers)} players to score")
+        return {"clusters": clusters, "outliers": outliers}
@@ -0,0 +1,165 @@
+import hashlib
+import shelve
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class LLMUsageStats:
+    """Running counters for LLM calls, tokens and cache hits."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_call(self, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def record_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.calls + self.cache_hits
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "llm_calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": self.cache_hit_rate,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+
+class MeteredLLM:
+    """
+    Wraps a chat model to count calls and tokens, with an optional response cache.
+
+    Agents only ever call ``invoke`` on the model, so this can be passed anywhere
+    the raw ``ChatGroq`` instance is used today; ``batch`` serves the batched scoring path.
+
+    Args:
+        llm: The underlying chat model
+        cache_path: Optional shelve file used to persist responses across runs
+        stats: Shared stats object, used when binding derived models
+    """
+
+    def __init__(self, llm, cache_path: Optional[str] = None, stats: Optional[LLMUsageStats] = None, cache=None):
+        self.llm = llm
+        self.stats = stats or LLMUsageStats()
+        self._cache_lock = threading.Lock()
+        # Call options fixed by ``bind``; part of the cache key
+        self.bound_kwargs: Dict[str, Any] = {}
+        if cache is not None:
+            self.cache = cache
+        elif cache_path:
+            self.cache = shelve.open(cache_path)
+        else:
+            self.cache = None
+
+    def _cache_key(self, messages, kwargs: Dict[str, Any]) -> str:
+        if isinstance(messages, (list, tuple)):
+            text = "\n".join(f"{getattr(m, 'type', '')}:{getattr(m, 'content', m)}" for m in messages)
+        else:
+            text = str(messages)
+        text += repr(sorted({**self.bound_kwargs, **kwargs}.items()))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _record_usage(self, response):
+        prompt_tokens, completion_tokens = 0, 0
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            prompt_tokens = usage.get("input_tokens", 0)
+            completion_tokens = usage.get("output_tokens", 0)
+        else:
+            token_usage = getattr(response, "response_metadata", {}).get("token_usage", {})
+            prompt_tokens = token_usage.get("prompt_tokens", 0)
+            completion_tokens = token_usage.get("completion_tokens", 0)
+        self.stats.record_call(prompt_tokens, completion_tokens)
+
+    def bind(self, **kwargs) -> "MeteredLLM":
+        """
+        Derived model with fixed call options such as ``max_tokens``. It shares this
+        model's stats and response cache, so spend and budgets still see every call.
+        """
+        bound = MeteredLLM(self.llm.bind(**kwargs), stats=self.stats, cache=self.cache)
+        bound._cache_lock = self._cache_lock
+        bound.bound_kwargs = {**self.bound_kwargs, **kwargs}
+        return bound
+
+    def invoke(self, messages, **kwargs):
+        key = self._cache_key(messages, kwargs) if self.cache is not None else None
+        if key is not None:
+            with self._cache_lock:
+                cached = self.cache.get(key)
+            if cached is not None:
+                from langchain_core.messages import AIMessage
+
+                self.stats.record_cache_hit()
+                return AIMessage(content=cached)
+
+        response = self.llm.invoke(messages, **kwargs)
+        self._record_usage(response)
+
+        if key is not None:
+            with self._cache_lock:
+                self.cache[key] = response.content
+        return response
+
+    def batch(self, messages_list: List[Any], max_concurrency: int = 8, return_exceptions: bool = False,
+              **kwargs) -> List[Any]:
+        """
+        Runs many prompts at once through the model's ``batch``, which issues the
+        requests concurrently. Cached prompts are answered locally and only the misses
+        reach the model; responses come back in input order.
+
+        With ``return_exceptions`` a failed prompt yields its exception in place of a
+        response (neither metered nor cached) instead of failing the whole batch.
+        """
+        from langchain_core.messages import AIMessage
+
+        responses: List[Any] = [None] * len(messages_list)
+        keys: List[Optional[str]] = [None] * len(messages_list)
+        misses = []
+        for i, messages in enumerate(messages_list):
+            if self.cache is not None:
+                keys[i] = self._cache_key(messages, kwargs)
+                with self._cache_lock:
+                    cached = self.cache.get(keys[i])
+                if cached is not None:
+                    self.stats.record_cache_hit()
+                    responses[i] = AIMessage(content=cached)
+                    continue
+            misses.append(i)
+
+        if misses:
+            results = self.llm.batch([messages_list[i] for i in misses],
+                                     config={"max_concurrency": max_concurrency},
+                                     return_exceptions=return_exceptions, **kwargs)
+            for i, response in zip(misses, results):
+                if isinstance(response, Exception):
+                    responses[i] = response
+                    continue
+                self._record_usage(response)
+                responses[i] = response
+                if keys[i] is not None:
+                    with self._cache_lock:
+                        self.cache[keys[i]] = response.content
+        return responses
+
+    def close(self):
+        if isinstance(self.cache, shelve.Shelf):
+            self.cache.close()
@@ -0,0 +1,178 @@
+import hashlib
+import os
+from typing import Dict, List
+
+import numpy as np
+
+# Identifier and label columns that never go into the feature vector
+NON_FEATURE_COLUMNS = ("Actor", "A_Acc", "Type")
+
+
+class NumericFeatureIndex:
+    """
+    Similar-player search over standardized numeric feature vectors.
+
+    Builds one vector per actor from the player, action, social, group and network
+    feature tables, optionally log-scales the heavy-tailed count columns, standardizes
+    every column and indexes the result directly in FAISS. Lookups need no text
+    encoder, and building the index is a single vectorized pass over the tables.
+
+    Args:
+        log_scale: Apply sign(x) * log1p(|x|) before standardizing; counts and totals in
+            the HCRL tables span several orders of magnitude
+    """
+
+    def __init__(self, log_scale: bool = True):
+        self.log_scale = log_scale
+        self.faiss_index = None
+        self.player_ids: List[str] = []
+        self.row_by_player: Dict[str, int] = {}
+        self.columns: List[str] = []
+        self.mean = None
+        self.std = None
+        self.vectors = None
+        # Fingerprint of the feature tables the index was built from
+        self.fingerprint = None
+
+    @staticmethod
+    def join_feature_tables(tables):
+        """Merges the feature tables into one row per actor, suffixing clashing column names with the table name."""
+        from src.data_ingestion.feature_join import join_actor_features
+
+        return join_actor_features(tables, drop=("A_Acc", "Type"))
+
+    def _transform(self, matrix: np.ndarray) -> np.ndarray:
+        if self.log_scale:
+            matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        return ((matrix - self.mean) / self.std).astype("float32")
+
+    @classmethod
+    def load_features(cls):
+        """Joins the five HCRL feature tables into the DataFrame the index is built from."""
+        from src.data_ingestion.load_data import (
+            load_action_data, load_group_data, load_network_data, load_player_data, load_social_data,
+        )
+
+        return cls.join_feature_tables({
+            "player": load_player_data(),
+            "action": load_action_data(),
+            "social": load_social_data(),
+            "group": load_group_data(),
+            "network": load_network_data(),
+        })
+
+    @staticmethod
+    def _numeric_features(features):
+        features = features.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in features.columns])
+        return features.select_dtypes(include="number")
+
+    def features_fingerprint(self, features) -> str:
+        """Hex digest of the feature values, columns and scaling an index over ``features`` would have."""
+        import pandas as pd
+
+        features = self._numeric_features(features)
+        digest = hashlib.sha1(pd.util.hash_pandas_object(features, index=True).to_numpy().tobytes())
+        digest.update(repr((features.columns.tolist(), self.log_scale)).encode())
+        return digest.hexdigest()
+
+    def build(self, features=None):
+        """
+        Fits the scaler and builds the index.
+
+        Args:
+            features: DataFrame indexed by actor with one numeric column per feature;
+                defaults to joining the five HCRL feature tables
+        """
+        import faiss
+
+        if features is None:
+            features = self.load_features()
+
+        self.fingerprint = self.features_fingerprint(features)
+        features = self._numeric_features(features)
+        self.columns = features.columns.tolist()
+        self.player_ids = [str(int(actor)) for actor in features.index]
+        self.row_by_player = {pid: row for row, pid in enumerate(self.player_ids)}
+
+        matrix = features.to_numpy(dtype="float64", na_value=np.nan)
+        raw = np.sign(matrix) * np.log1p(np.abs(matrix)) if self.log_scale else matrix
+        # Missing rows (actor absent from a table) are imputed with the column mean
+        self.mean = np.nanmean(raw, axis=0)
+        self.std = np.nanstd(raw, axis=0)
+        self.std[~(self.std > 0)] = 1.0
+        self.mean = np.nan_to_num(self.mean)
+
+        # NaN -> 0, i.e. the column mean after standardizing
+        self.vectors = np.nan_to_num(self._transform(matrix))
+
+        self.faiss_index = faiss.IndexFlatL2(self.vectors.shape[1])
+        self.faiss_index.add(self.vectors)
+        print(f"Numeric feature index built: {len(self.player_ids)} players x {len(self.columns)} features")
+        return self
+
+    def vectorize(self, feature_row: Dict[str, float]) -> np.ndarray:
+        """Vectorizes a single feature dict (e.g. a player not in the index) with the fitted scaler."""
+        values = np.array([np.nan if feature_row.get(c) is None else feature_row[c] for c in self.columns],
+                          dtype="float64")
+        return np.nan_to_num(self._transform(values[None, :]))
+
+    def search_vector(self, vector: np.ndarray, top_k: int = 5, exclude: str = None) -> List[str]:
+        extra = 1 if exclude is not None else 0
+        _, ids = self.faiss_index.search(vector.reshape(1, -1).astype("float32"), top_k + extra)
+        similar = [self.player_ids[i] for i in ids[0] if i >= 0 and self.player_ids[i] != exclude]
+        return similar[:top_k]
+
+    def search(self, player_id: str, top_k: int = 5) -> List[str]:
+        """Finds the players whose feature vectors are nearest to ``player_id``'s, excluding itself."""
+        if self.faiss_index is None:
+            raise RuntimeError("Numeric feature index not built. Call build() or load() first.")
+        row = self.row_by_player.get(str(player_id))
+        if row is None:
+            return []
+        return self.search_vector(self.vectors[row], top_k, exclude=str(player_id))
+
+    @staticmethod
+    def cache_path(path: str) -> str:
+        """``np.savez`` appends ``.npz`` to paths without it; saves and loads both use the suffixed path."""
+        return path if path.endswith(".npz") else path + ".npz"
+
+    def save(self, path: str):
+        np.savez(self.cache_path(path), player_ids=np.array(self.player_ids), columns=np.array(self.columns),
+                 mean=self.mean, std=self.std, vectors=self.vectors, log_scale=self.log_scale,
+                 fingerprint=np.array(self.fingerprint or ""))
+
+    def load(self, path: str):
+        import faiss
+
+        data = np.load(self.cache_path(path), allow_pickle=False)
+        self.player_ids = data["player_ids"].tolist()
+        self.row_by_player = {pid: row for row, pid in enumerate(self.player_ids)}
+        self.columns = data["columns"].tolist()
+        self.mean, self.std, self.vectors = data["mean"], data["std"], data["vectors"]
+        self.log_scale = bool(data["log_scale"])
+        # Caches written before fingerprints were stored never match
+        self.fingerprint = str(data["fingerprint"]) if "fingerprint" in data.files else None
+        self.faiss_index = faiss.IndexFlatL2(self.vectors.shape[1])
+        self.faiss_index.add(self.vectors)
+        return self
+
+    def load_or_build(self, path: str = None, features=None):
+        """
+        Loads the index cached at ``path`` if it was built from the current feature tables;
+        otherwise builds it and, when ``path`` is given, saves it there.
+
+        Args:
+            path: Cache file; ``.npz`` is appended when missing
+            features: Feature DataFrame; defaults to joining the five HCRL feature tables
+        """
+        if features is None:
+            features = self.load_features()
+        if path and os.path.exists(self.cache_path(path)):
+            self.load(path)
+            if self.fingerprint == self.features_fingerprint(features):
+                return self
+            print(f"Numeric feature index at {self.cache_path(path)} is stale; rebuilding")
+        self.build(features)
+        if path:
+            self.save(path)
+        return self
@@ -0,0 +1,88 @@
+import os
+from typing import List
+
+import numpy as np
+
+ONNX_MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """
+    Exports a SentenceTransformer checkpoint to ONNX, optionally with int8 dynamic quantization.
+
+    Writes ``model.onnx`` (and ``model_int8.onnx`` when quantizing) plus the tokenizer
+    files to ``output_dir``. Only needs to run once per model; the result is what
+    ``OnnxEncoder`` loads at runtime.
+
+    Returns:
+        Path of the model file the encoder should load.
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        model_path = quantized_path
+
+    print(f"Exported {model_name} to {model_path}")
+    return model_path
+
+
+class OnnxEncoder:
+    """
+    CPU encoder running an exported (optionally int8-quantized) e5 model through ONNX Runtime.
+
+    Reproduces the SentenceTransformer pipeline for ``multilingual-e5-large-instruct``:
+    tokenize, run the transformer, mean-pool over the attention mask and L2-normalize,
+    so its vectors can be searched against embeddings produced by the PyTorch model.
+
+    Args:
+        model_dir: Directory written by ``export_onnx_model``
+        quantized: Load ``model_int8.onnx`` instead of the full-precision export
+        num_threads: Intra-op threads for ONNX Runtime; 0 lets the runtime decide
+        max_seq_length: Truncation length, matching the SentenceTransformer config
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = True, num_threads: int = 0, max_seq_length: int = 512):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encodes ``texts`` into L2-normalized float32 embeddings."""
+        batches = []
+        for i in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[i:i + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            token_embeddings = self.session.run(None, feeds)[0]
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+        return np.vstack(batches)
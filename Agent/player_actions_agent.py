@@ -1,23 +1,19 @@
 import os
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, TYPE_CHECKING
 # from langchain_community.graphs import Neo4jGraph
-from langchain_neo4j import Neo4jGraph
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
 
 import json
 
 from .prompts_v2 import player_action_prompt
-import numpy as np
 
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+    from langchain_neo4j import Neo4jGraph
 
-def extract_player_action_features(player_id: str, graph: Neo4jGraph) -> dict:
-    """
-    Extracts features from the knowledge graph for a given player.
-    """
-    query = f"""
-    MATCH (p:Player {{Actor: toInteger('{player_id}')}})-[:PERFORMED]->(a:Action)
-    RETURN 
+
+# Columns returned for a player's actions, shared by the single and batched lookups
+ACTION_FEATURE_RETURN = """
         p.Actor as actor,
         a.collect_max_count as collect_max_count,
         a.Sit_ratio as Sit_ratio,
@@ -47,44 +43,72 @@ def extract_player_action_features(player_id: str, graph: Neo4jGraph) -> dict:
         a.Teleport_count_per_day as Teleport_count_per_day,
         a.Reborn_count as Reborn_count,
         a.Reborn_count_per_day as Reborn_count_per_day
+"""
+
+def extract_player_action_features(player_id: str, graph: "Neo4jGraph") -> dict:
+    """
+    Extracts features from the knowledge graph for a given player.
+    """
+    query = f"""
+    MATCH (p:Player {{Actor: toInteger('{player_id}')}})-[:PERFORMED]->(a:Action)
+    RETURN {ACTION_FEATURE_RETURN}
     """
     results = graph.query(query)
     if results:
         return results[0]
     else:
         return {}
-prompt_template = player_action_prompt()
 
-if prompt_template:
-    prompt = ChatPromptTemplate.from_template(prompt_template)
-else:
-    prompt = None  # Handle the case where the prompt couldn't be loaded
-    
-def assess_player_action(player_data, llm) -> tuple[int, str, str]:
-    """
-    Assesses the likelihood of a player being a bot using LLM and extracts score and reasoning.
-    Returns a tuple of (anomaly_score, reasoning, full_analysis).
+def extract_player_action_features_batch(player_ids: List[str], graph: "Neo4jGraph") -> Dict[str, dict]:
+    """Extracts action features for many players in one round trip, keyed by the requested id."""
+    query = f"""
+    UNWIND $player_ids AS requested_id
+    MATCH (p:Player {{Actor: toInteger(requested_id)}})-[:PERFORMED]->(a:Action)
+    WITH requested_id, p, head(collect(a)) AS a
+    RETURN requested_id, {ACTION_FEATURE_RETURN}
     """
-    
-    formatted_prompt = prompt.format_messages(**player_data)
+    results = graph.query(query, {"player_ids": [str(pid) for pid in player_ids]})
+    return {row.pop("requested_id"): row for row in results}
 
-    response = llm.invoke(formatted_prompt)
+@lru_cache(maxsize=None)
+def get_prompt(score_only: bool = False):
+    """Builds the chat prompt on first use rather than at import time; ``score_only`` asks for the score alone."""
+    from langchain_core.prompts import ChatPromptTemplate
 
+    prompt_template = player_action_prompt(score_only)
+    if prompt_template:
+        return ChatPromptTemplate.from_template(prompt_template)
+    return None  # Handle the case where the prompt couldn't be loaded
+    
+def format_player_action_prompt(player_data: dict, score_only: bool = False):
+    """Formats the player-action prompt messages from the extracted action features."""
+    return get_prompt(score_only).format_messages(**player_data)
+
+def parse_player_action_response(content: str) -> tuple[int, str]:
+    """Parses the JSON object in the response into (anomaly_score, reasoning)."""
     try:
-        json_str = response.content
+        json_str = content
         response_dict = json.loads(json_str[json_str.find('{'):json_str.rfind('}')+1])
         
         response_dict = {key.strip(): value for key, value in response_dict.items()}
         anomaly_score = response_dict.get("anomaly_score", None)
         reasoning = response_dict.get("reasoning", "Could not parse reasoning.")
-        full_analysis = response.content
-        
-        return anomaly_score, reasoning, full_analysis
+        return anomaly_score, reasoning
         
     except (json.JSONDecodeError, Exception) as e:
-        anomaly_score = None
         #reasoning = f"Could not reliably parse LLM response: {str(e)}"
-        reasoning = response.content
-        full_analysis = response.content
+        return None, content
+
+def assess_player_action(player_data, llm, score_only: bool = False) -> tuple[int, str, str]:
+    """
+    Assesses the likelihood of a player being a bot using LLM and extracts score and reasoning.
+    Returns a tuple of (anomaly_score, reasoning, full_analysis).
+    """
     
-    return anomaly_score, reasoning, full_analysis
\ No newline at end of file
+    formatted_prompt = format_player_action_prompt(player_data, score_only)
+
+    response = llm.invoke(formatted_prompt)
+
+    anomaly_score, reasoning = parse_player_action_response(response.content)
+    full_analysis = response.content
+    return anomaly_score, reasoning, full_analysis
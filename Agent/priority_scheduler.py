@@ -0,0 +1,207 @@
+import heapq
+import json
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .numeric_search import NumericFeatureIndex
+
+# Cheap bot signals from the feature tables and their direction (+1: higher means more
+# bot-like). Bots farm long, regular sessions dominated by collecting, from few IPs,
+# with little social or guild activity.
+SUSPICION_SIGNALS = {
+    "playtime_per_day": 1.0,
+    "Login_day_count": 1.0,
+    "collect_max_count": 1.0,
+    "Exp_get_ratio": 1.0,
+    "Item_get_ratio": 1.0,
+    "Money_get_ratio": 1.0,
+    "Abyss_get_ratio": 1.0,
+    "ip_count": -1.0,
+    "Social_diversity": -1.0,
+    "GuildAct_count": -1.0,
+    "GuildJoin_count": -1.0,
+    "Killed_bypc_count_per_day": -1.0,
+}
+
+# USD per million tokens for the default Groq model (llama-3.3-70b-versatile)
+DEFAULT_PROMPT_PRICE = 0.59
+DEFAULT_COMPLETION_PRICE = 0.79
+
+
+class SuspicionPrior:
+    """
+    Cheap per-actor bot likelihood computed from the feature tables, no LLM involved.
+
+    Each signal column is log-scaled and standardized over the population, then
+    combined as ``sigmoid(weights @ z + bias)``. The default weights just encode the
+    direction of each signal in ``SUSPICION_SIGNALS``; ``fit`` replaces them with a
+    logistic regression on labelled actors, which ranks bots noticeably better.
+
+    Args:
+        weights: Column -> weight; defaults to ``SUSPICION_SIGNALS``
+        bias: Logistic intercept
+    """
+
+    def __init__(self, weights: Dict[str, float] = None, bias: float = 0.0):
+        self.weights = dict(weights if weights is not None else SUSPICION_SIGNALS)
+        self.bias = bias
+
+    def _standardized(self, features) -> Tuple[np.ndarray, List[str]]:
+        columns = [c for c in self.weights if c in features.columns]
+        if not columns:
+            raise ValueError("None of the suspicion signal columns are present in the feature tables")
+        matrix = features[columns].to_numpy(dtype="float64", na_value=np.nan)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        std = np.nanstd(matrix, axis=0)
+        std[~(std > 0)] = 1.0
+        # Missing values land on the population mean, i.e. contribute nothing
+        return np.nan_to_num((matrix - np.nanmean(matrix, axis=0)) / std), columns
+
+    def score(self, features) -> Dict[str, float]:
+        """
+        Bot likelihood per actor.
+
+        Args:
+            features: DataFrame indexed by actor, e.g. ``NumericFeatureIndex.join_feature_tables``
+
+        Returns:
+            Mapping of actor id (as string) to a prior in [0, 1].
+        """
+        z, columns = self._standardized(features)
+        logits = z @ np.array([self.weights[c] for c in columns]) + self.bias
+        priors = 1.0 / (1.0 + np.exp(-logits))
+        return {str(int(actor)): float(p) for actor, p in zip(features.index, priors)}
+
+    def fit(self, features, labels: Dict[str, int], l2: float = 1e-2,
+            learning_rate: float = 0.5, epochs: int = 500) -> "SuspicionPrior":
+        """Fits the signal weights on labelled actors (label 1 = bot), keeping the same columns."""
+        z, columns = self._standardized(features)
+        actors = [str(int(actor)) for actor in features.index]
+        rows = [i for i, actor in enumerate(actors) if actor in labels]
+        x = z[rows]
+        y = np.array([float(labels[actors[i]]) for i in rows])
+        if len(set(y)) < 2:
+            raise ValueError("Fitting the suspicion prior needs labelled bots and humans")
+
+        weights, bias = np.zeros(len(columns)), 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+            error = p - y
+            weights -= learning_rate * (x.T @ error / len(y) + l2 * weights)
+            bias -= learning_rate * error.mean()
+
+        self.weights = dict(zip(columns, weights.tolist()))
+        self.bias = float(bias)
+        print(f"Fitted suspicion prior on {len(y)} players over {len(columns)} signals")
+        return self
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"weights": self.weights, "bias": self.bias}, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "SuspicionPrior":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def suspicion_priors(tables: Dict[str, Any], prior: SuspicionPrior = None) -> Dict[str, float]:
+    """Scores every actor in the player/action/social/group tables with ``prior`` (default weights if omitted)."""
+    features = NumericFeatureIndex.join_feature_tables(
+        {name: tables.get(name) for name in ("player", "action", "social", "group")}
+    )
+    return (prior or SuspicionPrior()).score(features)
+
+
+class BudgetScheduler:
+    """
+    Hands players to the orchestrator most-suspicious first until an LLM budget is spent.
+
+    Players sit in a max-heap keyed by their suspicion prior. Spend is read from the
+    orchestrator's ``LLMUsageStats`` (cache hits are free), so the budget tracks real
+    tokens rather than an estimate. Before each dispatch the scheduler projects the
+    next player's cost from the average so far and stops if it would overrun, leaving
+    the rest unscored; they stay pending in the ledger for the next sweep.
+
+    Args:
+        priorities: Player id -> suspicion prior
+        stats: ``LLMUsageStats`` of the LLM the orchestrator calls
+        token_budget: Maximum prompt + completion tokens for this sweep
+        cost_budget: Maximum spend in USD for this sweep
+        prompt_price: USD per million prompt tokens
+        completion_price: USD per million completion tokens
+        calibrated: Whether the priors come from a fitted ``SuspicionPrior``; only then
+            are they bot probabilities, and only then does ``summary`` report the bots
+            expected among the unscored players
+    """
+
+    def __init__(self, priorities: Dict[str, float], stats, token_budget: Optional[int] = None,
+                 cost_budget: Optional[float] = None, prompt_price: float = DEFAULT_PROMPT_PRICE,
+                 completion_price: float = DEFAULT_COMPLETION_PRICE, calibrated: bool = False):
+        self.priorities = priorities
+        self.stats = stats
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.prompt_price = prompt_price
+        self.completion_price = completion_price
+        self.calibrated = calibrated
+        self.dispatched = 0
+        self._heap: List[Tuple[float, str]] = [(-p, pid) for pid, p in priorities.items()]
+        heapq.heapify(self._heap)
+        self._start = (stats.prompt_tokens, stats.completion_tokens)
+
+    def spent(self) -> Dict[str, float]:
+        prompt = self.stats.prompt_tokens - self._start[0]
+        completion = self.stats.completion_tokens - self._start[1]
+        return {
+            "tokens": prompt + completion,
+            "cost": (prompt * self.prompt_price + completion * self.completion_price) / 1e6,
+        }
+
+    def _fits(self, players: int = 1) -> bool:
+        """Whether ``players`` more players fit the budget at the average per-player spend so far."""
+        spent = self.spent()
+        for used, budget in ((spent["tokens"], self.token_budget), (spent["cost"], self.cost_budget)):
+            if budget is None:
+                continue
+            per_player = used / self.dispatched if self.dispatched else 0.0
+            if used + players * per_player > budget or (self.dispatched and used >= budget):
+                return False
+        return True
+
+    def take(self, count: int) -> List[str]:
+        """Pops up to ``count`` players for a batched dispatch, or fewer if the budget is nearly spent."""
+        players = []
+        while self._heap and len(players) < count and self._fits(len(players) + 1):
+            players.append(heapq.heappop(self._heap)[1])
+        self.dispatched += len(players)
+        return players
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            players = self.take(1)
+            if not players:
+                return
+            yield players[0]
+
+    def unscored(self) -> List[Dict[str, Any]]:
+        """Players left when the budget ran out, most suspicious first."""
+        return [{"player_id": pid, "suspicion": -neg} for neg, pid in sorted(self._heap)]
+
+    def summary(self) -> Dict[str, Any]:
+        spent = self.spent()
+        unscored = [-neg for neg, _ in self._heap]
+        return {
+            "dispatched": self.dispatched,
+            "unscored": len(unscored),
+            "tokens_spent": spent["tokens"],
+            "cost_spent": round(spent["cost"], 6),
+            "token_budget": self.token_budget,
+            "cost_budget": self.cost_budget,
+            # Sum of priors: the bots the prior expects were left for a later sweep. The
+            # default weights only rank players, so their sum means nothing
+            "expected_bots_unscored": round(math.fsum(unscored), 1) if self.calibrated else None,
+            "highest_unscored_suspicion": max(unscored) if unscored else None,
+        }
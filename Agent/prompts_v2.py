@@ -1,4 +1,25 @@
-def anomaly_scoring_prompt():
+# Output instructions swapped in by the score-only variants: the fast sweep only needs
+# the number, and reasoning is generated later for the players that get reviewed
+SCORE_ONLY_OUTPUT = """Respond with the score line only, no reasoning:
+
+Anomaly Score: [Anomaly Score (0-100)]
+"""
+
+SOCIAL_SCORE_ONLY_INSTRUCTIONS = """Based on those descriptions, determine the **anomaly score** (0-100) for the player below. A higher score indicates a greater likelihood of the player being a bot.
+
+Your final output **MUST** be this single line, with no reasoning:
+
+Anomaly Score: [your anomaly score 0-100]
+
+"""
+
+PLAYER_ACTION_SCORE_ONLY_INSTRUCTIONS = """Respond with only this JSON object, no reasoning:
+{{"anomaly_score": [score between 0-100, 0 indicates human like behavior, 100 indicates anomalous behavior]}}
+
+"""
+
+
+def anomaly_scoring_prompt(score_only: bool = False):
     return """
     <|system|>
 You are an expert player behavior analyst in a large multiplayer online game. Your task is to identify anomalous player behavior that may indicate botting, account sharing, or other policy violations. You will be provided with player data, and you must output an anomaly score (0-100, higher means more anomalous) and detailed reasoning for the score.
@@ -83,14 +104,14 @@ Login_count: {login_count}
 ip_count: {ip_count}
 Max_level: {max_level}
 
-Structure your response as follows:
+""" + (SCORE_ONLY_OUTPUT if score_only else """Structure your response as follows:
 
 Anomaly Score: [Anomaly Score (0-100)]
 Reasoning: [Detailed explanation of why the player is, or is not, anomalous. Refer to specific data points and comparisons to general player behavior. Explain which factors contribute to the score.]
-"""
+""")
 
 
-def social_diversity_prompt():
+def social_diversity_prompt(score_only: bool = False):
     return """
 <|system|>
 You are an expert game analyst tasked with identifying bots in an online game by analyzing player statistics. Your role is to generate an anomaly score (0-100, higher score means more likely to be a bot) and provide concise reasoning based on the player data.
@@ -109,7 +130,7 @@ Consider:
 4. While some legitimate players may have low social diversity due to playstyle preferences, inactivity, or being new to the game, consistently low diversity over extended periods is more commonly seen in bots.
 
 
-Based on those descriptions, you will be given the following information and need to determine these two things
+""" + (SOCIAL_SCORE_ONLY_INSTRUCTIONS if score_only else """Based on those descriptions, you will be given the following information and need to determine these two things
 
 1.  Determine the **anomaly score** (0-100): A higher score indicates a greater likelihood of the player being a bot. This MUST be provided
 
@@ -122,18 +143,18 @@ Reasoning: [Your reasoning based on patterns from the statistics. Be as clear as
 
 Respond concisely and directly.
 
-<|user|>
+""") + """<|user|>
 Here is the player data:
 
 Actor: {actor}
 A_Acc: {a_acc}
 Social_diversity: {social_diversity}
 
-Anomaly Score: [Anomaly Score (0-100)]
+""" + (SCORE_ONLY_OUTPUT if score_only else """Anomaly Score: [Anomaly Score (0-100)]
 Reasoning: [Detailed explanation of why the player is, or is not, anomalous. Refer to specific data points and comparisons to general player behavior. Explain which factors contribute to the score.]
-"""
+""")
 
-def player_action_prompt():
+def player_action_prompt(score_only: bool = False):
     return """
 <|system|>
 ## Role: Game Action Anomaly Detector
@@ -186,13 +207,13 @@ OR (item_get >5000/day AND deaths=0)
  - Medium: 1 major + 2 minor
  - Low: Single anomaly
 
-Please provide your analysis in the following JSON format:
+""" + (PLAYER_ACTION_SCORE_ONLY_INSTRUCTIONS if score_only else """Please provide your analysis in the following JSON format:
 - anomaly_score: An score between 0-100 (0 indicates human like behavior, 100 indicates anomalous behavior)
 - confidence_level: High, Medium, Low
 - behavior_profile: "Bot-like/Human-like/Uncertain
 - reasoning: A brief reasoning for the score
 
-Examples from dataset:
+""") + """Examples from dataset:
 - Bot 6187: 959exp/day + 0 collects + 0 deaths → Score 97
 - Human 1312: 316exp/day + 13 PvP deaths → Score 22
 - Bot 8085: 671exp/day + 24 teleports → Score 92
@@ -230,3 +251,28 @@ Actor: {actor}
 - Reborn_count: {Reborn_count}
 - Reborn_count_per_day: {Reborn_count_per_day}
 """
+
+
+def explanation_prompt():
+    return """
+<|system|>
+You are an expert game analyst writing the review report for a player flagged by an automated bot detector. Three agents scored the player from 0 to 100 (higher means more bot-like) and a classifier reached the verdict below. Explain in plain English, for a game moderator, why the player was or was not classified as a bot. Refer to specific data points, say which of them look automated and which look human, and mention anything that argues against the verdict. Keep it to one or two short paragraphs.
+
+<|user|>
+Actor: {actor}
+Verdict: {classification} (confidence {confidence})
+
+Anomaly score: {anomaly_score}/100
+Player statistics:
+{player_features}
+
+Social diversity score: {social_diversity_score}/100
+Social statistics:
+{social_features}
+
+Player action score: {player_action_score}/100
+Action statistics:
+{action_features}
+
+Report:
+"""
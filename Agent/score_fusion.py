@@ -0,0 +1,163 @@
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Agent scores fused into the final verdict, in the order the weights apply to
+AGENT_SCORE_KEYS = ("anomaly_score", "social_diversity_score", "player_action_score")
+
+
+class ScoreFusion:
+    """
+    Deterministic fusion of the three agent scores into a Bot/Human verdict.
+
+    Two methods are supported:
+
+    * ``rules`` applies the thresholds the classification prompt spells out: any score
+      above ``bot_threshold`` means bot and all scores below ``human_threshold`` mean
+      human. Anything in between gets a weighted-mean probability but is not decisive,
+      so it is left to the LLM classifier even when the agents agree.
+    * ``logistic`` applies a logistic calibration fitted on labelled agent scores
+      (see ``fit_logistic``), giving a calibrated bot probability.
+
+    A result is flagged ``conflict`` when the agents genuinely disagree (one says bot,
+    another says human), the fused probability falls inside ``uncertainty_band``, or
+    (for ``rules``) no score is decisive; only those cases need the LLM classifier.
+
+    Args:
+        method: "rules" or "logistic"
+        weights: Per-agent weights, ordered as ``AGENT_SCORE_KEYS``
+        bias: Logistic intercept
+        bot_threshold: Score at or above which an agent's verdict counts as bot
+        human_threshold: Score below which an agent's verdict counts as human
+        uncertainty_band: Fused bot probabilities treated as too close to call
+    """
+
+    def __init__(self, method: str = "rules", weights: List[float] = None, bias: float = 0.0,
+                 bot_threshold: float = 80, human_threshold: float = 40,
+                 uncertainty_band: tuple = (0.4, 0.6)):
+        if method not in ("rules", "logistic"):
+            raise ValueError(f"Unknown fusion method '{method}', expected 'rules' or 'logistic'")
+        self.method = method
+        self.weights = np.array(weights if weights is not None else [1.0] * len(AGENT_SCORE_KEYS), dtype=float)
+        self.bias = bias
+        self.bot_threshold = bot_threshold
+        self.human_threshold = human_threshold
+        self.uncertainty_band = tuple(uncertainty_band)
+
+    @staticmethod
+    def _available(scores: Dict[str, Any]) -> Dict[str, float]:
+        available = {}
+        for key in AGENT_SCORE_KEYS:
+            try:
+                if scores.get(key) is not None:
+                    available[key] = float(scores[key])
+            except (TypeError, ValueError):
+                continue
+        return available
+
+    def bot_probability(self, scores: Dict[str, Any]) -> Optional[float]:
+        """Fused bot probability in [0, 1], or None when no agent produced a score."""
+        available = self._available(scores)
+        if not available:
+            return None
+
+        if self.method == "logistic":
+            # Missing agents are imputed with the mean of the ones that ran
+            fill = sum(available.values()) / len(available)
+            x = np.array([available.get(key, fill) for key in AGENT_SCORE_KEYS]) / 100.0
+            return 1.0 / (1.0 + math.exp(-(float(self.weights @ x) + self.bias)))
+
+        weights = np.array([self.weights[AGENT_SCORE_KEYS.index(key)] for key in available])
+        values = np.array(list(available.values()))
+        max_score = values.max()
+        if max_score >= self.bot_threshold:
+            return float(max_score) / 100.0
+        if max_score < self.human_threshold:
+            return float(values.mean()) / 100.0
+        return float(weights @ values / weights.sum()) / 100.0
+
+    def fuse(self, scores: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns the fused verdict for one player's agent scores.
+
+        The result holds ``classification`` ("Bot"/"Human", None if no scores),
+        ``confidence`` (0-100), ``bot_probability`` and ``conflict``.
+        """
+        available = self._available(scores)
+        probability = self.bot_probability(scores)
+        if probability is None:
+            return {"classification": None, "confidence": None, "bot_probability": None, "conflict": True}
+
+        values = list(available.values())
+        disagree = max(values) >= self.bot_threshold and min(values) < self.human_threshold
+        uncertain = self.uncertainty_band[0] < probability < self.uncertainty_band[1]
+        # The prompt's thresholds only settle scores above bot_threshold or all below human_threshold
+        undecided = self.method == "rules" and self.human_threshold <= max(values) < self.bot_threshold
+        is_bot = probability >= 0.5
+        return {
+            "classification": "Bot" if is_bot else "Human",
+            "confidence": round(100.0 * (probability if is_bot else 1.0 - probability), 1),
+            "bot_probability": probability,
+            "conflict": bool(disagree or uncertain or undecided),
+        }
+
+    def fit_logistic(self, score_rows: Iterable[Dict[str, Any]], labels: Iterable[int],
+                     l2: float = 1e-3, learning_rate: float = 0.5, epochs: int = 2000) -> "ScoreFusion":
+        """
+        Fits logistic calibration weights on labelled agent scores (label 1 = bot).
+
+        Rows missing any agent score are skipped so the fit only sees complete evidence.
+        """
+        x_rows, y = [], []
+        for row, label in zip(score_rows, labels):
+            available = self._available(row)
+            if len(available) == len(AGENT_SCORE_KEYS):
+                x_rows.append([available[key] / 100.0 for key in AGENT_SCORE_KEYS])
+                y.append(float(label))
+        if len(set(y)) < 2:
+            raise ValueError("Logistic calibration needs complete scores for both bots and humans")
+
+        x, y = np.array(x_rows), np.array(y)
+        weights, bias = np.zeros(x.shape[1]), 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+            error = p - y
+            weights -= learning_rate * (x.T @ error / len(y) + l2 * weights)
+            bias -= learning_rate * error.mean()
+
+        self.method = "logistic"
+        self.weights, self.bias = weights, float(bias)
+        print(f"Fitted logistic fusion on {len(y)} players: weights={weights.round(3).tolist()}, bias={self.bias:.3f}")
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "weights": self.weights.tolist(),
+            "bias": self.bias,
+            "bot_threshold": self.bot_threshold,
+            "human_threshold": self.human_threshold,
+            "uncertainty_band": list(self.uncertainty_band),
+        }
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "ScoreFusion":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def format_fused_classification(result: Dict[str, Any], scores: Dict[str, Any]) -> str:
+    """Renders a fusion result in the classifier's output format so downstream parsing is unchanged."""
+    summary = ", ".join(f"{key}={scores.get(key)}" for key in AGENT_SCORE_KEYS)
+    return (
+        f"Classification: {result['classification']}\n"
+        f"Confidence: {result['confidence']}\n"
+        f"Reasoning: Deterministic score fusion ({summary}; "
+        f"bot probability {result['bot_probability']:.2f})."
+    )
@@ -1,22 +1,63 @@
-import faiss
 import numpy as np
 import pickle
-from sentence_transformers import SentenceTransformer
-from src.data_ingestion.load_data import load_player_data
 from typing import List
-import torch
+
+# faiss, torch and sentence_transformers are imported on first use: together they
+# cost several seconds of startup that commands not touching the index shouldn't pay
+
+# Supported vector storage formats, from exact to most compressed
+STORAGE_FORMATS = ("float32", "float16", "int8", "pq")
+
+# Rows converted to float32 and added to the index per step, so building from a
+# memory-mapped embedding file never materializes the full float32 matrix
+ADD_CHUNK_SIZE = 65536
 
 class FAISSIndex:
-    def __init__(self):
+    def __init__(self, backend: str = "torch", onnx_model_dir: str = "ml/model/e5-onnx",
+                 onnx_quantized: bool = True, num_threads: int = 0,
+                 storage: str = "float32", pq_m: int = 64, pq_nbits: int = 8):
+        """
+        Args:
+            backend: Query encoder, "torch" (SentenceTransformer) or "onnx" (ONNX Runtime on CPU)
+            onnx_model_dir: Directory produced by ``export_onnx_model`` for the onnx backend
+            onnx_quantized: Use the int8 dynamically quantized export
+            num_threads: CPU threads for the onnx backend; 0 lets the runtime decide
+            storage: How vectors are held in the index: "float32" (exact), "float16",
+                "int8" (scalar quantized) or "pq" (product-quantization codes). Compressed
+                formats are decoded on the fly during search.
+            pq_m: Number of PQ sub-quantizers; must divide the embedding dimension
+            pq_nbits: Bits per PQ code
+        """
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown encoder backend '{backend}', expected 'torch' or 'onnx'")
+        if storage not in STORAGE_FORMATS:
+            raise ValueError(f"Unknown storage format '{storage}', expected one of {STORAGE_FORMATS}")
         self.faiss_index = None
         self.player_ids = []
         self.embedding_dim = 768  # Adjust if your actual embedding dimension is different
         self.model = None  # Load the SentenceTransformer model
         self.model_name = "intfloat/multilingual-e5-large-instruct"
+        self.backend = backend
+        self.onnx_model_dir = onnx_model_dir
+        self.onnx_quantized = onnx_quantized
+        self.num_threads = num_threads
+        self.storage = storage
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
         
     def load_model(self):
-        """Loads the SentenceTransformer model."""
-        
+        """Loads the query encoder for the configured backend."""
+        if self.backend == "onnx":
+            from .onnx_encoder import OnnxEncoder
+
+            print(f"Loading ONNX encoder from {self.onnx_model_dir} (quantized={self.onnx_quantized})")
+            self.model = OnnxEncoder(self.onnx_model_dir, quantized=self.onnx_quantized,
+                                     num_threads=self.num_threads)
+            return
+
+        import torch
+        from sentence_transformers import SentenceTransformer
+
         device = 'mps' if torch.backends.mps.is_available() else 'cpu'
         print(f"Loading SentenceTransformer model: {self.model_name} on device: {device}")
         self.model = SentenceTransformer(self.model_name, device=device)
@@ -24,10 +65,13 @@ class FAISSIndex:
 
     def load_index(self, player_df, embedding_file="ml/model/player_embeddings_4000.npy"):
         """Loads pre-computed embeddings from a pickle file and builds FAISS index."""
+        import faiss
+
         try:
             # with open(embedding_file, "rb") as f:
             #     embeddings = pickle.load(f)
-            embeddings = np.load(embedding_file)
+            # Memory-map so only one chunk at a time is held as float32 while building
+            embeddings = np.load(embedding_file, mmap_mode="r")
             self.player_ids = player_df['Actor'].astype(str).tolist()
             print(f"Type of loaded embeddings: {type(embeddings)}")
             # Ensure loaded embeddings are a numpy array and have the correct shape
@@ -47,10 +91,9 @@ class FAISSIndex:
                 print(f"Embedding dimension updated to {self.embedding_dim} based on loaded data.")
 
             # Build FAISS index
-            dimension = self.embedding_dim
-            self.faiss_index = faiss.IndexFlatL2(dimension)
-            self.faiss_index.add(embeddings)
-            print("FAISS index loaded successfully from pickle file.")
+            self.faiss_index = self.build_index(embeddings)
+            print(f"FAISS index loaded successfully ({self.storage}, "
+                  f"{self.index_memory_bytes() / 2**20:.1f} MB).")
         except FileNotFoundError:
             print(f"Error: Embedding file not found at {embedding_file}")
             raise
@@ -58,11 +101,85 @@ class FAISSIndex:
             print(f"Error loading and building FAISS index: {e}")
             raise
 
+    def build_index(self, embeddings: np.ndarray, storage: str = None):
+        """
+        Builds a FAISS index over ``embeddings`` in the requested storage format.
+
+        Quantized formats are trained on a sample of the vectors before adding; all
+        vectors are added in chunks so a memory-mapped float32 file is never copied whole.
+        """
+        import faiss
+
+        storage = storage or self.storage
+        dimension = embeddings.shape[1]
+        if storage == "float32":
+            index = faiss.IndexFlatL2(dimension)
+        elif storage == "float16":
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+        elif storage == "int8":
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+        else:
+            if dimension % self.pq_m:
+                raise ValueError(f"pq_m={self.pq_m} must divide the embedding dimension {dimension}")
+            index = faiss.IndexPQ(dimension, self.pq_m, self.pq_nbits, faiss.METRIC_L2)
+
+        if not index.is_trained:
+            # A few hundred vectors per centroid is plenty for PQ/SQ training
+            sample_size = min(len(embeddings), max(256 * (1 << self.pq_nbits), 10000))
+            sample_rows = np.sort(np.random.default_rng(0).choice(len(embeddings), sample_size, replace=False))
+            index.train(np.ascontiguousarray(embeddings[sample_rows], dtype="float32"))
+
+        for start in range(0, len(embeddings), ADD_CHUNK_SIZE):
+            index.add(np.ascontiguousarray(embeddings[start:start + ADD_CHUNK_SIZE], dtype="float32"))
+        return index
+
+    def index_memory_bytes(self) -> int:
+        """
+        Memory held by the current index: its stored codes plus the PQ codebook or
+        scalar-quantizer ranges. Computed from the index layout, since serializing the
+        index to measure it would copy the whole index.
+        """
+        import faiss
+
+        index = self.faiss_index
+        if index is None:
+            return 0
+        size = index.ntotal * index.code_size
+        if isinstance(index, faiss.IndexPQ):
+            size += index.pq.centroids.size() * 4
+        elif isinstance(index, faiss.IndexScalarQuantizer):
+            size += index.sq.trained.size() * 4
+        return size
+
+    def save_index(self, index_file: str):
+        """Writes the (possibly compressed) index so scoring nodes can skip the float32 file."""
+        import faiss
+
+        faiss.write_index(self.faiss_index, index_file)
+
+    def load_saved_index(self, player_df, index_file: str, mmap: bool = False):
+        """
+        Loads an index written by ``save_index``.
+
+        With ``mmap`` the stored codes are memory-mapped instead of read into memory,
+        so worker processes on one machine share their pages. Every storage format is
+        an ``IndexFlatCodes`` (flat, scalar-quantized or PQ), which only
+        ``IO_FLAG_MMAP_IFC`` maps; plain ``IO_FLAG_MMAP`` covers inverted lists alone.
+        """
+        import faiss
+
+        flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_MMAP if mmap else 0
+        self.faiss_index = faiss.read_index(index_file, flags)
+        self.embedding_dim = self.faiss_index.d
+        self.player_ids = player_df['Actor'].astype(str).tolist()
+
     def get_embedding_for_player(self, player_id: str, embedding_file="ml/model/player_embeddings.pkl"):
         """
         Retrieves the pre-computed embedding for a specific player from the embeddings file.
         """
         try:
+            from src.data_ingestion.load_data import load_player_data
+
             with open(embedding_file, "rb") as f:
                 embeddings = pickle.load(f)
 
@@ -81,15 +198,18 @@ class FAISSIndex:
             print(f"Error loading embeddings: {e}")
             return None
 
-    def search(self, query_text: str, top_k: int = 5) -> List[str]:
-        """Finds similar players using FAISS index based on a pre-computed embedding."""
-        
-        # Load model if not already loaded
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encodes texts with the configured backend, loading it on first use."""
         if self.model is None:
             self.load_model()
-        
-        query_embedding = self.model.encode([query_text], convert_to_tensor=True)
-        query_embedding = query_embedding.cpu().numpy() 
+
+        if self.backend == "onnx":
+            return self.model.encode(texts)
+        return self.model.encode(texts, convert_to_tensor=True).cpu().numpy()
+
+    def search(self, query_text: str, top_k: int = 5) -> List[str]:
+        """Finds similar players using FAISS index based on a pre-computed embedding."""
+        query_embedding = self.encode([query_text])
         
         if self.faiss_index is None:
             return ["Error: FAISS index not initialized. Load the index first."]
@@ -101,3 +221,13 @@ class FAISSIndex:
         similar_player_ids = [self.player_ids[i] for i in I[0]]
         return similar_player_ids
 
+    def search_batch(self, query_texts: List[str], top_k: int = 5) -> List[List[str]]:
+        """Encodes ``query_texts`` in one batch and runs a single FAISS search for all of them."""
+        if self.faiss_index is None:
+            raise RuntimeError("FAISS index not initialized. Load the index first.")
+        if not query_texts:
+            return []
+        query_embeddings = self.encode(list(query_texts)).reshape(len(query_texts), -1)
+        _, I = self.faiss_index.search(query_embeddings.astype('float32'), top_k)
+        return [[self.player_ids[i] for i in row if i >= 0] for row in I]
+
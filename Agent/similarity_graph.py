@@ -0,0 +1,113 @@
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+# Queries per FAISS search call; bounds the distance/id matrices held at once
+SEARCH_CHUNK_SIZE = 65536
+
+
+def nearest_neighbours(index, vectors, k: int, chunk_size: int = SEARCH_CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Searches every row of ``vectors`` against ``index`` for its ``k`` nearest other rows.
+
+    The whole population is searched in a few large batched calls rather than one
+    query per player. Yields ``(first_row, distances, ids)`` per chunk with each row's
+    own hit dropped, so ``ids`` holds up to ``k`` neighbours (-1 where fewer exist).
+    """
+    for start in range(0, len(vectors), chunk_size):
+        queries = np.ascontiguousarray(vectors[start:start + chunk_size], dtype="float32")
+        distances, ids = index.search(queries, k + 1)
+        rows = np.arange(start, start + len(queries))[:, None]
+        # Drop the query itself; if it is not among the hits, drop the farthest one instead
+        keep = ids != rows
+        keep[keep.all(axis=1), -1] = False
+        yield (start,
+               distances[keep].reshape(len(queries), k),
+               ids[keep].reshape(len(queries), k))
+
+
+def similar_to_rows(player_ids: Sequence[str], start: int, distances: np.ndarray, ids: np.ndarray,
+                    build_id: str) -> List[Dict[str, Any]]:
+    """Edge rows for ``CypherQueries.create_similar_to_relationships``, weighted 1 / (1 + L2 distance)."""
+    rows = []
+    for offset, (row_distances, row_ids) in enumerate(zip(distances, ids)):
+        source = player_ids[start + offset]
+        for rank, (distance, neighbour) in enumerate(zip(row_distances, row_ids), start=1):
+            if neighbour < 0:
+                continue
+            rows.append({
+                "source": source,
+                "target": player_ids[neighbour],
+                "score": float(1.0 / (1.0 + max(float(distance), 0.0))),
+                "rank": rank,
+                "build_id": build_id,
+            })
+    return rows
+
+
+def build_similar_to_edges(graph, player_ids: Sequence[str], vectors, index=None, k: int = 3,
+                           batch_size: int = 5000) -> Dict[str, Any]:
+    """
+    Precomputes ``SIMILAR_TO`` edges from every player to its ``k`` nearest neighbours.
+
+    Neighbours come from one bulk FAISS search over ``vectors`` (text embeddings or
+    standardized numeric feature vectors, row-aligned with ``player_ids``) and are
+    written in ``UNWIND`` batches. Every edge is stamped with a build id, and edges
+    left over from earlier builds are deleted afterwards, so re-running the job
+    replaces the neighbourhoods in place.
+
+    Args:
+        graph: Data-access layer with ``write``/``write_batches``
+        player_ids: Player id per row of ``vectors``
+        vectors: 2D array-like, may be memory-mapped
+        index: FAISS index over ``vectors``; an exact L2 index is built if omitted
+        k: Neighbours per player
+        batch_size: Edges per write transaction
+
+    Returns:
+        Edge and timing counts for the build.
+    """
+    from src.data_ingestion.queries import CypherQueries
+
+    queries = CypherQueries()
+    if index is None:
+        import faiss
+
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        for start in range(0, len(vectors), SEARCH_CHUNK_SIZE):
+            index.add(np.ascontiguousarray(vectors[start:start + SEARCH_CHUNK_SIZE], dtype="float32"))
+
+    build_id = uuid.uuid4().hex
+    player_ids = [str(pid) for pid in player_ids]
+    search_s, written = 0.0, 0
+    start_time = time.perf_counter()
+    chunk_start = time.perf_counter()
+    for start, distances, ids in nearest_neighbours(index, vectors, k):
+        search_s += time.perf_counter() - chunk_start
+        written += graph.write_batches(queries.create_similar_to_relationships(),
+                                       similar_to_rows(player_ids, start, distances, ids, build_id), batch_size)
+        print(f"SIMILAR_TO: {min(start + len(ids), len(player_ids))}/{len(player_ids)} players linked")
+        chunk_start = time.perf_counter()
+
+    deleted = 0
+    while True:
+        result = graph.write(queries.delete_stale_similar_to(), {"build_id": build_id, "limit": batch_size})
+        removed = result[0]["deleted"] if result else 0
+        deleted += removed
+        if removed < batch_size:
+            break
+
+    stats = {
+        "build_id": build_id,
+        "players": len(player_ids),
+        "k": k,
+        "edges_written": written,
+        "stale_edges_deleted": deleted,
+        "search_s": search_s,
+        "total_s": time.perf_counter() - start_time,
+    }
+    print(f"SIMILAR_TO build {build_id}: {written} edges, {deleted} stale edges removed "
+          f"in {stats['total_s']:.1f}s")
+    return stats
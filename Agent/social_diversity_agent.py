@@ -1,16 +1,17 @@
 import os
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, TYPE_CHECKING
 # from langchain_community.graphs import Neo4jGraph
-from langchain_neo4j import Neo4jGraph
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
 
 from .prompts_v2 import social_diversity_prompt
-import numpy as np
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+    from langchain_neo4j import Neo4jGraph
 
 # Initialize LLM and Neo4j Graph
 
-def extract_player_social_diversity_features(player_id: str, graph: Neo4jGraph) -> dict:
+def extract_player_social_diversity_features(player_id: str, graph: "Neo4jGraph") -> dict:
     """
     Extracts features from the knowledge graph for a given player.
     """
@@ -27,31 +28,43 @@ def extract_player_social_diversity_features(player_id: str, graph: Neo4jGraph)
     else:
         return {}
 
-prompt_template = social_diversity_prompt()
-
-if prompt_template:
-    prompt = ChatPromptTemplate.from_template(prompt_template)
-else:
-    prompt = None  
-def assess_social_bot_likelihood(player_data: dict, llm: ChatGroq) -> tuple[int, str, str]:
-    """Assesses the likelihood of a player being a bot using LLM, considering player statistics and insights from similar players."""
+def extract_player_social_diversity_features_batch(player_ids: List[str], graph: "Neo4jGraph") -> Dict[str, dict]:
+    """Extracts social-diversity features for many players in one round trip, keyed by the requested id."""
+    query = """
+    UNWIND $player_ids AS requested_id
+    MATCH (p:Player {Actor: toInteger(requested_id)})
+    RETURN
+        requested_id,
+        p.Actor AS player_id,
+        p.A_Acc AS a_acc,
+        p.Social_diversity AS social_diversity
+    """
+    results = graph.query(query, {"player_ids": [str(pid) for pid in player_ids]})
+    return {row.pop("requested_id"): row for row in results}
+
+@lru_cache(maxsize=None)
+def get_prompt(score_only: bool = False):
+    """Builds the chat prompt on first use rather than at import time; ``score_only`` asks for the score alone."""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    prompt_template = social_diversity_prompt(score_only)
+    if prompt_template:
+        return ChatPromptTemplate.from_template(prompt_template)
+    return None  # Handle the case where the prompt couldn't be loaded
+
+def format_social_prompt(player_data: dict, score_only: bool = False):
+    """Formats the social-diversity prompt messages, or returns None when the prompt couldn't be loaded."""
+    prompt = get_prompt(score_only)
     if prompt is None:
-        return None, "Prompt could not be loaded", None
-
-    # Get insights from similar playersimple concatenation for now
-
-    # Format the prompt
-    formatted_prompt = prompt.format_messages(
+        return None
+    return prompt.format_messages(
         actor=player_data['player_id'],
         a_acc=player_data['a_acc'],
         social_diversity=player_data['social_diversity']
     )
 
-    # Call the LLM directly
-    response = llm.invoke(formatted_prompt)
-    full_analysis = response.content
-
-    # Extract Anomaly Score and Reasoning
+def parse_social_response(full_analysis: str) -> tuple[int, str]:
+    """Extracts the Anomaly Score line and the reasoning that follows it."""
     try:
         score_line = next(line for line in full_analysis.split('\n') if "Anomaly Score" in line)
         anomaly_score = int(score_line.split(":")[1].strip())
@@ -60,7 +73,20 @@ def assess_social_bot_likelihood(player_data: dict, llm: ChatGroq) -> tuple[int,
     except Exception as e:
         anomaly_score = None
         reasoning = f"Could not reliably parse LLM response: {str(e)}"
+    return anomaly_score, reasoning
+
+def assess_social_bot_likelihood(player_data: dict, llm: "ChatGroq", score_only: bool = False) -> tuple[int, str, str]:
+    """Assesses the likelihood of a player being a bot using LLM, considering player statistics and insights from similar players."""
+    formatted_prompt = format_social_prompt(player_data, score_only)
+    if formatted_prompt is None:
+        return None, "Prompt could not be loaded", None
+
+    # Call the LLM directly
+    response = llm.invoke(formatted_prompt)
+    full_analysis = response.content
 
+    # Extract Anomaly Score and Reasoning
+    anomaly_score, reasoning = parse_social_response(full_analysis)
     return anomaly_score, reasoning, full_analysis
 
 def generate_bot_report(player_ids: list[str], faiss_index) -> list[dict]:
@@ -0,0 +1,147 @@
+"""
+Parity and throughput comparison of the PyTorch and ONNX query encoders.
+
+Encodes the same player feature strings with the SentenceTransformer model and the
+ONNX export, then reports:
+
+* parity: per-row cosine similarity between the two embeddings, and top-k overlap
+  of FAISS neighbours found with each against the stored player embeddings
+* speed: single-query latency (p50/p95) and batch throughput
+* memory: resident set size growth from loading each model
+
+    python benchmarks/embedding_backends.py --export      # once, writes ml/model/e5-onnx
+    python benchmarks/embedding_backends.py --samples 256 --threads 8
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import import_paths  # noqa: F401  (maps ml / src.data_ingestion onto this checkout)
+from ml.onnx_encoder import export_onnx_model
+from ml.search_agent import FAISSIndex
+from src.data_ingestion.load_data import load_player_data
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS when psutil is unavailable)."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def player_texts(limit: int) -> List[str]:
+    """Feature strings in the same form the orchestrator sends to the encoder."""
+    player_df = load_player_data().head(limit)
+    return [str(row) for row in player_df.to_dict(orient="records")]
+
+
+def time_backend(index: FAISSIndex, texts: List[str], single_queries: int) -> Dict[str, Any]:
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    index.load_model()
+    load_s = time.perf_counter() - start
+    rss_after = rss_mb()
+
+    index.encode(texts[:2])  # warm-up
+    latencies = []
+    for text in texts[:single_queries]:
+        start = time.perf_counter()
+        index.encode([text])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    embeddings = index.encode(texts)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "embeddings": embeddings,
+        "stats": {
+            "load_s": load_s,
+            "model_rss_mb": rss_after - rss_before,
+            "latency_p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "latency_p95_ms": float(np.percentile(latencies, 95) * 1000),
+            "throughput_texts_per_s": len(texts) / batch_s,
+        },
+    }
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray, index: FAISSIndex, top_k: int) -> Dict[str, Any]:
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = (ref * cand).sum(axis=1)
+
+    result = {
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        "topk_overlap": None,
+    }
+    if index.faiss_index is not None:
+        _, ref_ids = index.faiss_index.search(reference.astype("float32"), top_k)
+        _, cand_ids = index.faiss_index.search(candidate.astype("float32"), top_k)
+        overlap = [len(set(r) & set(c)) / top_k for r, c in zip(ref_ids, cand_ids)]
+        result["topk_overlap"] = float(np.mean(overlap))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PyTorch and ONNX query encoders.")
+    parser.add_argument("--export", action="store_true", help="Export the ONNX model before benchmarking")
+    parser.add_argument("--onnx-dir", default="ml/model/e5-onnx")
+    parser.add_argument("--full-precision", action="store_true", help="Benchmark model.onnx instead of the int8 export")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--samples", type=int, default=128)
+    parser.add_argument("--single-queries", type=int, default=32)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--output", default="benchmarks/results/embedding_backends.json")
+    args = parser.parse_args()
+
+    if args.export:
+        export_onnx_model(FAISSIndex().model_name, args.onnx_dir, quantize=True)
+
+    texts = player_texts(args.samples)
+
+    torch_index = FAISSIndex(backend="torch")
+    try:
+        torch_index.load_index(load_player_data())
+    except Exception as e:
+        print(f"Stored embeddings unavailable, skipping neighbour overlap: {e}")
+    torch_run = time_backend(torch_index, texts, args.single_queries)
+
+    onnx_index = FAISSIndex(backend="onnx", onnx_model_dir=args.onnx_dir,
+                            onnx_quantized=not args.full_precision, num_threads=args.threads)
+    onnx_run = time_backend(onnx_index, texts, args.single_queries)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "samples": len(texts),
+        "threads": args.threads,
+        "quantized": not args.full_precision,
+        "torch": torch_run["stats"],
+        "onnx": onnx_run["stats"],
+        "parity": parity(torch_run["embeddings"], onnx_run["embeddings"], torch_index, args.top_k),
+        "speedup_p50": torch_run["stats"]["latency_p50_ms"] / onnx_run["stats"]["latency_p50_ms"],
+        "speedup_throughput": onnx_run["stats"]["throughput_texts_per_s"] / torch_run["stats"]["throughput_texts_per_s"],
+    }
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Memory footprint versus recall@k for the FAISSIndex storage formats.
+
+Builds one index per storage format over the stored player embeddings and compares
+its neighbours with exact float32 search. Queries are a random sample of the stored
+vectors, searched with k+1 and the query itself dropped, mirroring similar-player lookup.
+
+    python benchmarks/embedding_storage.py --queries 1000 --k 10
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import import_paths  # noqa: F401  (maps ml / src.data_ingestion onto this checkout)
+from ml.search_agent import STORAGE_FORMATS, FAISSIndex
+
+
+def neighbours(index, queries: np.ndarray, query_rows: np.ndarray, k: int) -> np.ndarray:
+    _, ids = index.search(queries, k + 1)
+    # Drop the query itself wherever it shows up in its own result list
+    return np.array([[i for i in row if i != q][:k] for row, q in zip(ids, query_rows)])
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding storage formats.")
+    parser.add_argument("--embedding-file", default="ml/model/player_embeddings_4000.npy")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--pq-m", type=int, default=64)
+    parser.add_argument("--pq-nbits", type=int, default=8)
+    parser.add_argument("--output", default="benchmarks/results/embedding_storage.json")
+    args = parser.parse_args()
+
+    embeddings = np.load(args.embedding_file, mmap_mode="r")
+    rng = np.random.default_rng(0)
+    query_rows = np.sort(rng.choice(len(embeddings), min(args.queries, len(embeddings)), replace=False))
+    queries = np.ascontiguousarray(embeddings[query_rows], dtype="float32")
+
+    results = {}
+    truth = None
+    for storage in STORAGE_FORMATS:
+        faiss_index = FAISSIndex(storage=storage, pq_m=args.pq_m, pq_nbits=args.pq_nbits)
+        faiss_index.faiss_index = faiss_index.build_index(embeddings)
+        found = neighbours(faiss_index.faiss_index, queries, query_rows, args.k)
+        if truth is None:
+            truth = found  # float32 is first and exact
+        memory = faiss_index.index_memory_bytes()
+        results[storage] = {
+            "memory_mb": memory / 2**20,
+            "bytes_per_player": memory / len(embeddings),
+            f"recall@{args.k}": recall_at_k(truth, found),
+        }
+        print(f"{storage:8s} {results[storage]['memory_mb']:10.1f} MB "
+              f"{results[storage]['bytes_per_player']:8.0f} B/player "
+              f"recall@{args.k}={results[storage][f'recall@{args.k}']:.3f}")
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "players": len(embeddings),
+        "dimension": embeddings.shape[1],
+        "queries": len(query_rows),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Startup benchmark: measures import time of the project's entry-point modules.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` so results are
+not skewed by modules already loaded. For every module we record the wall time of
+the import and the slowest transitive imports, then write everything to JSON so
+regressions (a heavy dependency creeping back into module scope) are easy to spot.
+
+    python benchmarks/import_time.py --repeat 3 --max-seconds 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "main",
+    "evaluate",
+    "ml.search_agent",
+    "ml.anomaly_scoring_agent",
+    "ml.social_diversity_agent",
+    "ml.player_actions_agent",
+    "src.data_ingestion.load_data",
+    "src.data_ingestion.neo4j_driver",
+]
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parses ``-X importtime`` lines into (module, self_us, cumulative_us) records."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        records.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return records
+
+
+def measure_module(module: str, top: int = 10) -> Dict[str, Any]:
+    """Imports ``module`` in a clean interpreter and returns its import profile."""
+    code = (
+        # import_paths maps ml / src.data_ingestion onto the checkout; it is not part of the measurement
+        "import time, sys, import_paths; start = time.perf_counter(); "
+        f"import {module}; "
+        "sys.stdout.write(str(time.perf_counter() - start))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"module": module, "error": proc.stderr.strip().splitlines()[-1:]}
+
+    records = parse_importtime(proc.stderr)
+    slowest = sorted(records, key=lambda r: r["cumulative_us"], reverse=True)
+    return {
+        "module": module,
+        "wall_s": float(proc.stdout.strip()),
+        "modules_imported": len(records),
+        "slowest_imports": slowest[:top],
+    }
+
+
+def run(modules: List[str], repeat: int, top: int) -> Dict[str, Any]:
+    results = {}
+    for module in modules:
+        runs = [measure_module(module, top) for _ in range(repeat)]
+        if any("error" in r for r in runs):
+            results[module] = next(r for r in runs if "error" in r)
+            continue
+        best = min(runs, key=lambda r: r["wall_s"])
+        best["median_wall_s"] = statistics.median(r["wall_s"] for r in runs)
+        results[module] = best
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time per module.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest transitive imports to keep")
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results", "import_time.json"))
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Exit non-zero if any module's median import time exceeds this")
+    args = parser.parse_args()
+
+    report = run(args.modules, args.repeat, args.top)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    failed = False
+    for module, result in report["results"].items():
+        if "error" in result:
+            print(f"{module:40s} ERROR {result['error']}")
+            failed = True
+            continue
+        print(f"{module:40s} {result['median_wall_s']:.3f}s ({result['modules_imported']} modules)")
+        if args.max_seconds is not None and result["median_wall_s"] > args.max_seconds:
+            print(f"  exceeds budget of {args.max_seconds:.3f}s; slowest: {result['slowest_imports'][0]['module']}")
+            failed = True
+    print(f"Results written to {args.output}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
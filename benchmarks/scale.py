@@ -0,0 +1,288 @@
+"""
+Ingestion and scoring benchmarks at production scale, on synthetic HCRL-shaped data.
+
+Generates (or reuses) a synthetic dataset with ``benchmarks/synthetic_data.py`` and times:
+
+* CSV loading through ``src/load_data.py``
+* numeric feature index build and single-player search latency (p50/p99)
+* FAISS build and search per storage format over random vectors of the embedding size
+* with ``--neo4j``: knowledge graph population per stage, and per-player versus batched
+  feature extraction for the three agents (uses the NEO4J_* variables; writes to that database)
+
+Every run appends one record, tagged with the git commit, to
+``benchmarks/results/scale_history.jsonl`` and is compared with the previous run at
+the same scale, so a slowdown between versions shows up as a regression line.
+
+    python benchmarks/scale.py --actors 100000
+    python benchmarks/scale.py --actors 1000000 --neo4j --fail-on-regression 1.25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_data import TABLE_FILES, generate
+
+HISTORY_FILE = os.path.join(REPO_ROOT, "benchmarks", "results", "scale_history.jsonl")
+
+
+def git_version() -> str:
+    try:
+        proc = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=REPO_ROOT,
+                              capture_output=True, text=True)
+        return proc.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    ms = np.array(seconds) * 1000.0
+    return {"p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)), "mean_ms": float(ms.mean())}
+
+
+def bench_csv_load(data_dir: str) -> Dict[str, Any]:
+    from src.data_ingestion import load_data
+
+    load_data.DATA_DIR = data_dir
+    loaders = {
+        "player": load_data.load_player_data,
+        "action": load_data.load_action_data,
+        "social": load_data.load_social_data,
+        "group": load_data.load_group_data,
+        "network": load_data.load_network_data,
+    }
+    tables, timings = {}, {}
+    for name, loader in loaders.items():
+        start = time.perf_counter()
+        tables[name] = loader()
+        timings[f"{name}_s"] = time.perf_counter() - start
+    timings["total_s"] = sum(timings.values())
+    return {"timings": timings, "tables": tables}
+
+
+def bench_numeric_index(tables, queries: int, k: int) -> Dict[str, float]:
+    from ml.numeric_search import NumericFeatureIndex
+
+    start = time.perf_counter()
+    features = NumericFeatureIndex.join_feature_tables(tables)
+    join_s = time.perf_counter() - start
+
+    index = NumericFeatureIndex()
+    start = time.perf_counter()
+    index.build(features)
+    build_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    player_ids = rng.choice(index.player_ids, min(queries, len(index.player_ids)), replace=False)
+    latencies = []
+    for player_id in player_ids:
+        start = time.perf_counter()
+        index.search(player_id, k)
+        latencies.append(time.perf_counter() - start)
+    return {"join_s": join_s, "build_s": build_s, **{f"search_{m}": v for m, v in latency_summary(latencies).items()}}
+
+
+def bench_faiss(actors: int, dim: int, queries: int, k: int, storages: List[str], max_vectors: int) -> Dict[str, Any]:
+    from ml.search_agent import FAISSIndex
+
+    n = min(actors, max_vectors)
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((n, dim), dtype="float32")
+    query_vectors = embeddings[rng.choice(n, min(queries, n), replace=False)]
+
+    results = {}
+    for storage in storages:
+        faiss_index = FAISSIndex(storage=storage)
+        start = time.perf_counter()
+        faiss_index.faiss_index = faiss_index.build_index(embeddings)
+        build_s = time.perf_counter() - start
+
+        latencies = []
+        for vector in query_vectors:
+            start = time.perf_counter()
+            faiss_index.faiss_index.search(vector[None, :], k)
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        faiss_index.faiss_index.search(query_vectors, k)
+        batch_s = time.perf_counter() - start
+
+        results[storage] = {
+            "build_s": build_s,
+            "memory_mb": faiss_index.index_memory_bytes() / 2**20,
+            "batch_search_s": batch_s,
+            **{f"search_{m}": v for m, v in latency_summary(latencies).items()},
+        }
+    return {"vectors": n, "dimension": dim, "results": results}
+
+
+def bench_graph_population(tables, batch_size: int) -> Dict[str, float]:
+    from src.data_ingestion.kg_population import KnowledgeGraphPopulator
+
+    populator = KnowledgeGraphPopulator(batch_size=batch_size, tables=tables)
+    start = time.perf_counter()
+    timings = {f"{stage}_s": seconds for stage, seconds in populator.populate_knowledge_graph().items()}
+    timings["total_s"] = time.perf_counter() - start
+    return timings
+
+
+def bench_feature_extraction(player_ids: List[str], batch_size: int) -> Dict[str, Any]:
+    from ml.anomaly_scoring_agent import extract_player_features, extract_player_features_batch
+    from ml.player_actions_agent import extract_player_action_features, extract_player_action_features_batch
+    from ml.social_diversity_agent import (
+        extract_player_social_diversity_features,
+        extract_player_social_diversity_features_batch,
+    )
+    from src.data_ingestion.neo4j_driver import connect_from_env
+
+    graph = connect_from_env()
+    extractors = {
+        "anomaly": (extract_player_features, extract_player_features_batch),
+        "social_diversity": (extract_player_social_diversity_features, extract_player_social_diversity_features_batch),
+        "player_action": (extract_player_action_features, extract_player_action_features_batch),
+    }
+    results = {}
+    for name, (single, batch) in extractors.items():
+        latencies = []
+        for player_id in player_ids:
+            start = time.perf_counter()
+            single(player_id, graph)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(0, len(player_ids), batch_size):
+            batch(player_ids[i:i + batch_size], graph)
+        batch_s = time.perf_counter() - start
+        results[name] = {
+            "single_total_s": sum(latencies),
+            "batch_total_s": batch_s,
+            **{f"single_{m}": v for m, v in latency_summary(latencies).items()},
+        }
+    return results
+
+
+def flatten(report: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flattens nested benchmark results into dotted metric names, keeping only durations."""
+    metrics = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and (key.endswith("_s") or key.endswith("_ms")):
+            metrics[name] = float(value)
+    return metrics
+
+
+def previous_run(history_file: str, actors: int):
+    if not os.path.exists(history_file):
+        return None
+    previous = None
+    with open(history_file) as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("actors") == actors:
+                previous = record
+    return previous
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], threshold: float) -> List[str]:
+    """Lists metrics that got more than ``threshold`` times slower than in ``previous``."""
+    before, after = flatten(previous["results"]), flatten(current["results"])
+    regressions = []
+    for name, value in sorted(after.items()):
+        old = before.get(name)
+        # Sub-millisecond timings are noise-dominated; skip them
+        if not old or max(old, value) < 1e-3:
+            continue
+        ratio = value / old
+        if ratio > threshold:
+            regressions.append(f"{name}: {old:.4g} -> {value:.4g} ({ratio:.2f}x, was {previous['version']})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, feature extraction and search at scale.")
+    parser.add_argument("--actors", type=int, default=100_000)
+    parser.add_argument("--bot-fraction", type=float, default=0.1)
+    parser.add_argument("--data-dir", default=None,
+                        help="Synthetic dataset to use; generated there if missing (default data/synthetic/<actors>)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension for the FAISS benchmark")
+    parser.add_argument("--faiss-storage", nargs="*", default=["float32", "float16", "int8", "pq"])
+    parser.add_argument("--faiss-max-vectors", type=int, default=2_000_000,
+                        help="Caps the random embedding matrix so 10M-actor runs fit in memory")
+    parser.add_argument("--neo4j", action="store_true", help="Also benchmark graph population and feature extraction")
+    parser.add_argument("--write-batch-size", type=int, default=1000)
+    parser.add_argument("--extract-players", type=int, default=200)
+    parser.add_argument("--extract-batch-size", type=int, default=100)
+    parser.add_argument("--history-file", default=HISTORY_FILE)
+    parser.add_argument("--fail-on-regression", type=float, default=None, metavar="RATIO",
+                        help="Exit non-zero if any timing is more than RATIO times the previous run's")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or os.path.join(REPO_ROOT, "data", "synthetic", str(args.actors))
+    if not all(os.path.exists(os.path.join(data_dir, f)) for f in TABLE_FILES.values()):
+        generate(data_dir, args.actors, args.bot_fraction)
+
+    results: Dict[str, Any] = {}
+    csv = bench_csv_load(data_dir)
+    tables = csv.pop("tables")
+    results["csv_load"] = csv["timings"]
+    print(f"CSV load: {results['csv_load']['total_s']:.2f}s")
+
+    results["numeric_index"] = bench_numeric_index(tables, args.queries, args.k)
+    print(f"Numeric index: build {results['numeric_index']['build_s']:.2f}s, "
+          f"search p50 {results['numeric_index']['search_p50_ms']:.2f}ms "
+          f"p99 {results['numeric_index']['search_p99_ms']:.2f}ms")
+
+    results["faiss"] = bench_faiss(args.actors, args.dim, args.queries, args.k,
+                                   args.faiss_storage, args.faiss_max_vectors)
+    for storage, r in results["faiss"]["results"].items():
+        print(f"FAISS {storage:8s} build {r['build_s']:.2f}s, {r['memory_mb']:.1f} MB, "
+              f"search p50 {r['search_p50_ms']:.2f}ms p99 {r['search_p99_ms']:.2f}ms")
+
+    if args.neo4j:
+        results["graph_population"] = bench_graph_population(tables, args.write_batch_size)
+        print(f"Graph population: {results['graph_population']['total_s']:.1f}s")
+        sample = tables["player"]["Actor"].sample(min(args.extract_players, len(tables["player"])), random_state=0)
+        results["feature_extraction"] = bench_feature_extraction(sample.astype(str).tolist(), args.extract_batch_size)
+        for name, r in results["feature_extraction"].items():
+            print(f"Extraction {name:16s} single {r['single_total_s']:.2f}s (p50 {r['single_p50_ms']:.1f}ms), "
+                  f"batched {r['batch_total_s']:.2f}s")
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "version": git_version(),
+        "python": sys.version.split()[0],
+        "actors": args.actors,
+        "neo4j": args.neo4j,
+        "results": results,
+    }
+    previous = previous_run(args.history_file, args.actors)
+    os.makedirs(os.path.dirname(args.history_file), exist_ok=True)
+    with open(args.history_file, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Results appended to {args.history_file}")
+
+    if previous is None:
+        print(f"No previous run at {args.actors} actors to compare against")
+        return
+    regressions = compare(record, previous, args.fail_on_regression or 1.25)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions against {previous['version']}")
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Synthetic HCRL-shaped dataset generator.
+
+Writes the player, action, social, group and network feature tables with the exact
+column schema of the HCRL "(after)" CSVs, under the file names ``src/load_data.py``
+reads. Point the loaders at the output with ``HCRL_DATA_DIR``. Rows are generated and
+appended in chunks, so 10M actors never need more than one chunk in memory.
+
+Bots and humans are drawn from separate distributions that follow the contrasts
+reported for the HCRL data: bots play far longer and more regularly, from few IPs,
+with action mixes dominated by collecting (exp/item/money/abyss gets), low social
+diversity, little guild activity, and sparse social graphs apart from trade outflow.
+
+    python benchmarks/synthetic_data.py --actors 1000000 --output-dir data/synthetic/1m
+    HCRL_DATA_DIR=data/synthetic/1m python main.py --sample-size 100
+"""
+import argparse
+import os
+import sys
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import import_paths  # noqa: F401  (maps ml / src.data_ingestion onto this checkout)
+from src.data_ingestion.load_data import ACTION_FILE, GROUP_FILE, NETWORK_FILE, PLAYER_FILE, SOCIAL_FILE
+
+RATIO_ACTIONS = ("Sit", "Exp_get", "Item_get", "Money_get", "Abyss_get")
+COUNT_ACTIONS = ("Exp_repair", "Use_portal", "Killed_bypc", "Killed_bynpc", "Teleport", "Reborn")
+COLLECT_ACTIONS = ("Exp_get", "Item_get", "Money_get", "Abyss_get")
+DIRECTED_GRAPHS = ("p", "f", "t", "m", "s", "w")
+CENTRALITY_GRAPHS = ("p", "f", "t", "c", "m")
+CENTRALITIES = ("between2", "closeness2", "Eigenvector2", "Eccentricity2", "Authority2", "Hub2", "Pagerank2")
+
+# Share of all actions per action type (Dirichlet means); the rest is untracked actions
+ACTION_MIX = {
+    "Human": {"Sit": 2.0, "Exp_get": 12.0, "Item_get": 6.0, "Money_get": 7.0, "Abyss_get": 6.0,
+              "Exp_repair": 0.2, "Use_portal": 0.3, "Killed_bypc": 1.5, "Killed_bynpc": 0.6,
+              "Teleport": 2.5, "Reborn": 0.1, "other": 62.0},
+    "Bot": {"Sit": 4.0, "Exp_get": 22.0, "Item_get": 12.0, "Money_get": 14.0, "Abyss_get": 9.0,
+            "Exp_repair": 0.4, "Use_portal": 0.05, "Killed_bypc": 0.3, "Killed_bynpc": 1.2,
+            "Teleport": 1.5, "Reborn": 0.3, "other": 35.0},
+}
+# Mean out-degree per interaction graph (party, friend, trade, mail, shop, whisper)
+DEGREE_MEANS = {
+    "Human": {"p": 30.0, "f": 8.0, "t": 6.0, "m": 3.0, "s": 1.0, "w": 15.0},
+    "Bot": {"p": 6.0, "f": 1.0, "t": 10.0, "m": 0.5, "s": 0.5, "w": 1.5},
+}
+
+
+def action_columns():
+    columns = ["collect_max_count"]
+    for name in RATIO_ACTIONS:
+        columns += [f"{name}_ratio", f"{name}_count", f"{name.lower()}_count_per_day"]
+    for name in COUNT_ACTIONS:
+        columns += [f"{name}_count", f"{name}_count_per_day"]
+    return columns
+
+
+def network_columns():
+    columns = []
+    for g in DIRECTED_GRAPHS:
+        columns += [f"{g}_in_deg", f"{g}_out_deg", f"{g}_Win_deg", f"{g}_Wout_deg", f"{g}_cc"]
+    for g in CENTRALITY_GRAPHS:
+        columns += [f"{g}_deg", f"{g}_Wdeg"] + [f"{g}_{c}" for c in CENTRALITIES]
+    return columns
+
+
+def _by_class(is_bot: np.ndarray, human, bot):
+    return np.where(is_bot, bot, human)
+
+
+def generate_chunk(rng: np.random.Generator, actors: np.ndarray, bot_fraction: float) -> Dict[str, pd.DataFrame]:
+    """Generates all five tables for the given actor ids."""
+    n = len(actors)
+    is_bot = rng.random(n) < bot_fraction
+    label = np.where(is_bot, "Bot", "Human")
+    a_acc = rng.integers(1_000_000, 9_999_999, n)
+    ids = {"Actor": actors, "A_Acc": a_acc}
+
+    # Player information
+    days = np.clip(np.round(rng.lognormal(_by_class(is_bot, 2.6, 3.4), _by_class(is_bot, 0.9, 0.5))), 1, 120)
+    playtime_per_day = np.minimum(rng.lognormal(_by_class(is_bot, 9.0, 10.6), _by_class(is_bot, 0.8, 0.3)), 86400.0)
+    login_count = days + rng.poisson(days * _by_class(is_bot, 1.2, 0.4))
+    player = pd.DataFrame({
+        **ids,
+        "Login_day_count": days.astype(int),
+        "Logout_day_count": np.maximum(days - rng.binomial(days.astype(int), 0.08), 0).astype(int),
+        "Playtime": np.round(playtime_per_day * days),
+        "playtime_per_day": np.round(playtime_per_day, 4),
+        "avg_money": np.round(rng.lognormal(_by_class(is_bot, 9.5, 10.5), 1.0), 4),
+        "Login_count": login_count.astype(int),
+        "ip_count": (1 + rng.poisson(_by_class(is_bot, days * 0.4, 1.5))).astype(int),
+        "Max_level": np.clip(np.round(rng.normal(_by_class(is_bot, 38, 55), _by_class(is_bot, 14, 6))), 1, 65).astype(int),
+        "Type": label,
+    })
+
+    # Player actions: total actions/day times a per-class Dirichlet action mix
+    actions_per_day = rng.lognormal(_by_class(is_bot, 6.0, 7.4), _by_class(is_bot, 0.8, 0.4))
+    total_actions = actions_per_day * days
+    action = {**ids}
+    mix = np.empty((n, len(ACTION_MIX["Human"])))
+    for cls, rows in (("Human", ~is_bot), ("Bot", is_bot)):
+        alpha = np.array(list(ACTION_MIX[cls].values())) * 2.0
+        mix[rows] = rng.dirichlet(alpha, rows.sum())
+    names = list(ACTION_MIX["Human"])
+    collect_share = mix[:, [names.index(a) for a in COLLECT_ACTIONS]].sum(axis=1)
+    action["collect_max_count"] = rng.poisson(_by_class(is_bot, 2.0, 7.0) * (0.5 + collect_share)).astype(int)
+    for i, name in enumerate(names[:-1]):
+        count = np.round(total_actions * mix[:, i])
+        if name in RATIO_ACTIONS:
+            action[f"{name}_ratio"] = np.round(100.0 * mix[:, i], 4)
+            action[f"{name}_count"] = count.astype(int)
+            action[f"{name.lower()}_count_per_day"] = np.round(count / days, 4)
+        else:
+            action[f"{name}_count"] = count.astype(int)
+            action[f"{name}_count_per_day"] = np.round(count / days, 4)
+    action["Type"] = label
+    action = pd.DataFrame(action)[["Actor", "A_Acc"] + action_columns() + ["Type"]]
+
+    social = pd.DataFrame({
+        **ids,
+        "Social_diversity": np.round(_by_class(is_bot, rng.beta(5, 4, n), rng.beta(2, 8, n)), 4),
+        "Type": label,
+    })
+    group = pd.DataFrame({
+        **ids,
+        "Avg_PartyTime": np.round(rng.lognormal(_by_class(is_bot, 7.4, 8.4), 1.0), 4),
+        "GuildAct_count": rng.poisson(_by_class(is_bot, 6.0, 0.4)).astype(int),
+        "GuildJoin_count": rng.poisson(_by_class(is_bot, 1.0, 0.1)).astype(int),
+        "Type": label,
+    })
+
+    network = {**ids}
+    for g in DIRECTED_GRAPHS:
+        human_mean, bot_mean = DEGREE_MEANS["Human"][g], DEGREE_MEANS["Bot"][g]
+        in_deg = rng.poisson(_by_class(is_bot, human_mean, bot_mean * (0.3 if g == "t" else 1.0)))
+        out_deg = rng.poisson(_by_class(is_bot, human_mean, bot_mean))
+        network[f"{g}_in_deg"] = in_deg
+        network[f"{g}_out_deg"] = out_deg
+        network[f"{g}_Win_deg"] = in_deg + rng.poisson(in_deg * 1.5)
+        network[f"{g}_Wout_deg"] = out_deg + rng.poisson(out_deg * 1.5)
+        network[f"{g}_cc"] = np.where(in_deg + out_deg > 1, rng.beta(1.2, _by_class(is_bot, 12, 30)), 0.0)
+    for g in CENTRALITY_GRAPHS:
+        deg = (network[f"{g}_in_deg"] + network[f"{g}_out_deg"]) if g != "c" else rng.poisson(_by_class(is_bot, 40, 8), n)
+        network[f"{g}_deg"] = deg
+        network[f"{g}_Wdeg"] = deg + rng.poisson(deg * _by_class(is_bot, 2.0, 0.5))
+        network[f"{g}_between2"] = np.round(rng.exponential(1e-4, n) * (deg > 1), 8)
+        network[f"{g}_closeness2"] = np.round(rng.uniform(0, 2, n) * (deg > 0), 6)
+        network[f"{g}_Eigenvector2"] = np.round(rng.beta(1, 5, n) * (deg > 0), 6)
+        network[f"{g}_Eccentricity2"] = rng.integers(1, 5, n) * (deg > 0)
+        network[f"{g}_Authority2"] = np.round(rng.exponential(1e-5, n), 8)
+        network[f"{g}_Hub2"] = np.round(rng.exponential(1e-5, n), 8)
+        network[f"{g}_Pagerank2"] = np.round(rng.exponential(1e-5, n), 8)
+    network["Type"] = label
+    network = pd.DataFrame(network)[["Actor", "A_Acc"] + network_columns() + ["Type"]]
+
+    return {"player": player, "action": action, "social": social, "group": group, "network": network}
+
+
+TABLE_FILES = {
+    "player": PLAYER_FILE,
+    "action": ACTION_FILE,
+    "social": SOCIAL_FILE,
+    "group": GROUP_FILE,
+    "network": NETWORK_FILE,
+}
+
+
+def generate(output_dir: str, actors: int, bot_fraction: float = 0.1, seed: int = 0,
+             chunk_size: int = 250_000) -> Dict[str, str]:
+    """
+    Writes ``actors`` synthetic actors to ``output_dir``, one CSV per table.
+
+    Returns:
+        Table name -> written CSV path.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = {name: os.path.join(output_dir, file) for name, file in TABLE_FILES.items()}
+    # Actor ids are unique and shuffled so shards and samples don't line up with generation order
+    actor_ids = rng.permutation(actors) + 1000
+    for start in range(0, actors, chunk_size):
+        tables = generate_chunk(rng, actor_ids[start:start + chunk_size], bot_fraction)
+        for name, df in tables.items():
+            df.to_csv(paths[name], mode="w" if start == 0 else "a", header=start == 0, index=False)
+        print(f"Generated {min(start + chunk_size, actors)}/{actors} actors")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic HCRL-shaped feature tables.")
+    parser.add_argument("--actors", type=int, default=10_000)
+    parser.add_argument("--bot-fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--output-dir", default=None, help="Defaults to data/synthetic/<actors>")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or os.path.join("data", "synthetic", str(args.actors))
+    generate(output_dir, args.actors, args.bot_fraction, args.seed, args.chunk_size)
+    print(f"Synthetic tables written to {output_dir}; use HCRL_DATA_DIR={output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Offline evaluation harness for the bot detection pipeline.
+
+Runs a configured scorer over a labelled split of the HCRL data and reports
+quality (precision/recall/F1, ROC AUC) next to cost and throughput (wall time,
+players/sec, LLM calls and tokens per player, cache hit rate). Results are
+written as JSON so runs can be compared against each other.
+
+    python evaluate.py --scorer llm --limit 200 --output eval_results/llm.json
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import import_paths  # noqa: F401  (maps ml / src.data_ingestion onto this checkout)
+from src.data_ingestion.load_data import load_social_data
+
+
+def load_labelled_split(split: str = "test", test_fraction: float = 0.3, seed: int = 42,
+                        limit: int = None) -> List[Tuple[str, int]]:
+    """
+    Returns (player_id, label) pairs for the requested split, with label 1 for Bot.
+
+    The split is stratified on the ``Type`` column so both classes keep their ratio.
+    """
+    social_df = load_social_data()
+    if social_df is None:
+        return []
+
+    rng = random.Random(seed)
+    selected = []
+    for _, group in social_df.groupby("Type"):
+        actors = group["Actor"].astype(int).astype(str).tolist()
+        rng.shuffle(actors)
+        cut = int(len(actors) * test_fraction)
+        chosen = actors[:cut] if split == "test" else actors[cut:]
+        label = 1 if group["Type"].iloc[0] == "Bot" else 0
+        selected.extend((actor, label) for actor in chosen)
+
+    rng.shuffle(selected)
+    return selected[:limit] if limit else selected
+
+
+def bot_probability(result: Dict[str, Any]) -> float:
+    """Orients a scorer result as a 0-100 bot score for ROC analysis."""
+    if result.get("bot_score") is not None:
+        return float(result["bot_score"])
+    confidence = result.get("confidence")
+    if confidence is not None and result.get("classification") in ("Bot", "Human"):
+        return confidence if result["classification"] == "Bot" else 100.0 - confidence
+    agent_scores = [s for s in result.get("agent_scores", []) if s is not None]
+    return float(max(agent_scores)) if agent_scores else 50.0
+
+
+def build_llm_scorer(args, fusion: str = None, cascade: bool = False,
+                     fast: bool = False) -> Tuple[Callable[[str], Dict[str, Any]], Callable[[], Dict[str, Any]]]:
+    """Full orchestrator pipeline: three agent LLM calls plus the LLM classifier."""
+    from main import build_orchestrator, parse_classification
+
+    orchestrator = build_orchestrator(llm_cache_path=args.llm_cache, fusion=fusion, cascade=cascade,
+                                      cascade_bot_exit=args.cascade_bot_exit,
+                                      cascade_human_exit=args.cascade_human_exit,
+                                      cascade_min_agents_bot=args.cascade_min_agents_bot, fast=fast)
+
+    def score(player_id: str) -> Dict[str, Any]:
+        state = orchestrator.score_player(player_id)
+        parsed = parse_classification(state["classification_result"])
+        parsed["classification_method"] = state.get("classification_method")
+        parsed["agent_scores"] = [
+            state.get("anomaly_score"),
+            state.get("social_diversity_score"),
+            state.get("player_action_score"),
+        ]
+        parsed["skipped_agents"] = state.get("skipped_agents", [])
+        return parsed
+
+    return score, orchestrator.llm.stats.as_dict
+
+
+def build_fusion_scorer(args):
+    """Three agent LLM calls fused locally; the LLM classifier only runs for conflicting scores."""
+    return build_llm_scorer(args, fusion=args.fusion_calibration or "rules")
+
+
+def build_cascade_scorer(args):
+    """Agents run cheapest-first with early exit; decisive players never reach the LLM classifier."""
+    return build_llm_scorer(args, fusion=args.fusion_calibration, cascade=True)
+
+
+def build_fast_scorer(args):
+    """Score-only agent and classifier calls under a tight output limit; no reasoning is generated."""
+    return build_llm_scorer(args, fusion=args.fusion_calibration, fast=True)
+
+
+SCORERS = {
+    "llm": build_llm_scorer,
+    "fusion": build_fusion_scorer,
+    "cascade": build_cascade_scorer,
+    "fast": build_fast_scorer,
+}
+
+
+def calibrate_fusion(report_dir: str, output: str):
+    """Fits a logistic fusion calibration from streamed sweep reports and the labelled Type column."""
+    import glob
+
+    from ml.score_fusion import ScoreFusion
+
+    social_df = load_social_data()
+    labels = dict(zip(social_df["Actor"].astype(int).astype(str), (social_df["Type"] == "Bot").astype(int)))
+
+    rows, y = [], []
+    for path in sorted(glob.glob(os.path.join(report_dir, "*.jsonl"))):
+        with open(path) as f:
+            for line in f:
+                report = json.loads(line)
+                if str(report["player_id"]) in labels:
+                    rows.append(report)
+                    y.append(labels[str(report["player_id"])])
+
+    fusion = ScoreFusion().fit_logistic(rows, y)
+    fusion.save(output)
+    print(f"Fusion calibration written to {output}")
+
+
+def fit_suspicion_prior(args, output: str):
+    """
+    Fits the scheduler's suspicion prior on the train split and reports, on the test split,
+    the share of bots a budget covering the top 5/10/25/50% of players would reach.
+    """
+    from ml.numeric_search import NumericFeatureIndex
+    from ml.priority_scheduler import SuspicionPrior
+    from src.data_ingestion.load_data import load_action_data, load_group_data, load_player_data
+
+    features = NumericFeatureIndex.join_feature_tables({
+        "player": load_player_data(),
+        "action": load_action_data(),
+        "social": load_social_data(),
+        "group": load_group_data(),
+    })
+    train = dict(load_labelled_split("train", args.test_fraction, args.seed))
+    test = dict(load_labelled_split("test", args.test_fraction, args.seed))
+
+    def bots_reached(prior: SuspicionPrior) -> Dict[str, float]:
+        priors = prior.score(features)
+        ranked = sorted(test, key=lambda pid: priors.get(pid, 0.0), reverse=True)
+        total_bots = sum(test.values()) or 1
+        return {
+            f"top_{int(share * 100)}pct": sum(test[pid] for pid in ranked[:int(len(ranked) * share)]) / total_bots
+            for share in (0.05, 0.1, 0.25, 0.5)
+        }
+
+    default_recall = bots_reached(SuspicionPrior())
+    prior = SuspicionPrior().fit(features, train)
+    prior.save(output)
+    print(json.dumps({"default_signals": default_recall, "fitted": bots_reached(prior)}, indent=2))
+    print(f"Suspicion prior written to {output}")
+
+
+def compute_quality(y_true: List[int], y_pred: List[int], y_score: List[float]) -> Dict[str, Any]:
+    """Classification metrics; ROC AUC is omitted when only one class is present."""
+    from sklearn.metrics import (
+        accuracy_score,
+        confusion_matrix,
+        f1_score,
+        precision_score,
+        recall_score,
+        roc_auc_score,
+    )
+
+    quality = {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "f1": f1_score(y_true, y_pred, zero_division=0),
+        "confusion_matrix": confusion_matrix(y_true, y_pred, labels=[0, 1]).tolist(),
+        "roc_auc": None,
+    }
+    if len(set(y_true)) == 2:
+        quality["roc_auc"] = roc_auc_score(y_true, y_score)
+    return quality
+
+
+def evaluate(scorer_name: str, args) -> Dict[str, Any]:
+    """Runs one scorer over the labelled split and collects quality and cost metrics."""
+    samples = load_labelled_split(args.split, args.test_fraction, args.seed, args.limit)
+    score, usage = SCORERS[scorer_name](args)
+
+    y_true, y_pred, y_score, failures = [], [], [], []
+    methods: Dict[str, int] = {}
+    skipped_agents: Dict[str, int] = {}
+    start = time.perf_counter()
+    for player_id, label in samples:
+        try:
+            result = score(player_id)
+        except Exception as e:
+            print(f"Scoring failed for player {player_id}: {e}")
+            failures.append(player_id)
+            continue
+        y_true.append(label)
+        y_pred.append(1 if result.get("classification") == "Bot" else 0)
+        y_score.append(bot_probability(result))
+        if result.get("classification_method"):
+            methods[result["classification_method"]] = methods.get(result["classification_method"], 0) + 1
+        for agent in result.get("skipped_agents", []):
+            skipped_agents[agent] = skipped_agents.get(agent, 0) + 1
+    wall_time = time.perf_counter() - start
+
+    scored = len(y_true)
+    llm_usage = usage()
+    return {
+        "scorer": scorer_name,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "split": args.split,
+        "seed": args.seed,
+        "players": len(samples),
+        "scored": scored,
+        "failures": failures,
+        "classification_methods": methods,
+        "skipped_agents": skipped_agents,
+        "quality": compute_quality(y_true, y_pred, y_score) if scored else None,
+        "cost": {
+            "wall_time_s": wall_time,
+            "players_per_sec": scored / wall_time if wall_time else None,
+            "llm_calls_per_player": llm_usage["llm_calls"] / scored if scored else None,
+            "tokens_per_player": llm_usage["total_tokens"] / scored if scored else None,
+            "cache_hit_rate": llm_usage["cache_hit_rate"],
+            **llm_usage,
+        },
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate bot detection scorers on labelled data.")
+    parser.add_argument("--scorer", choices=sorted(SCORERS), default="llm")
+    parser.add_argument("--split", choices=["train", "test"], default="test")
+    parser.add_argument("--test-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limit", type=int, default=None, help="Evaluate at most this many players")
+    parser.add_argument("--llm-cache", default=None, help="Shelve file for caching LLM responses")
+    parser.add_argument("--output", default=None, help="Where to write the JSON results")
+    parser.add_argument("--fusion-calibration", default=None,
+                        help="Logistic calibration JSON for the fusion scorer (rules are used when omitted)")
+    parser.add_argument("--cascade-bot-exit", type=float, default=0.85,
+                        help="Fused bot probability at which the cascade scorer settles on bot")
+    parser.add_argument("--cascade-human-exit", type=float, default=0.2,
+                        help="Fused bot probability at which the cascade scorer settles on human")
+    parser.add_argument("--cascade-min-agents-bot", type=int, default=2,
+                        help="Agents that must have scored before the cascade scorer settles on bot")
+    parser.add_argument("--calibrate-from", default=None, metavar="REPORT_DIR",
+                        help="Fit a logistic fusion calibration from JSONL sweep reports and exit; "
+                             "run the sweep on the train split so the test split stays unseen")
+    parser.add_argument("--fit-prior", default=None, metavar="OUTPUT",
+                        help="Fit the budget scheduler's suspicion prior on the train split, write it here and exit")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.calibrate_from:
+        calibrate_fusion(args.calibrate_from, args.fusion_calibration or "fusion_calibration.json")
+        return
+    if args.fit_prior:
+        fit_suspicion_prior(args, args.fit_prior)
+        return
+
+    results = evaluate(args.scorer, args)
+
+    output = args.output or os.path.join(
+        "eval_results", f"{args.scorer}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps({"quality": results["quality"], "cost": results["cost"]}, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
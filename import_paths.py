@@ -0,0 +1,47 @@
+"""
+Maps the package names the code imports onto this checkout.
+
+Modules import the agents as ``ml.*`` and the data layer as ``src.data_ingestion.*``,
+the layout of the deployed package. In this repository they live in ``Agent/`` and
+``src/``. Importing this module first registers both names for those directories, so
+the entry points run straight from a checkout. Real ``ml`` / ``src.data_ingestion``
+packages, when installed, take precedence.
+"""
+import importlib.util
+import os
+import sys
+import types
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Imported package name -> directory in this checkout
+PACKAGE_DIRS = {
+    "ml": os.path.join(REPO_ROOT, "Agent"),
+    "src.data_ingestion": os.path.join(REPO_ROOT, "src"),
+}
+
+
+def _installed(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+def register(name: str, directory: str):
+    """Makes ``name`` a package whose submodules are the modules in ``directory``."""
+    if name in sys.modules or _installed(name):
+        return
+    package = types.ModuleType(name)
+    package.__path__ = [directory]
+    package.__package__ = name
+    sys.modules[name] = package
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(importlib.import_module(parent), child, package)
+
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+for _name, _directory in PACKAGE_DIRS.items():
+    register(_name, _directory)
@@ -1,39 +1,96 @@
+import argparse
+import json
 import os
 import random
-from typing import Any, Dict, List, TypedDict
+import re
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, TYPE_CHECKING, TypedDict
 
 from dotenv import load_dotenv
-from langchain_core.language_models.base import BaseLanguageModel
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableConfig
-from langchain_groq import ChatGroq
-from langgraph.graph import StateGraph, END
-from langchain_neo4j import Neo4jGraph
 
 # Custom Imports
-from src.data_ingestion.kg_population import KnowledgeGraphPopulator
-from ml.search_agent import FAISSIndex
-from ml.anomaly_scoring_agent import assess_bot_likelihood, extract_player_features
-from ml.social_diversity_agent import assess_social_bot_likelihood, extract_player_social_diversity_features
-from ml.player_actions_agent import extract_player_action_features, assess_player_action
-from src.data_ingestion.load_data import load_player_data
+import import_paths  # noqa: F401  (maps ml / src.data_ingestion onto this checkout)
+from ml.search_agent import FAISSIndex, STORAGE_FORMATS
+from ml.anomaly_scoring_agent import (
+    assess_bot_likelihood,
+    extract_player_features,
+    extract_player_features_batch,
+    extract_player_neighbourhood,
+    extract_player_neighbourhood_batch,
+    format_anomaly_prompt,
+    parse_anomaly_response,
+)
+from ml.social_diversity_agent import (
+    assess_social_bot_likelihood,
+    extract_player_social_diversity_features,
+    extract_player_social_diversity_features_batch,
+    format_social_prompt,
+    parse_social_response,
+)
+from ml.player_actions_agent import (
+    assess_player_action,
+    extract_player_action_features,
+    extract_player_action_features_batch,
+    format_player_action_prompt,
+    parse_player_action_response,
+)
+from ml.llm_metering import MeteredLLM
+from ml.numeric_search import NumericFeatureIndex
+from ml.score_fusion import ScoreFusion, format_fused_classification
+from ml.cascade import AGENT_SCORE_FIELDS, AgentCascade
+from ml.clustering import PlayerClusterer
+from ml.prompts_v2 import explanation_prompt
+from ml.priority_scheduler import (
+    DEFAULT_COMPLETION_PRICE,
+    DEFAULT_PROMPT_PRICE,
+    BudgetScheduler,
+    SuspicionPrior,
+    suspicion_priors,
+)
+from src.data_ingestion.ledger import CompletionLedger, ExplanationCache
+from src.data_ingestion.neo4j_driver import connect_from_env
+from src.data_ingestion.report_sink import REPORT_WRITERS, make_report_writer
+
+# langchain_groq, langgraph, the prompt templates and pandas-backed loaders are imported
+# where they are first needed, so importing this module stays cheap for short-lived jobs
+if TYPE_CHECKING:
+    from langchain_core.language_models.base import BaseLanguageModel
+    from langchain_neo4j import Neo4jGraph
 
 # Load Environment Variables
 load_dotenv()
 
+# Bump whenever the feature set or agent prompts change so earlier classifications are redone
+FEATURE_VERSION = "hcrl-after.prompts_v2"
+MODEL_NAME = "llama-3.3-70b-versatile"
+
+# Output cap for score-only agent and classifier calls; a score line is well under this
+FAST_MAX_TOKENS = 16
+# Fused bot probability from which fast sweeps write an explanation for review
+DEFAULT_REVIEW_THRESHOLD = 0.6
+
+# Reasoning state key that goes with each agent score key
+AGENT_REASONING_FIELDS = {
+    "anomaly_score": "anomaly_reasoning",
+    "social_diversity_score": "social_reasoning",
+    "player_action_score": "player_action_reasoning",
+}
+
 class PlayerAnalysisState(TypedDict):
     """
     Enhanced state management with clear typing and comprehensive analysis state.
     """
-    player_ids: List[str]
     current_player_id: str
-    remaining_steps: int
+    feature_fingerprint: str
     
     # Extracted Data
     player_data: Dict[str, Any]
     social_data: Dict[str, Any]
     player_action_data: Dict[str, Any]
     similar_player_ids: List[str]
+    similar_player_data: List[Dict[str, Any]]
     
     # Analysis Results
     anomaly_score: float
@@ -42,35 +99,48 @@ class PlayerAnalysisState(TypedDict):
     social_reasoning: str
     player_action_score: float
     player_action_reasoning: str
+    skipped_agents: List[str]
     
+    # Set when the verdict was propagated from a cluster representative
+    cluster_id: int
+    cluster_representative: str
+    cluster_similarity: float
+
     # Final Classification
     classification_result: str
     classification_reasoning: str
     classification_confidence: float
+    classification_method: str
+
+    # Plain-English explanation, only written for players that need review
+    explanation: str
     
-    # Aggregated Reports
-    reports: List[Dict[str, Any]]
-class BotDetectionOrchestrator:
-    def __init__(
-        self, 
-        llm: BaseLanguageModel, 
-        neo4j_graph: Neo4jGraph,
-        faiss_index: FAISSIndex
-    ):
-        """
-        Initialize the bot detection orchestrator with core dependencies.
-        
-        Args:
-            llm: Language model for advanced reasoning
-            neo4j_graph: Knowledge graph for data storage
-            faiss_index: Semantic search index
-        """
-        self.llm = llm
-        self.neo4j_graph = neo4j_graph
-        self.faiss_index = faiss_index
-        
-        # Predefined classification prompt with more structured output
-        self.classification_prompt = ChatPromptTemplate.from_template("""
+    # Report for the current player, handed to the sweep's report sink
+    report: Dict[str, Any]
+
+
+def parse_classification(classification_text: str) -> Dict[str, Any]:
+    """Parses the Classification/Confidence/Reasoning lines out of the classifier output."""
+    classification = re.search(r"Classification:\s*\[?(\w+)", classification_text or "")
+    confidence = re.search(r"Confidence:\s*\[?(\d+(?:\.\d+)?)", classification_text or "")
+    reasoning = re.search(r"Reasoning:\s*(.+)", classification_text or "", re.DOTALL)
+    return {
+        "classification": classification.group(1).capitalize() if classification else None,
+        "confidence": float(confidence.group(1)) if confidence else None,
+        "reasoning": reasoning.group(1).strip() if reasoning else None,
+    }
+
+
+def _as_score(value: Any) -> Any:
+    """Normalizes an agent score to float so report columns keep a single type."""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# Predefined classification prompt with more structured output
+CLASSIFICATION_PROMPT_TEMPLATE = """
         Analyze bot detection results from multiple agents:
         
         **Anomaly Detection**
@@ -94,32 +164,141 @@ class BotDetectionOrchestrator:
         Classification: [Bot/Human]
         Confidence: [0-100]
         Reasoning: [Concise analysis combining both reports]
-        """)
+        """
+
+# Classifier prompt for fast mode, where the agents return scores without reasoning
+FAST_CLASSIFICATION_PROMPT_TEMPLATE = """
+        Classify a player from bot detection agent scores (0-100, higher is more bot-like):
+        
+        Anomaly Detection: {anomaly_score}/100
+        Social Diversity Analysis: {social_diversity_score}/100
+        Player Action Analysis: {player_action_score}/100
+        
+        Rules:
+        1. Score ABOVE 80 in either category indicates high bot probability
+        2. Scores BETWEEN 40-79 require contextual analysis
+        3. BELOW 40 suggests legitimate play
+        
+        Respond with these two lines only, no reasoning:
+        Classification: [Bot/Human]
+        Confidence: [0-100]
+        """
+
+
+class BotDetectionOrchestrator:
+    def __init__(
+        self, 
+        llm: "BaseLanguageModel", 
+        neo4j_graph: "Neo4jGraph",
+        faiss_index: FAISSIndex,
+        sweep_id: str = None,
+        similarity_mode: str = "text",
+        numeric_index: NumericFeatureIndex = None,
+        fusion: ScoreFusion = None,
+        cascade: AgentCascade = None,
+        fast: bool = False,
+        fast_max_tokens: int = FAST_MAX_TOKENS,
+        review_threshold: float = None,
+        explanations: ExplanationCache = None
+    ):
+        """
+        Initialize the bot detection orchestrator with core dependencies.
+        
+        Args:
+            llm: Language model for advanced reasoning
+            neo4j_graph: Knowledge graph for data storage
+            faiss_index: Semantic search index
+            sweep_id: Identifier of the sweep this orchestrator is running
+            similarity_mode: "text" encodes the feature dict and searches the embedding
+                index; "numeric" looks players up in ``numeric_index`` with no model inference;
+                "graph" follows precomputed SIMILAR_TO edges, fetched together with the
+                player's features in one query (see ``build_similarity_edges``)
+            numeric_index: Standardized feature-vector index used in numeric mode
+            fusion: Local score fusion replacing the LLM classifier for non-conflicting cases
+            cascade: Runs the agents in order with early exit instead of always running all three
+            fast: Agents and the LLM classifier return scores only, capped at ``fast_max_tokens``
+                output tokens; reasoning is left to the explanation step
+            fast_max_tokens: Output token limit for fast-mode calls
+            review_threshold: Fused bot probability from which a player gets a plain-English
+                explanation (bot verdicts always do); None writes no explanations
+            explanations: Cache the explanations are stored in and reused from
+        """
+        self.llm = llm
+        self.neo4j_graph = neo4j_graph
+        self.faiss_index = faiss_index
+        self.sweep_id = sweep_id
+        self.similarity_mode = similarity_mode
+        self.numeric_index = numeric_index
+        self.fusion = fusion
+        self.cascade = cascade
+        self.fast = fast
+        # The agents and the classifier call this one; explanations use the uncapped ``llm``
+        self.scoring_llm = llm.bind(max_tokens=fast_max_tokens) if fast else llm
+        self.review_threshold = review_threshold
+        self.explanations = explanations
+        # Player id -> current feature fingerprint; computed on first use (see ``feature_fingerprint``)
+        self.fingerprints: Dict[str, str] = None
+        self._prompts: Dict[str, Any] = {}
+
+    def _chat_prompt(self, template: str):
+        """Chat prompt for ``template``, built on first use."""
+        if template not in self._prompts:
+            from langchain_core.prompts import ChatPromptTemplate
+
+            self._prompts[template] = ChatPromptTemplate.from_template(template)
+        return self._prompts[template]
+
+    @property
+    def classification_prompt(self):
+        """Classification prompt, built on first use."""
+        return self._chat_prompt(FAST_CLASSIFICATION_PROMPT_TEMPLATE if self.fast else CLASSIFICATION_PROMPT_TEMPLATE)
+
+    def data_ingestion(self) -> bool:
+        """Ingest data into knowledge graph once, ahead of the per-player sweep."""
+        from src.data_ingestion.kg_population import KnowledgeGraphPopulator
 
-    def data_ingestion(self, state: PlayerAnalysisState) -> Dict[str, List[str]]:
-        """Ingest data into knowledge graph with robust error handling."""
         try:
             kg_populator = KnowledgeGraphPopulator()
             kg_populator.populate_knowledge_graph()
-            return {"player_ids": state['player_ids']}
+            return True
         except Exception as e:
             print(f"Data ingestion failed: {e}")
-            return {"player_ids": state['player_ids']}
+            return False
 
     def extract_player_features(self, state: PlayerAnalysisState) -> Dict[str, Dict]:
         """Advanced feature extraction with current player context."""
         player_id = state['current_player_id']
+        if self.similarity_mode == "graph":
+            player_data, neighbours = extract_player_neighbourhood(player_id, self.neo4j_graph)
+            player_features = {
+                "player_data": player_data,
+                "similar_player_ids": [n["player_id"] for n in neighbours],
+                "similar_player_data": neighbours,
+            }
+        else:
+            player_features = {"player_data": extract_player_features(player_id, self.neo4j_graph)}
         return {
-            "player_data": extract_player_features(player_id, self.neo4j_graph),
+            **player_features,
             "social_data": extract_player_social_diversity_features(player_id, self.neo4j_graph),
             "player_action_data": extract_player_action_features(player_id, self.neo4j_graph)
         }
 
     def semantic_search(self, state: PlayerAnalysisState) -> Dict[str, List[str]]:
-        """Enhanced semantic search with robust indexing."""
+        """Finds similar players, by text embedding or by numeric feature vector."""
+        from src.data_ingestion.load_data import load_player_data
+
         try:
-            player_df = load_player_data()
-            self.faiss_index.load_index(player_df)
+            if self.similarity_mode == "graph":
+                # Neighbours came with the player's features
+                return {"similar_player_ids": state.get('similar_player_ids', [])}
+            if self.similarity_mode == "numeric":
+                if self.numeric_index.faiss_index is None:
+                    self.numeric_index.build()
+                return {"similar_player_ids": self.numeric_index.search(state['current_player_id'], top_k=3)}
+
+            # The embedding index is loaded once and reused for every player
+            if self.faiss_index.faiss_index is None:
+                self.faiss_index.load_index(load_player_data())
             similar_player_ids = self.faiss_index.search(
                 str(state['player_data']), 
                 top_k=3
@@ -129,36 +308,103 @@ class BotDetectionOrchestrator:
             print(f"Semantic search error: {e}")
             return {"similar_player_ids": []}
 
+    def _agent_result(self, score_key: str, score: Any, reasoning: str) -> Dict[str, Any]:
+        """Score and reasoning state keys; fast mode only keeps the reasoning when it explains a missing score."""
+        if self.fast and score is not None:
+            reasoning = None
+        return {score_key: score, AGENT_REASONING_FIELDS[score_key]: reasoning}
+
+    def run_agent(self, name: str, state: PlayerAnalysisState) -> Dict[str, Any]:
+        """Runs a single scoring agent and returns its score and reasoning state keys."""
+        if name == "anomaly":
+            anomaly_score, anomaly_reasoning, _ = assess_bot_likelihood(
+                state['player_data'], 
+                self.scoring_llm,
+                self.neo4j_graph,
+                state['similar_player_ids'],
+                state.get('similar_player_data'),
+                score_only=self.fast
+            )
+            return self._agent_result("anomaly_score", anomaly_score, anomaly_reasoning)
+
+        if name == "social_diversity":
+            social_diversity_score, social_reasoning, _ = assess_social_bot_likelihood(
+                state['social_data'],
+                self.scoring_llm,
+                score_only=self.fast
+            )
+            return self._agent_result("social_diversity_score", social_diversity_score, social_reasoning)
+
+        if name == "player_action":
+            player_action_score, player_action_reasoning, _ = assess_player_action(
+                state['player_action_data'],
+                self.scoring_llm,
+                score_only=self.fast
+            )
+            return self._agent_result("player_action_score", player_action_score, player_action_reasoning)
+
+        raise ValueError(f"Unknown agent '{name}'")
+
     def analyze_player(self, state: PlayerAnalysisState) -> Dict[str, Any]:
-        """Comprehensive player analysis combining multiple signals."""
-        anomaly_score, anomaly_reasoning, _ = assess_bot_likelihood(
-            state['player_data'], 
-            self.llm,
-            self.neo4j_graph,
-            state['similar_player_ids']
-        )
-        
-        social_diversity_score, social_reasoning, _ = assess_social_bot_likelihood(
-            state['social_data'],
-            self.llm
-        )
-        
-        player_action_score, player_action_reasoning, _ = assess_player_action(
-            state['player_action_data'],
-            self.llm
-        )
-        return {
-            "anomaly_score": anomaly_score,
-            "anomaly_reasoning": anomaly_reasoning,
-            "social_diversity_score": social_diversity_score,
-            "social_reasoning": social_reasoning,
-            "player_action_score": player_action_score,
-            "player_action_reasoning": player_action_reasoning
-        }
+        """
+        Comprehensive player analysis combining multiple signals.
 
-    def classify_player(self, state: PlayerAnalysisState) -> Dict[str, Any]:
-        """Advanced classification using language model reasoning."""
-        classification_input = self.classification_prompt.format_messages(
+        With a cascade configured, agents run in cascade order and the rest are skipped
+        as soon as the scores gathered so far settle the verdict; skipped agents get a
+        ``None`` score and are listed in ``skipped_agents``.
+        """
+        if self.cascade is None:
+            results: Dict[str, Any] = {"skipped_agents": []}
+            for name in ("anomaly", "social_diversity", "player_action"):
+                results.update(self.run_agent(name, state))
+            return results
+
+        results = {}
+        skipped: List[str] = []
+        for name in self.cascade.order:
+            results.update(self.run_agent(name, {**state, **results}))
+            decision = self.cascade.decision(results)
+            if decision is not None:
+                skipped = self.cascade.remaining(name)
+                break
+
+        for name in skipped:
+            score_key = AGENT_SCORE_FIELDS[name]
+            results[score_key] = None
+            results[AGENT_REASONING_FIELDS[score_key]] = f"Skipped: earlier agents already indicated {decision}"
+        results["skipped_agents"] = skipped
+        return results
+
+    def classify_locally(self, state: PlayerAnalysisState) -> Dict[str, Any]:
+        """
+        Classifies the player from the agent scores without the LLM, when possible.
+
+        Returns the classification state keys, or None when the player needs the LLM
+        classifier: no fusion is configured and the cascade reached no decision, or the
+        fused scores conflict.
+        """
+        fusion, method = self.fusion, "fusion"
+        # A decisive cascade settles the player whether or not agents were skipped
+        if fusion is None and self.cascade is not None and self.cascade.decision(state) is not None:
+            fusion, method = self.cascade.fusion, "cascade"
+        if fusion is not None:
+            fused = fusion.fuse(state)
+            if not fused["conflict"]:
+                return {
+                    "classification_result": format_fused_classification(fused, state),
+                    "classification_method": f"{method}:{fusion.method}"
+                }
+        return None
+
+    def classification_messages(self, state: PlayerAnalysisState):
+        """Formats the LLM classifier prompt from the agent scores and reasoning (scores only in fast mode)."""
+        if self.fast:
+            return self.classification_prompt.format_messages(
+                anomaly_score=state["anomaly_score"],
+                social_diversity_score=state["social_diversity_score"],
+                player_action_score=state["player_action_score"]
+            )
+        return self.classification_prompt.format_messages(
             anomaly_score=state["anomaly_score"],
             anomaly_reasoning=state["anomaly_reasoning"],
             social_diversity_score=state["social_diversity_score"],
@@ -167,8 +413,22 @@ class BotDetectionOrchestrator:
             player_action_reasoning=state["player_action_reasoning"]
 
         )
+
+    def classify_player(self, state: PlayerAnalysisState) -> Dict[str, Any]:
+        """
+        Classifies the player from the agent scores.
+
+        With a fusion stage configured, the verdict is computed locally and the LLM is
+        only consulted when the agents genuinely conflict. A player the cascade settled,
+        early or after its last agent, is fused locally too.
+        """
+        local = self.classify_locally(state)
+        if local is not None:
+            return local
+
+        classification_input = self.classification_messages(state)
         
-        response = self.llm.invoke(classification_input)
+        response = self.scoring_llm.invoke(classification_input)
         
         # Enhanced parsing of classification response
         classification_parts = response.content.split("\n")
@@ -183,22 +443,120 @@ class BotDetectionOrchestrator:
         #             classification_confidence = 0.0
         
         return {
-            "classification_result": response.content
+            "classification_result": response.content,
+            "classification_method": "llm"
         }
+
+    def needs_review(self, state: PlayerAnalysisState) -> bool:
+        """
+        Whether a classified player gets a plain-English explanation: every bot verdict,
+        and players whose fused bot probability reaches ``review_threshold``.
+        """
+        if self.review_threshold is None:
+            return False
+        if parse_classification(state.get("classification_result"))["classification"] == "Bot":
+            return True
+        fusion = self.fusion or (self.cascade.fusion if self.cascade is not None else ScoreFusion())
+        probability = fusion.bot_probability(state)
+        return probability is not None and probability >= self.review_threshold
+
+    def explanation_messages(self, state: PlayerAnalysisState):
+        """Formats the explanation prompt from the player's features, agent scores and verdict."""
+        def features(data: Dict[str, Any]) -> str:
+            return "\n".join(f"{key}: {value}" for key, value in (data or {}).items()) or "Not available"
+
+        parsed = parse_classification(state.get("classification_result"))
+        return self._chat_prompt(explanation_prompt()).format_messages(
+            actor=state["current_player_id"],
+            classification=parsed["classification"],
+            confidence=parsed["confidence"],
+            anomaly_score=state.get("anomaly_score"),
+            social_diversity_score=state.get("social_diversity_score"),
+            player_action_score=state.get("player_action_score"),
+            player_features=features(state.get("player_data")),
+            social_features=features(state.get("social_data")),
+            action_features=features(state.get("player_action_data"))
+        )
+
+    def explain_players(self, states: List[PlayerAnalysisState]) -> List[str]:
+        """
+        Plain-English explanations for classified players, in input order.
+
+        Explanations already cached for the player's current features are reused; the
+        rest are written in one ``llm.batch`` without the fast-mode output cap and cached.
+        A player whose explanation call failed gets None.
+        """
+        explanations: List[str] = [None] * len(states)
+        if self.explanations is not None:
+            for i, state in enumerate(states):
+                explanations[i] = self.explanations.get(state["current_player_id"], state.get("feature_fingerprint"))
+        misses = [i for i, explanation in enumerate(explanations) if explanation is None]
+        if misses:
+            responses = self.llm.batch([self.explanation_messages(states[i]) for i in misses],
+                                       return_exceptions=True)
+            for i, response in zip(misses, responses):
+                if isinstance(response, Exception):
+                    print(f"Explanation failed for player {states[i]['current_player_id']}: {response}")
+                    continue
+                explanations[i] = response.content.strip()
+                if self.explanations is not None:
+                    self.explanations.put(states[i]["current_player_id"], explanations[i],
+                                          states[i].get("feature_fingerprint"))
+        return explanations
+
+    def explain_if_flagged(self, state: PlayerAnalysisState) -> Dict[str, Any]:
+        """Workflow step writing the explanation for players that need review; nobody else pays for one."""
+        if not self.needs_review(state):
+            return {"explanation": None}
+        return {"explanation": self.explain_players([state])[0]}
+
+    def feature_fingerprint(self, player_id: str) -> str:
+        """
+        The player's current feature fingerprint, which cached explanations are checked
+        against. The whole population is fingerprinted once, on first use.
+        """
+        if self.fingerprints is None:
+            from src.data_ingestion.change_detection import compute_feature_fingerprints
+
+            self.fingerprints = compute_feature_fingerprints()
+        return self.fingerprints.get(str(player_id))
+
+    def explain(self, player_id: str) -> str:
+        """
+        Explanation for one player on request: from the cache if it was written for the
+        player's current features, or by scoring the player and writing one. Returns None
+        for players missing from the knowledge graph.
+        """
+        player_id = str(player_id)
+        if self.explanations is not None:
+            cached = self.explanations.get(player_id, self.feature_fingerprint(player_id))
+            if cached is not None:
+                return cached
+        states = self.score_players([player_id])
+        if player_id not in states:
+            return None
+        state = states[player_id]
+        if state.get("error"):
+            raise RuntimeError(state["error"])
+        return state.get("explanation") or self.explain_players([state])[0]
+
     def persist_classification_to_kg(self, state: PlayerAnalysisState) -> Dict[str, Any]:
         """
         Persist player classification to Neo4j Knowledge Graph.
         
-        Creates or updates a classification node and links it to the player node.
+        Creates or updates a classification node and links it to the player node,
+        stamping the relationship with the feature fingerprint, feature version and
+        model that produced it so later sweeps can skip unchanged players.
         """
         player_id = state['current_player_id']
         classification = state['classification_result']
+        feature_fingerprint = state.get('feature_fingerprint')
         
         try:
             # Cypher query to create or merge classification node and link to player
             merge_query = """
             // Find or create the player node
-            MERGE (p:Player {Actor: $player_id})
+            MERGE (p:Player {Actor: toInteger($player_id)})
             
             // Create or find the classification node
             MERGE (c:Classification {
@@ -207,18 +565,21 @@ class BotDetectionOrchestrator:
             
             // Create or update the relationship
             MERGE (p)-[r:HAS_CLASSIFICATION]->(c)
-            ON CREATE SET 
-                r.timestamp = datetime()
-            ON MATCH SET 
-                r.timestamp = datetime()
+            SET r.timestamp = datetime(),
+                r.feature_fingerprint = $feature_fingerprint,
+                r.feature_version = $feature_version,
+                r.model = $model
             
             RETURN p, c, r
             """
             
             # Execute the query
-            result = self.neo4j_graph.query(merge_query, {
+            result = self.neo4j_graph.write(merge_query, {
                 "player_id": player_id,
                 "classification": classification,
+                "feature_fingerprint": feature_fingerprint,
+                "feature_version": FEATURE_VERSION,
+                "model": MODEL_NAME,
             })
             
             print(f"Classification persisted for player {player_id}: {classification}")
@@ -229,110 +590,732 @@ class BotDetectionOrchestrator:
             print(f"Error persisting classification to Knowledge Graph: {e}")
             return {"kg_persist_status": "Failed"}
         
-    def generate_report(self, state: PlayerAnalysisState) -> Dict[str, List[Dict]]:
-        """Create comprehensive report with aggregation."""
-        report = {
+    def build_report(self, state: PlayerAnalysisState) -> Dict[str, Any]:
+        """Assembles the report for a classified player."""
+        parsed = parse_classification(state["classification_result"])
+        return {
             "player_id": state['current_player_id'],
+            "sweep_id": self.sweep_id,
+            "feature_version": FEATURE_VERSION,
+            "feature_fingerprint": state.get("feature_fingerprint"),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "classification": parsed["classification"],
+            "classification_confidence": parsed["confidence"],
+            "classification_reasoning": parsed["reasoning"],
             "classification_result": state["classification_result"],
-            "anomaly_score": state["anomaly_score"],
-            "social_diversity_score": state["social_diversity_score"],
-            "player_action_score": state["player_action_score"]
+            "classification_method": state.get("classification_method"),
+            "anomaly_score": _as_score(state["anomaly_score"]),
+            "social_diversity_score": _as_score(state["social_diversity_score"]),
+            "player_action_score": _as_score(state["player_action_score"]),
+            "skipped_agents": state.get("skipped_agents", []),
+            "similar_player_ids": state.get("similar_player_ids", []),
+            "cluster_id": state.get("cluster_id"),
+            "cluster_representative": state.get("cluster_representative"),
+            "cluster_similarity": state.get("cluster_similarity"),
+            "explanation": state.get("explanation")
         }
-        
-        reports = state.get('reports', [])
-        reports.append(report)
-        
-        return {"reports": reports}
+
+    def generate_report(self, state: PlayerAnalysisState) -> Dict[str, Dict]:
+        """
+        Create the per-player report; the sweep driver streams it to a sink. The player
+        is marked completed by the sink once the report is durable, not here.
+        """
+        return {"report": self.build_report(state)}
     
-    def advance_to_next_player(self, state: PlayerAnalysisState) -> Dict[str, Any]:
-        """Intelligent player processing with recursion limit."""
-        if state["remaining_steps"] <= 0 or not state["player_ids"]:
-            return {"player_ids": [], "end": True}
-        
-        next_player_id = state["player_ids"].pop(0)
-        
-        return {
-            "current_player_id": next_player_id,
-            "player_ids": state["player_ids"],
-            "remaining_steps": state["remaining_steps"] - 1
+    def propagate_verdict(self, representative_report: Dict[str, Any], player_id: str, similarity: float,
+                          cluster_id: int, feature_fingerprint: str = None) -> Dict[str, Any]:
+        """
+        Builds the classified state of a cluster member from its representative's report,
+        without running the agents. Confidence is shrunk towards 50 (a coin flip) by the
+        member's similarity to the representative, so a less similar member gets a less
+        certain verdict without its confidence dropping below 50 and contradicting it; the
+        state then goes through the usual persist and report steps.
+        """
+        representative = representative_report["player_id"]
+        confidence = representative_report.get("classification_confidence")
+        if confidence is not None:
+            confidence = round(50 + (confidence - 50) * similarity, 1)
+        state: Dict[str, Any] = {
+            "current_player_id": player_id,
+            "feature_fingerprint": feature_fingerprint,
+            "skipped_agents": list(AGENT_SCORE_FIELDS),
+            "cluster_id": cluster_id,
+            "cluster_representative": representative,
+            "cluster_similarity": similarity,
+            "classification_result": (
+                f"Classification: {representative_report['classification']}\n"
+                f"Confidence: {confidence}\n"
+                f"Reasoning: Near-duplicate of player {representative} (similarity {similarity:.2f}), "
+                f"which was classified {representative_report['classification']}: "
+                f"{representative_report.get('classification_reasoning') or ''}"
+            ),
+            "classification_method": f"cluster:{representative}",
         }
-        
-    def create_workflow(self) -> Any:
-        """Construct the LangGraph workflow with advanced routing."""
+        for score_key, reasoning_key in AGENT_REASONING_FIELDS.items():
+            state[score_key] = None
+            state[reasoning_key] = f"Skipped: verdict propagated from cluster representative {representative}"
+        return state
+
+    def score_player(self, player_id: str) -> Dict[str, Any]:
+        """Runs the per-player analysis steps without persisting to the knowledge graph."""
+        state: Dict[str, Any] = {"current_player_id": player_id}
+        for step in (self.extract_player_features, self.semantic_search,
+                     self.analyze_player, self.classify_player, self.explain_if_flagged):
+            state.update(step(state))
+        return state
+
+    def _similar_players_batch(self, states: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Similar-player lookup for a batch: one encoder pass and FAISS search in text mode."""
+        from src.data_ingestion.load_data import load_player_data
+
+        player_ids = list(states)
+        try:
+            if self.similarity_mode == "graph":
+                return {pid: states[pid].get('similar_player_ids', []) for pid in player_ids}
+            if self.similarity_mode == "numeric":
+                if self.numeric_index.faiss_index is None:
+                    self.numeric_index.build()
+                return {pid: self.numeric_index.search(pid, top_k=3) for pid in player_ids}
+
+            if self.faiss_index.faiss_index is None:
+                self.faiss_index.load_index(load_player_data())
+            results = self.faiss_index.search_batch([str(states[pid]['player_data']) for pid in player_ids], top_k=3)
+            return dict(zip(player_ids, results))
+        except Exception as e:
+            print(f"Semantic search error: {e}")
+            return {pid: [] for pid in player_ids}
+
+    def _agent_batch(self, name: str, states: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Runs one agent for a batch of players through a single ``llm.batch`` call."""
+        similar_features: Dict[str, dict] = {}
+        if name == "anomaly":
+            # Graph mode already carries the neighbours' features in the state
+            similar_ids = {sid for state in states if state.get('similar_player_data') is None
+                           for sid in state.get('similar_player_ids', [])}
+            if similar_ids:
+                similar_features = extract_player_features_batch(list(similar_ids), self.neo4j_graph)
+
+        score_key = AGENT_SCORE_FIELDS[name]
+        reasoning_key = AGENT_REASONING_FIELDS[score_key]
+        results: List[Dict[str, Any]] = [None] * len(states)
+        prompts, positions = [], []
+        for i, state in enumerate(states):
+            error = "Prompt could not be loaded"
+            try:
+                if name == "anomaly":
+                    similar_ids = state.get('similar_player_ids', [])
+                    similar_data = state.get('similar_player_data')
+                    if similar_data is None:
+                        similar_data = [similar_features.get(sid, {}) for sid in similar_ids]
+                    messages = format_anomaly_prompt(state['player_data'], similar_ids, similar_data, self.fast)
+                elif name == "social_diversity":
+                    messages = format_social_prompt(state['social_data'], self.fast)
+                else:
+                    messages = format_player_action_prompt(state['player_action_data'], self.fast)
+            except Exception as e:
+                messages, error = None, f"Could not build prompt: {e}"
+            if messages is None:
+                results[i] = {score_key: None, reasoning_key: error}
+            else:
+                prompts.append(messages)
+                positions.append(i)
+
+        parse = {
+            "anomaly": parse_anomaly_response,
+            "social_diversity": parse_social_response,
+            "player_action": parse_player_action_response,
+        }[name]
+        responses = self.scoring_llm.batch(prompts, return_exceptions=True) if prompts else []
+        for i, response in zip(positions, responses):
+            if isinstance(response, Exception):
+                # Same as an unparseable response: the agent contributes no score
+                results[i] = {score_key: None, reasoning_key: f"LLM call failed: {response}"}
+                continue
+            score, reasoning = parse(response.content)
+            results[i] = self._agent_result(score_key, score, reasoning)
+        return results
+
+    def score_players(self, player_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Batched counterpart of ``score_player``, used by the online service.
+
+        Each stage runs once for the whole batch: one UNWIND query per feature set, one
+        encoder pass and FAISS search, one ``llm.batch`` per agent and one for the
+        players that still need the LLM classifier. With a cascade configured, every
+        stage only runs for the players the earlier stages left undecided. Players
+        missing from the knowledge graph are absent from the result; a player whose
+        classifier call failed carries an ``error`` instead of a classification.
+        """
+        player_ids = list(dict.fromkeys(str(pid) for pid in player_ids))
+        neighbourhoods = {}
+        if self.similarity_mode == "graph":
+            neighbourhoods = extract_player_neighbourhood_batch(player_ids, self.neo4j_graph)
+            player_data = {pid: features for pid, (features, _) in neighbourhoods.items()}
+        else:
+            player_data = extract_player_features_batch(player_ids, self.neo4j_graph)
+        social_data = extract_player_social_diversity_features_batch(player_ids, self.neo4j_graph)
+        action_data = extract_player_action_features_batch(player_ids, self.neo4j_graph)
+        states = {
+            pid: {
+                "current_player_id": pid,
+                "player_data": player_data[pid],
+                "social_data": social_data.get(pid, {}),
+                "player_action_data": action_data.get(pid, {}),
+                "skipped_agents": [],
+            }
+            for pid in player_ids if pid in player_data
+        }
+        if not states:
+            return {}
+        if self.explanations is not None:
+            # Explanations are cached against the features they were written for
+            for pid, state in states.items():
+                state["feature_fingerprint"] = self.feature_fingerprint(pid)
+        for pid, (_, neighbours) in neighbourhoods.items():
+            if pid in states:
+                states[pid]["similar_player_data"] = neighbours
+                states[pid]["similar_player_ids"] = [n["player_id"] for n in neighbours]
+
+        for pid, similar in self._similar_players_batch(states).items():
+            states[pid]["similar_player_ids"] = similar
+
+        order = self.cascade.order if self.cascade is not None else ("anomaly", "social_diversity", "player_action")
+        pending = list(states)
+        for name in order:
+            if not pending:
+                break
+            for pid, result in zip(pending, self._agent_batch(name, [states[pid] for pid in pending])):
+                states[pid].update(result)
+            if self.cascade is None:
+                continue
+
+            undecided = []
+            for pid in pending:
+                decision = self.cascade.decision(states[pid])
+                if decision is None:
+                    undecided.append(pid)
+                    continue
+                skipped = self.cascade.remaining(name)
+                states[pid]["skipped_agents"] = skipped
+                for skipped_name in skipped:
+                    score_key = AGENT_SCORE_FIELDS[skipped_name]
+                    states[pid][score_key] = None
+                    states[pid][AGENT_REASONING_FIELDS[score_key]] = \
+                        f"Skipped: earlier agents already indicated {decision}"
+            pending = undecided
+
+        needs_llm = []
+        for pid, state in states.items():
+            local = self.classify_locally(state)
+            if local is None:
+                needs_llm.append(pid)
+            else:
+                state.update(local)
+        if needs_llm:
+            responses = self.scoring_llm.batch([self.classification_messages(states[pid]) for pid in needs_llm],
+                                               return_exceptions=True)
+            for pid, response in zip(needs_llm, responses):
+                if isinstance(response, Exception):
+                    states[pid]["error"] = f"Classification failed: {response}"
+                    continue
+                states[pid].update({"classification_result": response.content, "classification_method": "llm"})
+
+        flagged = [pid for pid, state in states.items() if not state.get("error") and self.needs_review(state)]
+        for pid, explanation in zip(flagged, self.explain_players([states[pid] for pid in flagged])):
+            states[pid]["explanation"] = explanation
+        return states
+
+    def create_workflow(self, checkpointer=None) -> Any:
+        """
+        Construct the per-player LangGraph workflow.
+
+        Each invocation analyzes exactly one player in a fixed number of supersteps,
+        so sweep size is bounded by the driver rather than the graph recursion limit.
+        """
+        from langgraph.graph import StateGraph, END
+
         graph = StateGraph(PlayerAnalysisState)
         
         # Add workflow nodes
-        graph.add_node("ingest_data", self.data_ingestion)
         graph.add_node("extract_features", self.extract_player_features)
         graph.add_node("semantic_search", self.semantic_search)
         graph.add_node("analyze_player", self.analyze_player)
         graph.add_node("classify_player", self.classify_player)
+        graph.add_node("explain_player", self.explain_if_flagged)
         graph.add_node("persist_to_kg", self.persist_classification_to_kg)
         graph.add_node("generate_report", self.generate_report)
-        graph.add_node("advance_player", self.advance_to_next_player)
         
         # Define workflow edges
-        graph.set_entry_point("ingest_data")
-        graph.add_edge("ingest_data", "extract_features")
+        graph.set_entry_point("extract_features")
         graph.add_edge("extract_features", "semantic_search")
         graph.add_edge("semantic_search", "analyze_player")
         graph.add_edge("analyze_player", "classify_player")
-        graph.add_edge("classify_player", "persist_to_kg")
+        graph.add_edge("classify_player", "explain_player")
+        graph.add_edge("explain_player", "persist_to_kg")
         graph.add_edge("persist_to_kg", "generate_report")
-        graph.add_edge("generate_report", "advance_player")
-        
-        # Conditional routing for continuous processing
-        graph.add_conditional_edges(
-            "advance_player",
-            lambda state: "end" not in state or not state.get("end", False),
-            {
-                True: "extract_features",
-                False: END
-            }
-        )
+        graph.add_edge("generate_report", END)
         
-        return graph.compile()
+        return graph.compile(checkpointer=checkpointer)
 
-def main():
-    # Configure dependencies
+def build_orchestrator(llm_cache_path: str = None, embedding_backend: str = "torch",
+                       encoder_threads: int = 0, embedding_storage: str = "float32",
+                       similarity_mode: str = "text", numeric_index_path: str = None,
+                       fusion: str = None, cascade: bool = False,
+                       cascade_bot_exit: float = 0.85,
+                       cascade_human_exit: float = 0.2, cascade_min_agents_bot: int = 2, fast: bool = False,
+                       fast_max_tokens: int = FAST_MAX_TOKENS, review_threshold: float = None,
+                       explanation_db: str = None) -> BotDetectionOrchestrator:
+    """
+    Configures the LLM, knowledge graph and FAISS index and wires them into an orchestrator.
+
+    ``explanation_db`` is the SQLite file caching plain-English explanations; without it
+    explanations are regenerated on every request.
+    """
     os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY2")
     os.environ["LANGCHAIN_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
     os.environ["LANGCHAIN_PROJECT"] = "Game Bot Detection Framework"
     os.environ["LANGCHAIN_TRACING_V2"] = "true"
-    
-    
-    llm = ChatGroq(model="llama-3.3-70b-versatile")
-    neo4j_graph = Neo4jGraph(
-        url=os.getenv("NEO4J_URI"), 
-        username=os.getenv("NEO4J_USERNAME"), 
-        password=os.getenv("NEO4J_PASSWORD")
+
+    from langchain_groq import ChatGroq
+
+    llm = MeteredLLM(ChatGroq(model=MODEL_NAME), cache_path=llm_cache_path)
+    # Pooled data-access layer; exposes the same query() interface the agents use on Neo4jGraph
+    neo4j_graph = connect_from_env()
+    faiss_index = FAISSIndex(backend=embedding_backend, num_threads=encoder_threads,
+                             storage=embedding_storage)
+
+    numeric_index = None
+    if similarity_mode == "numeric":
+        numeric_index = NumericFeatureIndex().load_or_build(numeric_index_path)
+    # fusion is "rules" or the path of a fitted logistic calibration
+    score_fusion = None
+    if fusion == "rules":
+        score_fusion = ScoreFusion()
+    elif fusion:
+        score_fusion = ScoreFusion.load(fusion)
+    # The cascade judges partial evidence with the same fusion that settles the verdict
+    agent_cascade = None
+    if cascade:
+        agent_cascade = AgentCascade(bot_exit=cascade_bot_exit, human_exit=cascade_human_exit,
+                                     min_agents_bot=cascade_min_agents_bot,
+                                     fusion=score_fusion)
+    explanations = ExplanationCache(explanation_db, FEATURE_VERSION) if explanation_db else None
+    return BotDetectionOrchestrator(llm, neo4j_graph, faiss_index,
+                                    similarity_mode=similarity_mode, numeric_index=numeric_index,
+                                    fusion=score_fusion, cascade=agent_cascade,
+                                    fast=fast, fast_max_tokens=fast_max_tokens,
+                                    review_threshold=review_threshold, explanations=explanations)
+
+def ensure_numeric_index(orchestrator: BotDetectionOrchestrator, numeric_index_path: str = None) -> NumericFeatureIndex:
+    """
+    The orchestrator's numeric feature index, loaded from ``numeric_index_path`` or built
+    (and saved there) if not ready yet or if the cached index is stale.
+    """
+    if orchestrator.numeric_index is None:
+        orchestrator.numeric_index = NumericFeatureIndex()
+    numeric_index = orchestrator.numeric_index
+    if numeric_index.faiss_index is None:
+        numeric_index.load_or_build(numeric_index_path)
+    return numeric_index
+
+def build_similarity_edges(orchestrator: BotDetectionOrchestrator, source: str = "numeric", k: int = 3,
+                           numeric_index_path: str = None,
+                           embedding_file: str = "ml/model/player_embeddings_4000.npy") -> Dict[str, Any]:
+    """
+    Writes SIMILAR_TO edges for every player from one bulk kNN pass, for ``similarity_mode="graph"``.
+
+    Args:
+        source: "numeric" links players by standardized feature vectors, "text" by the
+            stored player embeddings
+        k: Neighbours per player
+    """
+    from ml.similarity_graph import build_similar_to_edges
+
+    if source == "text":
+        import numpy as np
+
+        from src.data_ingestion.load_data import load_player_data
+
+        if orchestrator.faiss_index.faiss_index is None:
+            orchestrator.faiss_index.load_index(load_player_data(), embedding_file)
+        vectors = np.load(embedding_file, mmap_mode="r")
+        return build_similar_to_edges(orchestrator.neo4j_graph, orchestrator.faiss_index.player_ids, vectors,
+                                      index=orchestrator.faiss_index.faiss_index, k=k)
+
+    numeric_index = ensure_numeric_index(orchestrator, numeric_index_path)
+    return build_similar_to_edges(orchestrator.neo4j_graph, numeric_index.player_ids, numeric_index.vectors,
+                                  index=numeric_index.faiss_index, k=k)
+
+def print_report(report: Dict[str, Any]):
+    print(f"Player {report['player_id']}: {report['classification_result']}")
+
+def thread_id(sweep_id: str, player_id: str) -> str:
+    """Graph checkpoint thread of a player within a sweep."""
+    return f"{sweep_id}:{player_id}"
+
+def completion_recorder(ledger: CompletionLedger, sweep_id: str,
+                        checkpointer: Any = None) -> Callable[[List[Dict[str, Any]]], None]:
+    """
+    Returns the ``on_durable`` callback of a sweep: marks the players of durable reports
+    completed, then deletes their graph checkpoints, which are no longer needed to resume.
+    """
+    def record(reports: List[Dict[str, Any]]):
+        ledger.mark_reports(reports)
+        if checkpointer is not None:
+            for report in reports:
+                checkpointer.delete_thread(thread_id(sweep_id, report["player_id"]))
+    return record
+
+def run_sweep(
+    workflow: Any,
+    player_ids: Iterable[str],
+    sweep_id: str,
+    report_sink: Callable[[Dict[str, Any]], None] = print_report,
+    fingerprints: Dict[str, str] = None,
+    failed: List[str] = None
+) -> int:
+    """
+    Drives a sweep as one bounded graph invocation per player.
+
+    ``player_ids`` may be lazy (e.g. a ``BudgetScheduler``), so the next player is only
+    chosen after the previous one finished. Nothing accumulates across players: each
+    finished report is handed to ``report_sink`` and dropped, so memory stays flat
+    however many players are swept. ``fingerprints`` maps player ids to their current
+    feature fingerprint, which is stamped on the persisted classification.
+
+    When the workflow was compiled with a checkpointer, a player interrupted mid-graph
+    is resumed from its checkpoint, and a player whose graph finished but whose report
+    was lost before it became durable (e.g. still buffered in a writer at a crash) has
+    its checkpointed report handed over again instead of being rescored.
+
+    A player whose analysis fails is logged and skipped; when ``failed`` is given, its
+    id is appended there so the caller can retry or give up on the sweep.
+
+    Returns:
+        The number of players that produced a report.
+    """
+    completed = 0
+    for player_id in player_ids:
+        config = {"configurable": {"thread_id": thread_id(sweep_id, player_id)}}
+        try:
+            snapshot = workflow.get_state(config) if workflow.checkpointer is not None else None
+            if snapshot is not None and snapshot.next:
+                result = workflow.invoke(None, config)
+            elif snapshot is not None and snapshot.values.get("report") and (
+                    fingerprints is None
+                    or snapshot.values.get("feature_fingerprint") == fingerprints.get(player_id)):
+                result = snapshot.values
+            else:
+                initial_state = {"current_player_id": player_id}
+                if fingerprints is not None:
+                    initial_state["feature_fingerprint"] = fingerprints.get(player_id)
+                result = workflow.invoke(initial_state, config)
+        except Exception as e:
+            print(f"Analysis failed for player {player_id}: {e}")
+            if failed is not None:
+                failed.append(player_id)
+            continue
+
+        if result.get("report"):
+            report_sink(result["report"])
+            completed += 1
+        elif failed is not None:
+            failed.append(player_id)
+    return completed
+
+def run_clustered_sweep(
+    orchestrator: BotDetectionOrchestrator,
+    workflow: Any,
+    plan: Dict[str, Any],
+    sweep_id: str,
+    report_sink: Callable[[Dict[str, Any]], None] = print_report,
+    fingerprints: Dict[str, str] = None,
+    schedule: Iterable[str] = None,
+    min_farm_size: int = 5
+) -> Dict[str, Any]:
+    """
+    Sweeps a clustering plan: representatives and outliers go through the workflow,
+    then each representative's verdict is propagated to the rest of its cluster.
+
+    ``schedule`` overrides the order the individually scored players are handed over
+    in (e.g. a ``BudgetScheduler`` built over them). Members of a cluster whose
+    representative produced no report stay pending for a later sweep.
+
+    Returns:
+        Counts of scored and propagated players, and the clusters classified as bots
+        with at least ``min_farm_size`` members (suspected farms).
+    """
+    representatives = {cluster["representative"]: cluster for cluster in plan["clusters"]}
+    representative_reports: Dict[str, Dict[str, Any]] = {}
+
+    def sink(report: Dict[str, Any]):
+        if report["player_id"] in representatives:
+            representative_reports[report["player_id"]] = report
+        report_sink(report)
+
+    individual = list(representatives) + plan["outliers"]
+    scored = run_sweep(workflow, schedule if schedule is not None else individual, sweep_id,
+                       report_sink=sink, fingerprints=fingerprints)
+
+    propagated, farms = 0, []
+    for representative, cluster in representatives.items():
+        report = representative_reports.get(representative)
+        if report is None or report.get("classification") is None:
+            continue
+        for member, similarity in zip(cluster["members"], cluster["similarity"]):
+            if member == representative:
+                continue
+            state = orchestrator.propagate_verdict(report, member, similarity, cluster["cluster_id"],
+                                                   fingerprints.get(member) if fingerprints else None)
+            orchestrator.persist_classification_to_kg(state)
+            report_sink(orchestrator.generate_report(state)["report"])
+            propagated += 1
+        if report["classification"] == "Bot" and len(cluster["members"]) >= min_farm_size:
+            farms.append({
+                "cluster_id": cluster["cluster_id"],
+                "representative": representative,
+                "size": len(cluster["members"]),
+                "confidence": report.get("classification_confidence"),
+                "mean_similarity": round(sum(cluster["similarity"]) / len(cluster["similarity"]), 4),
+                "members": cluster["members"],
+            })
+    farms.sort(key=lambda farm: farm["size"], reverse=True)
+    return {"scored": scored, "propagated": propagated, "farms": farms}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a bot detection sweep.")
+    parser.add_argument("--sweep-id", default=None,
+                        help="Sweep identifier; pass an earlier one to resume an interrupted sweep")
+    parser.add_argument("--checkpoint-db", default="sweep_checkpoints.sqlite",
+                        help="SQLite file holding graph checkpoints and the completion ledger")
+    parser.add_argument("--sample-size", type=int, default=None,
+                        help="Analyze a random sample of this many players instead of the full population")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="Only analyze players that are new or whose features, feature version or "
+                             "model changed since their stored classification")
+    parser.add_argument("--ingest", action="store_true", help="Populate the knowledge graph before sweeping")
+    parser.add_argument("--similarity-mode", choices=["text", "numeric", "graph"], default="text",
+                        help="How similar players are found: text embeddings, standardized numeric feature "
+                             "vectors, or precomputed SIMILAR_TO edges in the knowledge graph")
+    parser.add_argument("--build-similar-to", choices=["text", "numeric"], default=None,
+                        help="Recompute SIMILAR_TO edges for every player from these vectors before sweeping")
+    parser.add_argument("--similar-to-k", type=int, default=3, help="Neighbours per player for --build-similar-to")
+    parser.add_argument("--numeric-index", default=None,
+                        help="Cache file (.npz) for the numeric feature index; built and saved if missing")
+    parser.add_argument("--fusion", default=None,
+                        help="Replace the LLM classifier with local score fusion: 'rules', or the path of a "
+                             "logistic calibration JSON; the LLM is kept for conflicting cases")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Run the agents cheapest-first and skip the rest once the scores are decisive")
+    parser.add_argument("--cascade-bot-exit", type=float, default=0.85,
+                        help="Fused bot probability at which the cascade stops and settles on bot")
+    parser.add_argument("--cascade-human-exit", type=float, default=0.2,
+                        help="Fused bot probability at which the cascade stops and settles on human")
+    parser.add_argument("--cascade-min-agents-bot", type=int, default=2,
+                        help="Agents that must have scored before the cascade settles on bot")
+    parser.add_argument("--fast", action="store_true",
+                        help="Agents return only their score under a tight output token limit; plain-English "
+                             "explanations are written only for players that need review")
+    parser.add_argument("--fast-max-tokens", type=int, default=FAST_MAX_TOKENS,
+                        help="Output token limit for score-only agent and classifier calls")
+    parser.add_argument("--review-threshold", type=float, default=None,
+                        help="Fused bot probability from which a player gets a plain-English explanation "
+                             f"(bot verdicts always do); defaults to {DEFAULT_REVIEW_THRESHOLD} with --fast, "
+                             "off otherwise")
+    parser.add_argument("--explain", nargs="+", default=None, metavar="PLAYER_ID",
+                        help="Print the plain-English explanation for these players and exit; cached "
+                             "explanations are reused, missing ones are generated")
+    parser.add_argument("--embedding-backend", choices=["torch", "onnx"], default="torch",
+                        help="Query encoder for similar-player search; onnx runs the int8 export on CPU")
+    parser.add_argument("--encoder-threads", type=int, default=0,
+                        help="CPU threads for the onnx encoder (0 lets the runtime decide)")
+    parser.add_argument("--embedding-storage", choices=list(STORAGE_FORMATS), default="float32",
+                        help="Vector storage for the player index; float16/int8/pq trade recall for memory")
+    parser.add_argument("--report-dir", default=None,
+                        help="Directory to stream reports to; reports are only printed when omitted")
+    parser.add_argument("--report-format", choices=sorted(REPORT_WRITERS), default="jsonl")
+    parser.add_argument("--reports-per-file", type=int, default=100_000,
+                        help="Rotate to a new report file after this many reports")
+    parser.add_argument("--prioritize", action="store_true",
+                        help="Score players most-suspicious first by a cheap feature-based prior "
+                             "(implied by --token-budget/--cost-budget)")
+    parser.add_argument("--suspicion-prior", default=None,
+                        help="Fitted suspicion prior JSON (evaluate.py --fit-prior); default signal weights otherwise")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Stop dispatching players once this many LLM tokens are spent")
+    parser.add_argument("--cost-budget", type=float, default=None,
+                        help="Stop dispatching players once this much LLM spend (USD) is reached")
+    parser.add_argument("--prompt-price", type=float, default=DEFAULT_PROMPT_PRICE,
+                        help="USD per million prompt tokens, for --cost-budget")
+    parser.add_argument("--completion-price", type=float, default=DEFAULT_COMPLETION_PRICE,
+                        help="USD per million completion tokens, for --cost-budget")
+    parser.add_argument("--cluster", action="store_true",
+                        help="Group near-duplicate players (bot farms) by their numeric feature vectors, score one "
+                             "representative per tight cluster and propagate its verdict to the members")
+    parser.add_argument("--cluster-radius", type=float, default=0.05,
+                        help="Mean squared difference per standardized feature below which players are near-duplicates")
+    parser.add_argument("--cluster-min-size", type=int, default=3,
+                        help="Smallest group of near-duplicates scored as a cluster")
+    parser.add_argument("--min-farm-size", type=int, default=5,
+                        help="Smallest bot cluster listed as a suspected farm")
+    parser.add_argument("--farm-report", default=None,
+                        help="Where to write clusters classified as bots (suspected farms) as JSON")
+    parser.add_argument("--unscored-file", default=None,
+                        help="Where to write the players left unscored when the budget ran out (JSON)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    sweep_id = args.sweep_id or uuid.uuid4().hex
+
+    ledger = CompletionLedger(args.checkpoint_db, FEATURE_VERSION)
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    from src.data_ingestion.change_detection import (
+        compute_feature_fingerprints,
+        detect_changed_players,
+        load_stored_fingerprints,
     )
-    faiss_index = FAISSIndex()
 
-    # Load and sample player data
-    player_df = load_player_data()
-    player_ids = player_df['Actor'].unique().tolist()
-    
-    sample_size = min(30, len(player_ids))
-    sampled_player_ids = random.sample(player_ids, sample_size)
+    checkpointer = SqliteSaver(sqlite3.connect(args.checkpoint_db, check_same_thread=False))
+    review_threshold = args.review_threshold
+    if review_threshold is None and args.fast:
+        review_threshold = DEFAULT_REVIEW_THRESHOLD
 
     # Initialize orchestrator
-    orchestrator = BotDetectionOrchestrator(llm, neo4j_graph, faiss_index)
-    workflow = orchestrator.create_workflow()
-
-    # Prepare initial state
-    initial_state = {
-        "player_ids": sampled_player_ids[1:],
-        "current_player_id": sampled_player_ids[0],
-        "remaining_steps": 100,
-        "reports": []
-    }
+    orchestrator = build_orchestrator(embedding_backend=args.embedding_backend,
+                                      encoder_threads=args.encoder_threads,
+                                      embedding_storage=args.embedding_storage,
+                                      similarity_mode=args.similarity_mode,
+                                      numeric_index_path=args.numeric_index,
+                                      fusion=args.fusion,
+                                      cascade=args.cascade,
+                                      cascade_bot_exit=args.cascade_bot_exit,
+                                      cascade_human_exit=args.cascade_human_exit,
+                                      cascade_min_agents_bot=args.cascade_min_agents_bot,
+                                      fast=args.fast,
+                                      fast_max_tokens=args.fast_max_tokens,
+                                      review_threshold=review_threshold,
+                                      explanation_db=args.checkpoint_db)
+    orchestrator.sweep_id = sweep_id
+    workflow = orchestrator.create_workflow(checkpointer=checkpointer)
+
+    if args.explain:
+        for player_id in args.explain:
+            explanation = orchestrator.explain(player_id)
+            print(f"Player {player_id}:\n{explanation or 'Not found in the knowledge graph'}\n")
+        return
+
+    if args.ingest:
+        orchestrator.data_ingestion()
+    if args.build_similar_to:
+        build_similarity_edges(orchestrator, args.build_similar_to, args.similar_to_k,
+                               numeric_index_path=args.numeric_index)
+
+    # The prioritized sweep needs the tables for its suspicion prior too, so load them once
+    prioritize = args.prioritize or args.token_budget is not None or args.cost_budget is not None
+    tables = None
+    if prioritize:
+        from src.data_ingestion.load_data import (
+            load_action_data, load_group_data, load_network_data, load_player_data, load_social_data,
+        )
+
+        tables = {
+            "player": load_player_data(),
+            "action": load_action_data(),
+            "social": load_social_data(),
+            "group": load_group_data(),
+            "network": load_network_data(),
+        }
+
+    # Fingerprint current feature rows; with --changed-only, diff them against the
+    # fingerprints stored on existing classifications and drop unchanged players
+    fingerprints = compute_feature_fingerprints(list(tables.values()) if tables else None)
+    orchestrator.fingerprints = fingerprints
+    player_ids = list(fingerprints)
+    if args.changed_only:
+        stored = load_stored_fingerprints(orchestrator.neo4j_graph)
+        player_ids = detect_changed_players(fingerprints, stored, FEATURE_VERSION, MODEL_NAME)
+        print(f"{len(player_ids)} of {len(fingerprints)} players are new or changed")
+
+    # Skip players already classified for this feature version; the sample is seeded
+    # by the sweep id so resuming a sampled sweep picks up the same players
+    if args.sample_size:
+        player_ids = random.Random(sweep_id).sample(player_ids, min(args.sample_size, len(player_ids)))
+    player_ids = ledger.pending(player_ids, fingerprints)
+    if not player_ids:
+        print(f"All players already classified for feature version {FEATURE_VERSION}")
+        return
+
+    # With --cluster only representatives and outliers are scored; the rest inherit verdicts
+    plan = None
+    scored_ids = player_ids
+    if args.cluster:
+        numeric_index = ensure_numeric_index(orchestrator, args.numeric_index)
+        indexed = [pid for pid in player_ids if pid in numeric_index.row_by_player]
+        rows = [numeric_index.row_by_player[pid] for pid in indexed]
+        clusterer = PlayerClusterer(radius=args.cluster_radius, min_cluster_size=args.cluster_min_size)
+        plan = clusterer.plan(indexed, numeric_index.vectors[rows])
+        # Players without a feature vector can't be clustered; score them on their own
+        indexed_set = set(indexed)
+        plan["outliers"] += [pid for pid in player_ids if pid not in indexed_set]
+        scored_ids = [c["representative"] for c in plan["clusters"]] + plan["outliers"]
+
+    # Prioritized sweeps hand players over most-suspicious first and stop at the budget
+    schedule = scored_ids
+    scheduler = None
+    if prioritize:
+        prior = SuspicionPrior.load(args.suspicion_prior) if args.suspicion_prior else None
+        priors = suspicion_priors(tables, prior)
+        scheduler = BudgetScheduler({pid: priors.get(pid, 0.0) for pid in scored_ids}, orchestrator.llm.stats,
+                                    token_budget=args.token_budget, cost_budget=args.cost_budget,
+                                    prompt_price=args.prompt_price, completion_price=args.completion_price,
+                                    calibrated=prior is not None)
+        schedule = iter(scheduler)
+
+    def sweep(report_sink):
+        if plan is None:
+            return run_sweep(workflow, schedule, sweep_id, report_sink=report_sink, fingerprints=fingerprints)
+        result = run_clustered_sweep(orchestrator, workflow, plan, sweep_id, report_sink=report_sink,
+                                     fingerprints=fingerprints, schedule=schedule,
+                                     min_farm_size=args.min_farm_size)
+        print(f"Clustered sweep: {result['scored']} players scored, {result['propagated']} verdicts propagated, "
+              f"{len(result['farms'])} suspected farms")
+        if args.farm_report:
+            with open(args.farm_report, "w") as f:
+                json.dump({"sweep_id": sweep_id, "farms": result["farms"]}, f)
+            print(f"Suspected farms written to {args.farm_report}")
+        return result["scored"] + result["propagated"]
+
+    # Players are marked completed only once their report is durable: after the writer
+    # flushed it to disk, or after it was printed
+    record_completion = completion_recorder(ledger, sweep_id, checkpointer)
+
+    def print_and_mark(report):
+        print_report(report)
+        record_completion([report])
+
+    print(f"Running sweep {sweep_id} over {len(player_ids)} players")
+    if args.report_dir:
+        with make_report_writer(args.report_dir, args.report_format, prefix=f"reports-{sweep_id}",
+                                max_records_per_file=args.reports_per_file,
+                                on_durable=record_completion) as writer:
+            completed = sweep(writer)
+        print(f"Reports written to {args.report_dir}")
+    else:
+        completed = sweep(print_and_mark)
+    print(f"Bot Detection Analysis Complete: {completed}/{len(player_ids)} players classified")
 
-    # Execute workflow
-    results = workflow.invoke(initial_state, {"recursion_limit": 250})
-    print("Bot Detection Analysis Complete:")
-    for report in results.get('reports', []):
-        print(f"Player {report['player_id']}: {report['classification_result']}")
+    if scheduler is not None:
+        summary = scheduler.summary()
+        expected = ""
+        if summary["expected_bots_unscored"] is not None:
+            expected = f" (~{summary['expected_bots_unscored']} expected bots by the fitted prior)"
+        print(f"Budget: {summary['tokens_spent']} tokens, ${summary['cost_spent']:.4f} spent; "
+              f"{summary['unscored']} players left unscored{expected}")
+        if args.unscored_file:
+            with open(args.unscored_file, "w") as f:
+                json.dump({"sweep_id": sweep_id, **summary, "players": scheduler.unscored()}, f)
+            print(f"Unscored players written to {args.unscored_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
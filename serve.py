@@ -0,0 +1,460 @@
+"""
+Online bot-scoring service around ``BotDetectionOrchestrator``.
+
+Answers "is player X a bot?" on demand over HTTP. Concurrent requests are coalesced
+into micro-batches: a batch is cut when it reaches ``--max-batch-size`` players or its
+oldest request has waited ``--max-wait-ms``, and is then scored with one feature query
+per table, one encoder pass and one ``llm.batch`` per agent (see
+``BotDetectionOrchestrator.score_players``). Up to ``--batch-workers`` batches are in
+flight at once. Recently scored players are answered from a TTL cache, and every
+request is bounded by ``--request-timeout``.
+
+    python serve.py --port 8080 --fusion rules --cascade
+
+Endpoints:
+    GET  /players/<actor_id>             verdict for one player
+    GET  /players/<actor_id>/explanation plain-English explanation, written on first request
+    POST /score {"player_ids": [...]}    verdicts for many players
+    GET  /health                         batching, cache, latency and LLM counters
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from main import DEFAULT_REVIEW_THRESHOLD, FAST_MAX_TOKENS, build_orchestrator, BotDetectionOrchestrator
+from ml.search_agent import STORAGE_FORMATS
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class Overloaded(Exception):
+    """Raised when the batch queue is full; surfaced to clients as 503."""
+
+
+class VerdictCache:
+    """
+    In-memory verdict cache with a time-to-live and LRU eviction.
+
+    Only touched from the event loop thread, so it needs no locking.
+    """
+
+    def __init__(self, ttl_seconds: float = 900.0, max_entries: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, player_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(player_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            if entry is not None:
+                del self._entries[player_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(player_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, player_id: str, verdict: Dict[str, Any]):
+        self._entries[player_id] = (time.monotonic(), verdict)
+        self._entries.move_to_end(player_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class MicroBatcher:
+    """
+    Coalesces single-player requests into batches for a blocking batch function.
+
+    Requests for a player that is already queued or being scored share its future,
+    so a burst of reports about the same player costs one scoring run.
+
+    Args:
+        process_batch: Scores a list of player ids, returning results keyed by id;
+            runs on a worker thread
+        max_batch_size: Players per batch
+        max_wait_ms: Longest a request waits for its batch to fill
+        batch_workers: Batches processed concurrently
+        max_queue: Queued players beyond which new requests are rejected
+    """
+
+    def __init__(self, process_batch: Callable[[List[str]], Dict[str, Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 20.0, batch_workers: int = 4, max_queue: int = 10_000):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_workers = batch_workers
+        self.queue: asyncio.Queue = None
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=batch_workers, thread_name_prefix="score-batch")
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._workers: List[asyncio.Task] = []
+        self.batches = 0
+        self.batched_players = 0
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.batch_workers)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+
+    def submit(self, player_id: str) -> asyncio.Future:
+        future = self._inflight.get(player_id)
+        if future is not None:
+            return future
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait(player_id)
+        except asyncio.QueueFull:
+            raise Overloaded(f"Scoring queue is full ({self.max_queue} players)")
+        self._inflight[player_id] = future
+        return future
+
+    async def _next_batch(self) -> List[str]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.batches += 1
+            self.batched_players += len(batch)
+            try:
+                results = await loop.run_in_executor(self.executor, self.process_batch, batch)
+            except Exception as e:
+                print(f"Batch of {len(batch)} players failed: {e}")
+                for player_id in batch:
+                    future = self._inflight.pop(player_id, None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+                continue
+            for player_id in batch:
+                future = self._inflight.pop(player_id, None)
+                if future is not None and not future.done():
+                    future.set_result(results.get(player_id))
+
+
+class ScoringService:
+    """
+    HTTP front end: answers from the verdict cache, batches the rest and times out slow requests.
+
+    Args:
+        orchestrator: Configured orchestrator; ``score_players`` is called from worker threads
+        batcher_options: Keyword arguments for ``MicroBatcher``
+        cache_ttl: Seconds a verdict is served from cache
+        request_timeout: Upper bound on the time a request waits for its verdicts
+        max_ids_per_request: Largest accepted bulk request
+    """
+
+    def __init__(self, orchestrator: BotDetectionOrchestrator, batcher_options: Dict[str, Any] = None,
+                 cache_ttl: float = 900.0, request_timeout: float = 30.0, max_ids_per_request: int = 1000):
+        self.orchestrator = orchestrator
+        self.batcher = MicroBatcher(self._score_batch, **(batcher_options or {}))
+        self.cache = VerdictCache(ttl_seconds=cache_ttl)
+        self.request_timeout = request_timeout
+        self.max_ids_per_request = max_ids_per_request
+        self.latencies = deque(maxlen=10_000)
+        self.requests = 0
+
+    def _score_batch(self, player_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        states = self.orchestrator.score_players(player_ids)
+        return {
+            pid: {"player_id": pid, "error": state["error"]} if state.get("error")
+            else self.orchestrator.build_report(state)
+            for pid, state in states.items()
+        }
+
+    def _cache_result(self, player_id: str, future: asyncio.Future):
+        # Failed verdicts are not cached, so the next request retries them
+        if not future.cancelled() and future.exception() is None and future.result() is not None \
+                and "error" not in future.result():
+            self.cache.put(player_id, future.result())
+
+    async def score(self, player_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Verdicts for ``player_ids``; players unknown to the knowledge graph map to None."""
+        verdicts: Dict[str, Optional[Dict[str, Any]]] = {}
+        futures: Dict[str, asyncio.Future] = {}
+        for player_id in dict.fromkeys(player_ids):
+            cached = self.cache.get(player_id)
+            if cached is not None:
+                verdicts[player_id] = cached
+                continue
+            future = self.batcher.submit(player_id)
+            future.add_done_callback(partial(self._cache_result, player_id))
+            futures[player_id] = future
+
+        if futures:
+            # Shielded so a timed-out request doesn't cancel a batch other requests share
+            results = await asyncio.wait_for(
+                asyncio.gather(*(asyncio.shield(f) for f in futures.values())), self.request_timeout
+            )
+            verdicts.update(zip(futures, results))
+        return verdicts
+
+    def health(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else None
+
+        batches = self.batcher.batches
+        return {
+            "status": "ok",
+            "requests": self.requests,
+            "queued": self.batcher.queue.qsize() if self.batcher.queue is not None else 0,
+            "batches": batches,
+            "mean_batch_size": self.batcher.batched_players / batches if batches else None,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+            "llm": self.orchestrator.llm.stats.as_dict(),
+        }
+
+    @staticmethod
+    def _parse_ids(values: List[Any]) -> List[str]:
+        # Actor ids are integers in the HCRL data; normalizing also rejects anything else
+        return [str(int(value)) for value in values]
+
+    async def explain(self, player_id: str) -> Optional[str]:
+        """Explanation for one player, from the orchestrator's cache or generated on a worker thread."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(self.batcher.executor, self.orchestrator.explain, player_id), self.request_timeout
+        )
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        path = path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            return 200, self.health()
+
+        if path.startswith("/players/") and path.endswith("/explanation"):
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            try:
+                player_id = self._parse_ids([path[len("/players/"):-len("/explanation")]])[0]
+            except ValueError:
+                return 400, {"error": "Actor id must be an integer"}
+            explanation = await self.explain(player_id)
+            if explanation is None:
+                return 404, {"error": f"Player {player_id} not found"}
+            return 200, {"player_id": player_id, "explanation": explanation}
+
+        if path.startswith("/players/"):
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            try:
+                player_id = self._parse_ids([path[len("/players/"):]])[0]
+            except ValueError:
+                return 400, {"error": "Actor id must be an integer"}
+            verdict = (await self.score([player_id]))[player_id]
+            if verdict is None:
+                return 404, {"error": f"Player {player_id} not found"}
+            return 200, verdict
+
+        if path == "/score":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            try:
+                player_ids = self._parse_ids(json.loads(body or b"{}")["player_ids"])
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": 'Body must be {"player_ids": [<actor id>, ...]}'}
+            if len(player_ids) > self.max_ids_per_request:
+                return 400, {"error": f"At most {self.max_ids_per_request} player ids per request"}
+            return 200, {"verdicts": await self.score(player_ids)}
+
+        return 404, {"error": f"No route for {path}"}
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool):
+        data = json.dumps(payload, default=str).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Minimal HTTP/1.1 handler with keep-alive; request bodies need a Content-Length.
+        A malformed request gets a 400 and the connection is closed.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    content_length = int(headers.get("content-length") or 0)
+                    if content_length < 0:
+                        raise ValueError(f"negative Content-Length {content_length}")
+                except ValueError as e:
+                    await self._respond(writer, 400, {"error": f"Malformed request: {e}"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(content_length)
+
+                start = time.perf_counter()
+                self.requests += 1
+                try:
+                    status, payload = await self.route(method, path, body)
+                except Overloaded as e:
+                    status, payload = 503, {"error": str(e)}
+                except asyncio.TimeoutError:
+                    status, payload = 504, {"error": f"Scoring took longer than {self.request_timeout}s"}
+                except Exception as e:
+                    print(f"Request {method} {path} failed: {e}")
+                    status, payload = 500, {"error": str(e)}
+                self.latencies.append(time.perf_counter() - start)
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def warm_up(orchestrator: BotDetectionOrchestrator):
+    """
+    Loads the similarity index and encoder before serving, so batch threads never race
+    to build them. Graph mode reads neighbours from SIMILAR_TO edges and needs neither.
+    """
+    from src.data_ingestion.load_data import load_player_data
+
+    if orchestrator.similarity_mode == "graph":
+        return
+    if orchestrator.similarity_mode == "numeric":
+        if orchestrator.numeric_index.faiss_index is None:
+            orchestrator.numeric_index.build()
+    else:
+        if orchestrator.faiss_index.faiss_index is None:
+            orchestrator.faiss_index.load_index(load_player_data())
+        orchestrator.faiss_index.load_model()
+
+
+async def serve(service: ScoringService, host: str, port: int):
+    service.batcher.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Scoring service listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.stop()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve bot verdicts over HTTP with request micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=32, help="Players scored together in one batch")
+    parser.add_argument("--max-wait-ms", type=float, default=20.0,
+                        help="Longest a request waits for its batch to fill before the batch is cut")
+    parser.add_argument("--batch-workers", type=int, default=4, help="Batches scored concurrently")
+    parser.add_argument("--queue-size", type=int, default=10_000,
+                        help="Queued players beyond which requests are rejected with 503")
+    parser.add_argument("--cache-ttl", type=float, default=900.0, help="Seconds a verdict is served from cache")
+    parser.add_argument("--request-timeout", type=float, default=30.0,
+                        help="Seconds a request may wait for its verdicts before returning 504")
+    parser.add_argument("--max-ids-per-request", type=int, default=1000)
+    parser.add_argument("--llm-cache", default=None, help="Shelve file for caching LLM responses")
+    parser.add_argument("--similarity-mode", choices=["text", "numeric", "graph"], default="text")
+    parser.add_argument("--numeric-index", default=None)
+    parser.add_argument("--fusion", default=None,
+                        help="'rules' or a logistic calibration JSON; skips the LLM classifier for clear cases")
+    parser.add_argument("--cascade", action="store_true", help="Run agents cheapest-first with early exit")
+    parser.add_argument("--fast", action="store_true",
+                        help="Score-only agent calls; explanations only for flagged players or on request")
+    parser.add_argument("--fast-max-tokens", type=int, default=FAST_MAX_TOKENS)
+    parser.add_argument("--review-threshold", type=float, default=None,
+                        help="Fused bot probability from which verdicts include an explanation "
+                             f"(default {DEFAULT_REVIEW_THRESHOLD} with --fast)")
+    parser.add_argument("--explanation-db", default="sweep_checkpoints.sqlite",
+                        help="SQLite file caching explanations; share the sweep's checkpoint database to reuse them")
+    parser.add_argument("--embedding-backend", choices=["torch", "onnx"], default="torch")
+    parser.add_argument("--encoder-threads", type=int, default=0)
+    parser.add_argument("--embedding-storage", choices=list(STORAGE_FORMATS), default="float32")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    review_threshold = args.review_threshold
+    if review_threshold is None and args.fast:
+        review_threshold = DEFAULT_REVIEW_THRESHOLD
+    orchestrator = build_orchestrator(llm_cache_path=args.llm_cache,
+                                      embedding_backend=args.embedding_backend,
+                                      encoder_threads=args.encoder_threads,
+                                      embedding_storage=args.embedding_storage,
+                                      similarity_mode=args.similarity_mode,
+                                      numeric_index_path=args.numeric_index,
+                                      fusion=args.fusion,
+                                      cascade=args.cascade,
+                                      fast=args.fast,
+                                      fast_max_tokens=args.fast_max_tokens,
+                                      review_threshold=review_threshold,
+                                      explanation_db=args.explanation_db)
+    warm_up(orchestrator)
+    service = ScoringService(
+        orchestrator,
+        batcher_options={
+            "max_batch_size": args.max_batch_size,
+            "max_wait_ms": args.max_wait_ms,
+            "batch_workers": args.batch_workers,
+            "max_queue": args.queue_size,
+        },
+        cache_ttl=args.cache_ttl,
+        request_timeout=args.request_timeout,
+        max_ids_per_request=args.max_ids_per_request,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        orchestrator.llm.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Sharded bot-detection sweep across processes and hosts.
+
+The coordinator hash-partitions the actor ids into shards and enqueues them in a
+file-based work queue (``src/work_queue.py``). Workers claim shards and sweep them with
+their own ``BotDetectionOrchestrator``, writing one report stream per shard. A
+worker can be a process in the coordinator's local pool or a process on another host
+that shares the work directory. When every shard is done, the coordinator merges the
+per-shard reports into one report set.
+
+Each shard keeps its own checkpoint/ledger database in the work directory, so a shard
+that is reassigned after a worker crash or lease expiry resumes where it stopped.
+
+    # one host, 8 worker processes, 64 shards
+    python sharded_sweep.py coordinate --work-dir sweeps/run1 --shards 64 --workers 8
+
+    # extra hosts attach to the same (shared) work directory
+    python sharded_sweep.py work --work-dir /mnt/shared/sweeps/run1
+
+With ``--index-file``, the coordinator writes the FAISS index once and workers
+memory-map it, so all processes on a host share one copy of the index pages.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List
+
+import import_paths  # noqa: F401  (maps ml / src.data_ingestion onto this checkout)
+from ml.search_agent import STORAGE_FORMATS, FAISSIndex
+from src.data_ingestion.report_sink import REPORT_WRITERS, make_report_writer
+from src.data_ingestion.work_queue import WorkQueue, default_worker_id, partition
+
+SWEEP_FILE = "sweep.json"
+
+
+def _leased(player_ids: List[str], lease_lost: threading.Event) -> Iterator[str]:
+    """Yields players until the worker loses its lease on the shard."""
+    for player_id in player_ids:
+        if lease_lost.is_set():
+            print("Lease on shard lost, stopping")
+            return
+        yield player_id
+
+
+def _heartbeat(queue: WorkQueue, shard: Dict[str, Any], interval: float,
+               stop: threading.Event, lease_lost: threading.Event):
+    while not stop.wait(interval):
+        if not queue.heartbeat(shard):
+            lease_lost.set()
+            return
+
+
+def run_worker(work_dir: str, worker_id: str = None, idle_exit: bool = True, poll_interval: float = 5.0) -> int:
+    """
+    Claims and sweeps shards until the queue is drained.
+
+    Builds one orchestrator per worker process; the embedding index is memory-mapped
+    from the sweep's index file when one was written.
+
+    Returns:
+        The number of shards this worker completed.
+    """
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    from main import FEATURE_VERSION, build_orchestrator, completion_recorder, run_sweep
+    from src.data_ingestion.ledger import CompletionLedger
+    from src.data_ingestion.load_data import load_player_data
+
+    with open(os.path.join(work_dir, SWEEP_FILE)) as f:
+        sweep = json.load(f)
+    worker_id = worker_id or default_worker_id()
+    queue = WorkQueue(os.path.join(work_dir, "queue"), max_attempts=sweep["max_attempts"])
+    lease_seconds = sweep["lease_seconds"]
+
+    orchestrator = None
+    completed_shards = 0
+    state_dir = os.path.join(work_dir, "state")
+    os.makedirs(state_dir, exist_ok=True)
+    while True:
+        shard = queue.claim(worker_id)
+        if shard is None:
+            if idle_exit or queue.is_finished():
+                break
+            time.sleep(poll_interval)
+            continue
+
+        if orchestrator is None:
+            # Built after the first claim so a worker that finds the queue empty exits cheaply
+            orchestrator = build_orchestrator(**sweep["orchestrator"])
+            if sweep.get("index_file") and orchestrator.similarity_mode == "text":
+                orchestrator.faiss_index.load_saved_index(load_player_data(), sweep["index_file"], mmap=True)
+            orchestrator.sweep_id = sweep["sweep_id"]
+
+        name = f"shard-{shard['shard']:05d}"
+        print(f"Worker {worker_id} sweeping {name} ({len(shard['player_ids'])} players)")
+        stop, lease_lost = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(queue, shard, lease_seconds / 3, stop, lease_lost),
+                                     daemon=True)
+        heartbeat.start()
+        db_path = os.path.join(state_dir, f"{name}.sqlite")
+        ledger = CompletionLedger(db_path, FEATURE_VERSION)
+        try:
+            checkpointer = SqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+            workflow = orchestrator.create_workflow(checkpointer=checkpointer)
+
+            player_ids = ledger.pending(shard["player_ids"], shard.get("fingerprints"))
+            failed: List[str] = []
+            record_completion = completion_recorder(ledger, sweep["sweep_id"], checkpointer)
+            with make_report_writer(os.path.join(work_dir, "shard_reports"), sweep["report_format"],
+                                    prefix=name, on_durable=record_completion) as writer:
+                run_sweep(workflow, _leased(player_ids, lease_lost), sweep["sweep_id"],
+                          report_sink=writer, fingerprints=shard.get("fingerprints"), failed=failed)
+            if failed:
+                # Back to pending (or failed once out of attempts); the retry only
+                # sweeps these players, since the rest are in the shard's ledger
+                raise RuntimeError(f"{len(failed)} players failed, e.g. {failed[:5]}")
+        except Exception as e:
+            queue.fail(shard, f"{type(e).__name__}: {e}")
+            continue
+        finally:
+            stop.set()
+            heartbeat.join()
+            ledger.close()
+
+        if not lease_lost.is_set() and queue.complete(shard):
+            completed_shards += 1
+    if orchestrator is not None:
+        orchestrator.llm.close()
+    return completed_shards
+
+
+def _read_reports(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the reports of one shard part, skipping what a crashed worker left unreadable:
+    a Parquet part that was never closed (no footer) or a torn last JSONL line. Players
+    in such a part were not marked completed, so a retry of the shard reported them again.
+    """
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            table = pq.read_table(path)
+        except (pa.ArrowInvalid, OSError) as e:
+            print(f"Skipping unreadable report part {path}: {e}")
+            return
+        yield from table.to_pylist()
+        return
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping torn line {number} of {path}")
+
+
+def merge_reports(work_dir: str, output_dir: str, report_format: str, sweep_id: str,
+                  max_records_per_file: int = 100_000) -> int:
+    """
+    Merges the per-shard report files into one report set, one shard at a time.
+
+    Shards partition the players, so duplicates only occur within a shard (a reassigned
+    shard may have reported some players twice); the newest report per player is kept.
+    Only one shard's reports are held in memory at once.
+    """
+    extension = REPORT_WRITERS[report_format].extension
+    paths = sorted(glob.glob(os.path.join(work_dir, "shard_reports", f"shard-*{extension}")))
+    shards: Dict[str, List[str]] = {}
+    for path in paths:
+        # shard-00003-00001.jsonl -> shard-00003
+        shards.setdefault(os.path.basename(path).rsplit("-", 1)[0], []).append(path)
+
+    merged = 0
+    with make_report_writer(output_dir, report_format, prefix=f"reports-{sweep_id}",
+                            max_records_per_file=max_records_per_file) as writer:
+        for shard_paths in shards.values():
+            latest: Dict[str, Dict[str, Any]] = {}
+            for path in shard_paths:
+                for report in _read_reports(path):
+                    previous = latest.get(str(report["player_id"]))
+                    if previous is None or (report.get("generated_at") or "") >= (previous.get("generated_at") or ""):
+                        latest[str(report["player_id"])] = report
+            for report in latest.values():
+                writer(report)
+            merged += len(latest)
+    print(f"Merged {merged} reports from {len(paths)} shard files into {output_dir}")
+    return merged
+
+
+def prepare_sweep(args) -> Dict[str, Any]:
+    """Writes the sweep description and enqueues the shards; resuming an existing work dir reuses both."""
+    sweep_path = os.path.join(args.work_dir, SWEEP_FILE)
+    if os.path.exists(sweep_path):
+        with open(sweep_path) as f:
+            sweep = json.load(f)
+        print(f"Resuming sweep {sweep['sweep_id']} in {args.work_dir}")
+        return sweep
+
+    from main import DEFAULT_REVIEW_THRESHOLD
+    from ml.numeric_search import NumericFeatureIndex
+    from src.data_ingestion.change_detection import compute_feature_fingerprints
+    from src.data_ingestion.load_data import load_player_data
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    sweep = {
+        "sweep_id": args.sweep_id or uuid.uuid4().hex,
+        "report_format": args.report_format,
+        "lease_seconds": args.lease_seconds,
+        "max_attempts": args.max_attempts,
+        "index_file": args.index_file,
+        "orchestrator": {
+            "llm_cache_path": None,
+            "embedding_backend": args.embedding_backend,
+            "encoder_threads": args.encoder_threads,
+            "embedding_storage": args.embedding_storage,
+            "similarity_mode": args.similarity_mode,
+            "numeric_index_path": args.numeric_index,
+            "fusion": args.fusion,
+            "cascade": args.cascade,
+            "fast": args.fast,
+            # Explanations land in the shard reports; there is no shared cache across hosts
+            "review_threshold": DEFAULT_REVIEW_THRESHOLD if args.fast else None,
+        },
+    }
+
+    # Built once here so workers only memory-map the index (and reuse the numeric index cache);
+    # neither needs the orchestrator's LLM client, agents or checkpointer
+    if args.index_file and not os.path.exists(args.index_file) and args.similarity_mode == "text":
+        faiss_index = FAISSIndex(storage=args.embedding_storage)
+        faiss_index.load_index(load_player_data())
+        faiss_index.save_index(args.index_file)
+    elif args.similarity_mode == "numeric" and args.numeric_index:
+        NumericFeatureIndex().load_or_build(args.numeric_index)
+
+    fingerprints = compute_feature_fingerprints()
+    player_ids = list(fingerprints)
+    if args.sample_size:
+        player_ids = random.Random(sweep["sweep_id"]).sample(player_ids, min(args.sample_size, len(player_ids)))
+    queue = WorkQueue(os.path.join(args.work_dir, "queue"), max_attempts=args.max_attempts)
+    enqueued = queue.enqueue(sweep["sweep_id"], partition(player_ids, args.shards), fingerprints)
+    print(f"Sweep {sweep['sweep_id']}: {len(player_ids)} players in {enqueued} shards")
+
+    with open(sweep_path, "w") as f:
+        json.dump(sweep, f, indent=2)
+    return sweep
+
+
+def coordinate(args):
+    """Runs local workers, reassigns shards of failed or silent workers and merges the reports."""
+    sweep = prepare_sweep(args)
+    queue = WorkQueue(os.path.join(args.work_dir, "queue"), max_attempts=sweep["max_attempts"])
+
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers else None
+    running: Dict[Any, str] = {}
+    restarts = 0
+
+    def start_worker(index: int):
+        worker_id = default_worker_id(index)
+        running[pool.submit(run_worker, args.work_dir, worker_id)] = worker_id
+
+    for index in range(args.workers):
+        start_worker(index)
+
+    while not queue.is_finished():
+        queue.reclaim_expired(sweep["lease_seconds"])
+        if not running:
+            # No local workers (or all exited): wait for remote workers to drain the queue
+            time.sleep(args.poll_interval)
+            continue
+
+        finished, _ = wait(list(running), timeout=args.poll_interval, return_when=FIRST_COMPLETED)
+        pool_broken = False
+        for future in finished:
+            worker_id = running.pop(future)
+            try:
+                print(f"Worker {worker_id} finished {future.result()} shards")
+            except BrokenProcessPool:
+                pool_broken = True
+                queue.release_worker(worker_id, "worker process died")
+            except Exception as e:
+                queue.release_worker(worker_id, f"{type(e).__name__}: {e}")
+
+        if pool_broken:
+            # A crashed process takes the whole pool down: requeue every local claim and rebuild it
+            for worker_id in running.values():
+                queue.release_worker(worker_id, "worker pool restarted")
+            running.clear()
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = ProcessPoolExecutor(max_workers=args.workers)
+        # Replace exited workers only while there is pending work for them
+        while len(running) < args.workers and queue.counts()["pending"] > 0:
+            restarts += 1
+            start_worker(args.workers + restarts)
+
+    if pool is not None:
+        pool.shutdown(wait=True)
+    counts = queue.counts()
+    print(f"Queue drained: {counts['done']} shards done, {counts['failed']} failed")
+    merge_reports(args.work_dir, args.report_dir or os.path.join(args.work_dir, "reports"),
+                  sweep["report_format"], sweep["sweep_id"], args.reports_per_file)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a sharded bot detection sweep.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    coord = subparsers.add_parser("coordinate", help="Partition the sweep, run local workers and merge reports")
+    coord.add_argument("--work-dir", required=True, help="Queue, shard state and reports; share it across hosts")
+    coord.add_argument("--sweep-id", default=None)
+    coord.add_argument("--shards", type=int, default=64, help="Number of hash partitions of the actor ids")
+    coord.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                       help="Local worker processes; 0 only coordinates remote workers")
+    coord.add_argument("--sample-size", type=int, default=None)
+    coord.add_argument("--lease-seconds", type=float, default=300.0,
+                       help="A shard whose worker stops heart-beating this long is reassigned")
+    coord.add_argument("--max-attempts", type=int, default=3, help="Claims per shard before it is marked failed")
+    coord.add_argument("--poll-interval", type=float, default=5.0)
+    coord.add_argument("--index-file", default=None,
+                       help="Saved FAISS index memory-mapped by every worker; built if missing")
+    coord.add_argument("--report-dir", default=None, help="Merged report directory (default <work-dir>/reports)")
+    coord.add_argument("--report-format", choices=sorted(REPORT_WRITERS), default="jsonl")
+    coord.add_argument("--reports-per-file", type=int, default=100_000)
+    coord.add_argument("--similarity-mode", choices=["text", "numeric", "graph"], default="text")
+    coord.add_argument("--numeric-index", default=None)
+    coord.add_argument("--fusion", default=None)
+    coord.add_argument("--cascade", action="store_true")
+    coord.add_argument("--fast", action="store_true",
+                       help="Score-only agent calls; explanations only for players that need review")
+    coord.add_argument("--embedding-backend", choices=["torch", "onnx"], default="torch")
+    coord.add_argument("--encoder-threads", type=int, default=1,
+                       help="Encoder threads per worker; keep workers x threads at or below the core count")
+    coord.add_argument("--embedding-storage", choices=list(STORAGE_FORMATS), default="float32")
+
+    work = subparsers.add_parser("work", help="Attach a worker to an existing sweep's work directory")
+    work.add_argument("--work-dir", required=True)
+    work.add_argument("--worker-id", default=None)
+    work.add_argument("--wait", action="store_true",
+                      help="Keep polling while other workers hold shards instead of exiting when none are pending")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "coordinate":
+        coordinate(args)
+    else:
+        completed = run_worker(args.work_dir, args.worker_id, idle_exit=not args.wait)
+        print(f"Worker finished {completed} shards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Offline bulk-import files for a first load of the knowledge graph.
+
+Turns the five HCRL feature CSVs into ``neo4j-admin database import`` node and
+relationship files: Player nodes carrying the player, social, group and network
+features (the same properties ``KnowledgeGraphPopulator`` sets), one Action node per
+player, and PERFORMED edges between them. Headers are typed so properties land as
+integers and floats rather than strings. The files are validated before the import
+command is printed; the transactional ``CypherQueries`` path stays in place for
+incremental updates on a running database.
+
+    python -m src.bulk_import --output-dir import/
+    neo4j-admin database import full neo4j --overwrite-destination ... (printed command)
+"""
+import argparse
+import csv
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+import import_paths  # noqa: F401  (maps ml / src.data_ingestion onto this checkout)
+from src.data_ingestion.feature_join import player_properties
+from src.data_ingestion.load_data import (
+    load_action_data,
+    load_group_data,
+    load_network_data,
+    load_player_data,
+    load_social_data,
+)
+
+PLAYER_ID_SPACE = "Player"
+ACTION_ID_SPACE = "Action"
+# Columns kept out of the imported properties, as in the transactional ingestion
+EXCLUDED_COLUMNS = ("Type",)
+# pandas dtype kind -> neo4j-admin header type
+HEADER_TYPES = {"i": "long", "u": "long", "f": "double", "b": "boolean"}
+ROWS_PER_CHUNK = 500_000
+
+NODE_FILES = {"Player": "players", "Action": "actions"}
+RELATIONSHIP_FILES = {"PERFORMED": "performed"}
+
+
+def _header_type(series: pd.Series) -> str:
+    return HEADER_TYPES.get(series.dtype.kind, "string")
+
+
+def build_player_nodes(tables: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    One row per actor with the Player properties ``KnowledgeGraphPopulator`` sets (see
+    ``feature_join.player_properties``). Returns the rows and the neo4j-admin type of
+    every property column.
+    """
+    # Nullable Int64 columns (gaps from actors missing in a table) are written as empty fields
+    players = player_properties(tables, drop=EXCLUDED_COLUMNS).drop_duplicates("Actor").reset_index(drop=True)
+    return players, {c: _header_type(players[c]) for c in players.columns}
+
+
+def node_header(id_space: str, id_field: str, types: Dict[str, str]) -> List[str]:
+    return [f"{id_field}:ID({id_space})"] + [f"{column}:{header_type}" for column, header_type in types.items()]
+
+
+def _write_csv(path: str, header: List[str], rows: pd.DataFrame) -> int:
+    """Writes the header file and the data file next to each other (``<name>_header.csv``, ``<name>.csv``)."""
+    with open(f"{path}_header.csv", "w", newline="") as f:
+        csv.writer(f).writerow(header)
+    written = 0
+    with open(f"{path}.csv", "w", newline="") as f:
+        for start in range(0, len(rows), ROWS_PER_CHUNK):
+            chunk = rows.iloc[start:start + ROWS_PER_CHUNK]
+            chunk.to_csv(f, header=False, index=False)
+            written += len(chunk)
+    return written
+
+
+def build_import_files(output_dir: str, tables: Dict[str, pd.DataFrame] = None) -> Dict[str, int]:
+    """
+    Writes node and relationship files for ``neo4j-admin database import``.
+
+    Player ids are the actor id; Action ids are ``<actor>`` in their own id space, so
+    every player has exactly one Action node linked by a PERFORMED edge.
+
+    Args:
+        output_dir: Directory for the header and data files
+        tables: Feature DataFrames keyed player/action/social/group/network; the CSVs
+            under ``load_data.DATA_DIR`` are loaded when omitted
+
+    Returns:
+        Rows written per file.
+    """
+    if tables is None:
+        tables = {
+            "player": load_player_data(),
+            "action": load_action_data(),
+            "social": load_social_data(),
+            "group": load_group_data(),
+            "network": load_network_data(),
+        }
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {}
+
+    players, player_types = build_player_nodes(tables)
+    # The id column is written separately from the Actor property so MATCH on p.Actor keeps working
+    players.insert(0, "playerId", players["Actor"])
+    counts["players"] = _write_csv(os.path.join(output_dir, NODE_FILES["Player"]),
+                                   node_header(PLAYER_ID_SPACE, "playerId", player_types), players)
+
+    actions = tables["action"].drop(columns=list(EXCLUDED_COLUMNS), errors="ignore").drop_duplicates("Actor")
+    actions = actions[actions["Actor"].isin(players["Actor"])]
+    action_types = {c: _header_type(actions[c]) for c in actions.columns}
+    actions.insert(0, "actionId", actions["Actor"])
+    counts["actions"] = _write_csv(os.path.join(output_dir, NODE_FILES["Action"]),
+                                   node_header(ACTION_ID_SPACE, "actionId", action_types), actions)
+
+    performed = pd.DataFrame({"start": actions["Actor"], "end": actions["actionId"]})
+    counts["performed"] = _write_csv(os.path.join(output_dir, RELATIONSHIP_FILES["PERFORMED"]),
+                                     [f":START_ID({PLAYER_ID_SPACE})", f":END_ID({ACTION_ID_SPACE})"], performed)
+    dropped = len(tables["action"]) - len(actions)
+    if dropped:
+        print(f"Skipped {dropped} action rows with no matching player or a duplicate actor")
+    return counts
+
+
+def _invalid_values(values: pd.Series, header_type: str) -> pd.Series:
+    """Mask of non-empty values that don't parse as ``header_type``; empty fields are absent properties."""
+    present = values != ""
+    if header_type == "long":
+        return present & ~values.str.fullmatch(r"-?\d+")
+    if header_type == "double":
+        return present & pd.to_numeric(values.where(present), errors="coerce").isna()
+    if header_type == "boolean":
+        return present & ~values.str.lower().isin(["true", "false"])
+    return pd.Series(False, index=values.index)
+
+
+def validate_import_files(output_dir: str, max_errors: int = 20) -> List[str]:
+    """
+    Checks the generated files before they are handed to ``neo4j-admin``.
+
+    Verifies that every row has as many fields as its header, typed fields parse as
+    their declared type, node ids are non-empty and unique within their id space, and
+    every relationship points at existing nodes. Files are read in chunks with
+    vectorized checks, so millions of rows validate in seconds.
+
+    Returns:
+        Problems found (at most ``max_errors`` per check), empty when the files are ready to import.
+    """
+    problems: List[str] = []
+    ids: Dict[str, pd.Index] = {}
+
+    def report(name: str, rows: pd.Series, message: str):
+        for line in rows.index[:max_errors]:
+            problems.append(f"{name}.csv:{line + 1}: {message} '{rows.loc[line]}'")
+
+    def check_file(name: str):
+        with open(os.path.join(output_dir, f"{name}_header.csv"), newline="") as f:
+            header = next(csv.reader(f))
+        fields = [tuple((field.split(":", 1) + [""])[:2]) for field in header]
+        names = [f"{column}:{i}" for i, (column, _) in enumerate(fields)]
+        node_ids: Dict[str, List[pd.Series]] = {}
+        try:
+            chunks = pd.read_csv(os.path.join(output_dir, f"{name}.csv"), header=None, names=names, dtype=str,
+                                 na_filter=False, chunksize=ROWS_PER_CHUNK)
+            for chunk in chunks:
+                short = chunk.isna().any(axis=1)
+                if short.any():
+                    problems.extend(f"{name}.csv:{line + 1}: fewer fields than the {len(header)} in the header"
+                                    for line in chunk.index[short][:max_errors])
+                    chunk = chunk[~short]
+                for column, (field_name, field_type) in zip(names, fields):
+                    values = chunk[column]
+                    if field_type.startswith("ID("):
+                        node_ids.setdefault(field_type[3:-1], []).append(values)
+                        report(name, values[values == ""], f"empty {field_type}")
+                    elif field_type.startswith(("START_ID(", "END_ID(")):
+                        space = field_type[field_type.index("(") + 1:-1]
+                        missing = ~values.isin(ids.get(space, pd.Index([])))
+                        report(name, values[missing], f"{field_type} has no node")
+                    else:
+                        bad = _invalid_values(values, field_type)
+                        report(name, values[bad], f"{field_name} is not a {field_type}")
+        except pd.errors.ParserError as e:
+            problems.append(f"{name}.csv: {e}")
+            return
+
+        for space, parts in node_ids.items():
+            all_ids = pd.concat(parts)
+            report(name, all_ids[all_ids.duplicated() & (all_ids != "")], f"duplicate ID({space})")
+            ids[space] = ids.get(space, pd.Index([])).append(pd.Index(all_ids))
+
+    # Nodes first so relationship endpoints can be checked against their ids
+    for name in list(NODE_FILES.values()) + list(RELATIONSHIP_FILES.values()):
+        if not os.path.exists(os.path.join(output_dir, f"{name}.csv")):
+            problems.append(f"Missing {name}.csv in {output_dir}")
+            continue
+        check_file(name)
+    return problems
+
+
+def import_command(output_dir: str, database: str = "neo4j") -> str:
+    """The ``neo4j-admin`` invocation for the generated files (Neo4j 5 syntax)."""
+    def files(name):
+        return f"{os.path.join(output_dir, name)}_header.csv,{os.path.join(output_dir, name)}.csv"
+
+    parts = ["neo4j-admin database import full", database, "--overwrite-destination"]
+    parts += [f"--nodes={label}={files(name)}" for label, name in NODE_FILES.items()]
+    parts += [f"--relationships={rel_type}={files(name)}" for rel_type, name in RELATIONSHIP_FILES.items()]
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build neo4j-admin bulk-import files from the HCRL feature CSVs.")
+    parser.add_argument("--output-dir", default="import")
+    parser.add_argument("--database", default="neo4j")
+    parser.add_argument("--skip-validation", action="store_true")
+    args = parser.parse_args()
+
+    counts = build_import_files(args.output_dir)
+    print(", ".join(f"{name}: {count} rows" for name, count in counts.items()))
+    if not args.skip_validation:
+        problems = validate_import_files(args.output_dir)
+        for problem in problems:
+            print(f"INVALID {problem}")
+        if problems:
+            sys.exit(1)
+        print("Import files validated")
+    print("Stop the database, then run:")
+    print(f"  {import_command(args.output_dir, args.database)}")
+    print("and create the Player.Actor index once it is back up "
+          "(src/kg_population.py PLAYER_ACTOR_INDEX) before incremental updates or sweeps.")
+
+
+if __name__ == "__main__":
+    main()
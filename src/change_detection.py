@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+from src.data_ingestion.load_data import (
+    DATA_DIR,
+    load_action_data,
+    load_group_data,
+    load_network_data,
+    load_player_data,
+    load_social_data,
+)
+
+
+def _table_row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Hashes every feature row of a table, indexed by actor id. Columns are hashed with
+    their own dtype, so non-numeric columns work; float columns are rounded first.
+    """
+    df = df.drop(columns=["Type"], errors="ignore")
+    df = df.assign(Actor=df["Actor"].astype(int).astype(str)).drop_duplicates("Actor").set_index("Actor")
+    df = df[sorted(df.columns)]
+    floats = df.select_dtypes("float").columns
+    if len(floats):
+        df = df.assign(**{column: df[column].round(6) for column in floats})
+    return pd.util.hash_pandas_object(df, index=False)
+
+
+def compute_feature_fingerprints(tables: Iterable[pd.DataFrame] = None) -> Dict[str, str]:
+    """
+    Computes a fingerprint of each actor's current feature values across all feature tables.
+
+    Hashing is vectorized per table and the per-table hashes are combined per actor, so
+    the full population can be fingerprinted in one pass. Actors missing from a table
+    hash that table as absent rather than failing.
+
+    Args:
+        tables: Feature DataFrames to fingerprint; defaults to the five HCRL tables
+
+    Returns:
+        Mapping of actor id (as string) to a hex fingerprint.
+
+    Raises:
+        ValueError: If none of the tables could be loaded.
+    """
+    if tables is None:
+        tables = [load_player_data(), load_action_data(), load_social_data(),
+                  load_group_data(), load_network_data()]
+
+    hashes = [_table_row_hashes(df) for df in tables if df is not None]
+    if not hashes:
+        raise ValueError(f"No feature tables to fingerprint; check that {DATA_DIR} (HCRL_DATA_DIR) holds the HCRL CSVs")
+    actors = hashes[0].index
+    for table_hashes in hashes[1:]:
+        actors = actors.union(table_hashes.index)
+    row_hashes = pd.DataFrame(
+        {f"t{i}": table_hashes.reindex(actors, fill_value=0) for i, table_hashes in enumerate(hashes)}
+    )
+    combined = pd.util.hash_pandas_object(row_hashes, index=True)
+    return {actor: f"{value:016x}" for actor, value in combined.items()}
+
+
+def load_stored_fingerprints(graph) -> Dict[str, Dict[str, str]]:
+    """Reads the fingerprint and versions each existing classification was produced with."""
+    query = """
+    MATCH (p:Player)-[r:HAS_CLASSIFICATION]->(:Classification)
+    RETURN
+        toString(toInteger(p.Actor)) AS player_id,
+        r.feature_fingerprint AS feature_fingerprint,
+        r.feature_version AS feature_version,
+        r.model AS model
+    ORDER BY r.timestamp
+    """
+    # Rows are ordered oldest first so the latest classification of a player wins
+    return {
+        row["player_id"]: {
+            "feature_fingerprint": row["feature_fingerprint"],
+            "feature_version": row["feature_version"],
+            "model": row["model"],
+        }
+        for row in graph.query(query)
+    }
+
+
+def detect_changed_players(current: Dict[str, str], stored: Dict[str, Dict[str, str]],
+                           feature_version: str, model: str) -> List[str]:
+    """
+    Returns the players that need (re-)classification.
+
+    A player is selected when it has no stored classification, its feature fingerprint
+    differs from the stored one, or it was classified with another feature/prompt
+    version or model.
+    """
+    changed = []
+    for player_id, fingerprint in current.items():
+        previous = stored.get(player_id)
+        if (previous is None
+                or previous["feature_fingerprint"] != fingerprint
+                or previous["feature_version"] != feature_version
+                or previous["model"] != model):
+            changed.append(player_id)
+    return changed
@@ -0,0 +1,115 @@
+from typing import Dict, Sequence
+
+import pandas as pd
+
+# Feature tables whose columns become Player node properties
+PLAYER_PROPERTY_TABLES = ("player", "social", "group", "network")
+
+# Properties the social and group tables add to a Player, with the type each is cast to
+# (``toFloat`` / ``toInteger`` in ``CypherQueries``)
+SOCIAL_PROPERTIES = {"Social_diversity": "float"}
+GROUP_PROPERTIES = {"Avg_PartyTime": "float", "GuildAct_count": "integer", "GuildJoin_count": "integer"}
+
+
+def join_actor_features(tables: Dict[str, pd.DataFrame], names: Sequence[str] = None, how: str = "outer",
+                        drop: Sequence[str] = ("Type",)) -> pd.DataFrame:
+    """
+    Merges feature tables into one row per actor in a single vectorized pass.
+
+    Every table is indexed by ``Actor`` (duplicates keep their first row) and the tables
+    are aligned with one ``pd.concat`` instead of per-actor lookups or chained joins.
+    ``A_Acc`` appears once, taken from the first table that has it for the actor.
+    A column name already used by an earlier table is suffixed with ``_<table name>``.
+    Integer columns that gain gaps from actors missing in a table become nullable
+    ``Int64`` rather than float, so they stay integral downstream.
+
+    Args:
+        tables: Feature DataFrames keyed by table name; None entries are skipped
+        names: Tables to join, in order; defaults to all of ``tables``
+        how: "outer" keeps actors present in any table, "left" only those of the first table
+        drop: Columns left out of the result (the label column by default)
+
+    Returns:
+        DataFrame indexed by integer ``Actor``.
+    """
+    if how not in ("outer", "left"):
+        raise ValueError(f"Unknown join '{how}', expected 'outer' or 'left'")
+
+    frames, accounts, integer_columns = [], [], []
+    seen = set()
+    for name in names or list(tables):
+        df = tables.get(name)
+        if df is None:
+            continue
+        df = df.drop(columns=[c for c in drop if c in df.columns])
+        df = df.assign(Actor=df["Actor"].astype("int64")).drop_duplicates("Actor").set_index("Actor")
+        if "A_Acc" in df.columns:
+            accounts.append(df.pop("A_Acc"))
+        df = df.rename(columns={c: f"{c}_{name}" for c in df.columns if c in seen})
+        seen.update(df.columns)
+        integer_columns += [c for c in df.columns if df[c].dtype.kind in "iu"]
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(index=pd.Index([], name="Actor"))
+
+    joined = pd.concat(frames, axis=1, join="outer")
+    if how == "left":
+        joined = joined.reindex(frames[0].index)
+    if accounts:
+        account = pd.concat(accounts, axis=1).reindex(joined.index).bfill(axis=1).iloc[:, 0]
+        joined.insert(0, "A_Acc", account.astype("Int64") if account.isna().any() else account.astype("int64"))
+    for column in integer_columns:
+        if joined[column].dtype.kind == "f":
+            joined[column] = joined[column].round().astype("Int64")
+    joined.index.name = "Actor"
+    return joined
+
+
+def _cast(series: pd.Series, kind: str) -> pd.Series:
+    series = pd.to_numeric(series, errors="coerce")
+    return series.astype("float64") if kind == "float" else series.round().astype("Int64")
+
+
+def player_properties(tables: Dict[str, pd.DataFrame], drop: Sequence[str] = ("Type",)) -> pd.DataFrame:
+    """
+    Player node properties, one row per player-table row, under the names readers use.
+
+    Matches the per-table ingestion in ``CypherQueries``: every player column, plus
+    ``SOCIAL_PROPERTIES`` and ``GROUP_PROPERTIES`` cast the same way, plus every network
+    column except ``A_Acc``. A network value replaces a player property of the same name
+    for the actors the network table has (``SET p += networkData``). Unlike
+    ``join_actor_features``, no column is renamed.
+
+    Args:
+        tables: Feature DataFrames keyed by table name; only "player" is required
+        drop: Columns left out of the result (the label column by default)
+    """
+    profiles = tables["player"].drop(columns=[c for c in drop if c in tables["player"].columns])
+    actors = profiles["Actor"].astype("int64")
+
+    def aligned(series: pd.Series) -> pd.Series:
+        return series.reindex(actors).set_axis(profiles.index)
+
+    for name, properties in (("social", SOCIAL_PROPERTIES), ("group", GROUP_PROPERTIES)):
+        df = tables.get(name)
+        if df is None:
+            continue
+        # Later rows win, as repeated SETs did
+        df = df.assign(Actor=df["Actor"].astype("int64")).drop_duplicates("Actor", keep="last").set_index("Actor")
+        for column, kind in properties.items():
+            if column in df.columns:
+                profiles[column] = aligned(_cast(df[column], kind))
+
+    network = tables.get("network")
+    if network is not None:
+        network = network.drop(columns=[c for c in (*drop, "A_Acc") if c in network.columns])
+        network = network.assign(Actor=network["Actor"].astype("int64"))
+        network = network.drop_duplicates("Actor", keep="last").set_index("Actor")
+        for column in network.columns:
+            values = aligned(network[column])
+            if column in profiles.columns:
+                values = values.where(values.notna(), profiles[column])
+            if values.dtype.kind == "f" and network[column].dtype.kind in "iu":
+                values = values.round().astype("Int64")
+            profiles[column] = values
+    return profiles
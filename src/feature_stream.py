@@ -0,0 +1,355 @@
+import json
+import math
+import queue
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.data_ingestion.queries import CypherQueries
+
+SECONDS_PER_DAY = 86400
+
+# Action types in the HCRL action table; the first five also get a *_ratio column
+RATIO_ACTIONS = ("Sit", "Exp_get", "Item_get", "Money_get", "Abyss_get")
+COUNT_ACTIONS = ("Exp_repair", "Use_portal", "Killed_bypc", "Killed_bynpc", "Teleport", "Reborn")
+ACTION_TYPES = RATIO_ACTIONS + COUNT_ACTIONS
+# Actions counted towards collect_max_count, the most collecting actions on a single day
+COLLECT_ACTIONS = ("Exp_get", "Item_get", "Money_get", "Abyss_get")
+# Interaction types whose Shannon entropy gives Social_diversity
+SOCIAL_TYPES = ("party", "friend", "trade", "whisper", "mail", "guild")
+
+# Slots of a day bucket: window sums first, then the day's maxima
+LOGINS, LOGOUTS, PLAYTIME, MONEY_SUM, MONEY_N, LAST_SEEN_IPS, ACTIONS = range(7)
+ACTION_SLOT = {name: 7 + i for i, name in enumerate(ACTION_TYPES)}
+SOCIAL_SLOT = {name: 7 + len(ACTION_TYPES) + i for i, name in enumerate(SOCIAL_TYPES)}
+SUMMED_SLOTS = 7 + len(ACTION_TYPES) + len(SOCIAL_TYPES)
+COLLECT, MAX_LEVEL = SUMMED_SLOTS, SUMMED_SLOTS + 1
+BUCKET_SLOTS = SUMMED_SLOTS + 2
+
+
+def event_seconds(ts: Any) -> float:
+    """Epoch seconds of an event timestamp given as a number or an ISO-8601 string (UTC if naive)."""
+    if isinstance(ts, str):
+        parsed = datetime.fromisoformat(ts)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return float(ts)
+
+
+class ActorState:
+    """
+    Rolling aggregates for one actor.
+
+    Events are added to per-day buckets (compact ``array('d')`` rows), and buckets are
+    only held for active days inside the window. ``totals`` holds the window sums, so an
+    update touches one bucket slot and one totals slot. Expiring a day subtracts its
+    bucket once. Distinct IPs are counted on the bucket of the day each IP was last seen,
+    which keeps the windowed distinct count exact without storing per-day IP sets.
+    """
+
+    __slots__ = ("a_acc", "buckets", "totals", "ip_last_day", "session_start",
+                 "login_days", "logout_days", "max_collect", "max_level")
+
+    def __init__(self, a_acc: Any = None):
+        self.a_acc = a_acc
+        self.buckets: Dict[int, array] = {}  # day -> bucket, oldest first
+        self.totals = array("d", bytes(8 * SUMMED_SLOTS))
+        self.ip_last_day: Dict[str, int] = {}
+        self.session_start: Optional[float] = None
+        self.login_days = 0
+        self.logout_days = 0
+        self.max_collect = 0.0
+        self.max_level = 0.0
+
+    def bucket(self, day: int, window_days: Optional[int]) -> Tuple[int, array]:
+        """
+        Day and bucket credited with an event on ``day``; late events for a day no longer
+        held are credited to the newest day.
+        """
+        values = self.buckets.get(day)
+        if values is not None:
+            return day, values
+        if self.buckets and day < next(reversed(self.buckets)):
+            newest = next(reversed(self.buckets))
+            return newest, self.buckets[newest]
+
+        values = array("d", bytes(8 * BUCKET_SLOTS))
+        self.buckets[day] = values
+        self.advance(day, window_days)
+        return day, values
+
+    def advance(self, day: int, window_days: Optional[int]):
+        """Drops buckets that fall outside the window ending on ``day``."""
+        if window_days is None:
+            # Whole history: totals never expire, only the newest day is kept for per-day maxima
+            while len(self.buckets) > 1:
+                del self.buckets[next(iter(self.buckets))]
+            return
+
+        expired_maximum = False
+        while self.buckets:
+            oldest = next(iter(self.buckets))
+            if oldest > day - window_days:
+                break
+            values = self.buckets.pop(oldest)
+            for slot in range(SUMMED_SLOTS):
+                self.totals[slot] -= values[slot]
+            self.login_days -= values[LOGINS] > 0
+            self.logout_days -= values[LOGOUTS] > 0
+            expired_maximum |= ((values[COLLECT] > 0 and values[COLLECT] >= self.max_collect)
+                                or (values[MAX_LEVEL] > 0 and values[MAX_LEVEL] >= self.max_level))
+
+        if expired_maximum:
+            # Rare: the window maximum left with an expired day, rescan the held days
+            self.max_collect = max((v[COLLECT] for v in self.buckets.values()), default=0.0)
+            self.max_level = max((v[MAX_LEVEL] for v in self.buckets.values()), default=0.0)
+        if len(self.ip_last_day) > 2 * self.totals[LAST_SEEN_IPS] + 16:
+            self.ip_last_day = {ip: d for ip, d in self.ip_last_day.items() if d in self.buckets}
+
+    def add(self, values: array, slot: int, amount: float = 1.0):
+        values[slot] += amount
+        self.totals[slot] += amount
+
+    def see_ip(self, ip: str, day: int, values: array, window_days: Optional[int]):
+        previous = self.ip_last_day.get(ip)
+        if previous is not None and previous >= day and previous in self.buckets:
+            return  # already counted on this day or a later one still in the window
+        self.ip_last_day[ip] = day
+        if window_days is None:
+            if previous is None:
+                self.add(values, LAST_SEEN_IPS)
+            return
+        previous_values = self.buckets.get(previous) if previous is not None else None
+        if previous_values is values:
+            return
+        if previous_values is not None:
+            # Move the IP from the day it was last seen to today; the window total is unchanged
+            previous_values[LAST_SEEN_IPS] -= 1
+            values[LAST_SEEN_IPS] += 1
+        else:
+            self.add(values, LAST_SEEN_IPS)
+
+
+class FeatureStream:
+    """
+    Incremental HCRL feature engine fed by raw login, action and social events.
+
+    Keeps per-actor rolling aggregates and emits rows in the same schema as the
+    precomputed "(after)" player, action and social tables. Each event costs O(1), and
+    emitting an actor's features costs O(number of features). Group and network
+    features come from graph-wide computations and are still loaded from their tables.
+
+    Events are dicts with ``actor``, ``ts`` (epoch seconds or ISO-8601) and ``type``:
+
+    * ``login``: optional ``ip`` and ``a_acc``
+    * ``logout``: closes the open session and adds its duration to Playtime
+    * ``action``: ``action`` is one of ``ACTION_TYPES``, with an optional ``count``
+    * ``social``: ``interaction`` is one of ``SOCIAL_TYPES``
+
+    Any event may carry ``money`` (current balance, averaged into avg_money) and
+    ``level`` (maximum kept as Max_level).
+
+    Args:
+        window_days: Length of the rolling window in days; None aggregates the whole
+            history like the precomputed tables
+    """
+
+    def __init__(self, window_days: Optional[int] = None):
+        self.window_days = window_days
+        self.actors: Dict[int, ActorState] = {}
+        self.dirty = set()
+        self.current_day: Optional[int] = None
+        self.events = 0
+        self.rejected = 0
+
+    def update(self, event: Dict[str, Any]) -> bool:
+        """Applies one event; returns False (and counts it as rejected) if it is malformed."""
+        try:
+            actor = int(event["actor"])
+            seconds = event_seconds(event["ts"])
+            kind = event["type"]
+            count = float(event.get("count", 1))
+            money = float(event["money"]) if event.get("money") is not None else None
+            level = float(event["level"]) if event.get("level") is not None else None
+        except (KeyError, TypeError, ValueError):
+            self.rejected += 1
+            return False
+        if not (kind in ("login", "logout")
+                or (kind == "action" and event.get("action") in ACTION_SLOT)
+                or (kind == "social" and event.get("interaction") in SOCIAL_SLOT)):
+            self.rejected += 1
+            return False
+
+        day = int(seconds // SECONDS_PER_DAY)
+        if self.current_day is None or day > self.current_day:
+            self.current_day = day
+        state = self.actors.get(actor)
+        if state is None:
+            state = self.actors[actor] = ActorState(event.get("a_acc"))
+        day, values = state.bucket(day, self.window_days)
+
+        if kind == "login":
+            if values[LOGINS] == 0:
+                state.login_days += 1
+            state.add(values, LOGINS)
+            state.session_start = seconds
+            if event.get("a_acc") is not None:
+                state.a_acc = event["a_acc"]
+            if event.get("ip"):
+                state.see_ip(str(event["ip"]), day, values, self.window_days)
+        elif kind == "logout":
+            if values[LOGOUTS] == 0:
+                state.logout_days += 1
+            state.add(values, LOGOUTS)
+            if state.session_start is not None and seconds > state.session_start:
+                state.add(values, PLAYTIME, seconds - state.session_start)
+            state.session_start = None
+        elif kind == "action":
+            state.add(values, ACTION_SLOT[event["action"]], count)
+            state.add(values, ACTIONS, count)
+            if event["action"] in COLLECT_ACTIONS:
+                values[COLLECT] += count
+                state.max_collect = max(state.max_collect, values[COLLECT])
+        else:
+            state.add(values, SOCIAL_SLOT[event["interaction"]])
+
+        if money is not None:
+            state.add(values, MONEY_SUM, money)
+            state.add(values, MONEY_N)
+        if level is not None:
+            values[MAX_LEVEL] = max(values[MAX_LEVEL], level)
+            state.max_level = max(state.max_level, values[MAX_LEVEL])
+
+        self.dirty.add(actor)
+        self.events += 1
+        return True
+
+    def _current(self, actor: int) -> ActorState:
+        state = self.actors[actor]
+        if self.window_days is not None and self.current_day is not None:
+            # Age idle actors by the stream clock, not only when they next send an event
+            state.advance(self.current_day, self.window_days)
+        return state
+
+    def player_features(self, actor: int) -> Dict[str, Any]:
+        """Row in the schema of the player information table."""
+        state = self._current(actor)
+        totals = state.totals
+        return {
+            "Actor": actor,
+            "A_Acc": state.a_acc,
+            "Login_day_count": state.login_days,
+            "Logout_day_count": state.logout_days,
+            "Playtime": totals[PLAYTIME],
+            "playtime_per_day": totals[PLAYTIME] / max(state.login_days, 1),
+            "avg_money": totals[MONEY_SUM] / totals[MONEY_N] if totals[MONEY_N] else 0.0,
+            "Login_count": int(totals[LOGINS]),
+            "ip_count": int(totals[LAST_SEEN_IPS]),
+            "Max_level": int(state.max_level),
+        }
+
+    def action_features(self, actor: int) -> Dict[str, Any]:
+        """Row in the schema of the player actions table; per-day rates are over login days."""
+        state = self._current(actor)
+        totals = state.totals
+        days = max(state.login_days, 1)
+        row = {"Actor": actor, "A_Acc": state.a_acc, "collect_max_count": int(state.max_collect)}
+        for name in RATIO_ACTIONS:
+            count = totals[ACTION_SLOT[name]]
+            # Ratios are percentages of all actions, as in the HCRL table
+            row[f"{name}_ratio"] = 100.0 * count / totals[ACTIONS] if totals[ACTIONS] else 0.0
+            row[f"{name}_count"] = int(count)
+            row[f"{name.lower()}_count_per_day"] = count / days
+        for name in COUNT_ACTIONS:
+            count = totals[ACTION_SLOT[name]]
+            row[f"{name}_count"] = int(count)
+            row[f"{name}_count_per_day"] = count / days
+        return row
+
+    def social_features(self, actor: int) -> Dict[str, Any]:
+        """Row in the schema of the social diversity table: entropy of interaction types."""
+        state = self._current(actor)
+        counts = [state.totals[SOCIAL_SLOT[name]] for name in SOCIAL_TYPES]
+        total = sum(counts)
+        diversity = -sum(c / total * math.log(c / total) for c in counts if c > 0) if total else 0.0
+        return {"Actor": actor, "A_Acc": state.a_acc, "Social_diversity": diversity}
+
+    def consume(self, events: Iterable[Dict[str, Any]],
+                on_flush: Callable[[List[int]], None] = None, flush_every: int = 10_000) -> int:
+        """
+        Applies ``events`` in order, handing the changed actors to ``on_flush`` every
+        ``flush_every`` events and once at the end.
+
+        Returns:
+            The number of events applied.
+        """
+        applied = 0
+        for event in events:
+            applied += self.update(event)
+            if on_flush is not None and len(self.dirty) and applied % flush_every == 0:
+                on_flush(self.take_dirty())
+        if on_flush is not None and self.dirty:
+            on_flush(self.take_dirty())
+        return applied
+
+    def take_dirty(self) -> List[int]:
+        """Actors changed since the last call."""
+        dirty, self.dirty = sorted(self.dirty), set()
+        return dirty
+
+    def snapshot_tables(self, actors: Iterable[int] = None):
+        """Current features as player/action/social DataFrames shaped like the ``load_data`` tables."""
+        import pandas as pd
+
+        actors = list(self.actors) if actors is None else list(actors)
+        return {
+            "player": pd.DataFrame([self.player_features(a) for a in actors]),
+            "action": pd.DataFrame([self.action_features(a) for a in actors]),
+            "social": pd.DataFrame([self.social_features(a) for a in actors]),
+        }
+
+    def write_to_graph(self, graph, actors: Iterable[int], batch_size: int = 1000) -> int:
+        """
+        Upserts the features of ``actors`` onto their Player and Action nodes, so the
+        agents' graph queries see them. ``graph`` is a ``Neo4jDataAccess``.
+        """
+        queries = CypherQueries()
+        actors = list(actors)
+        player_rows = []
+        for actor in actors:
+            row = self.player_features(actor)
+            row.update(self.social_features(actor))
+            player_rows.append({k: v for k, v in row.items() if v is not None})
+        graph.write_batches(queries.upsert_player_features(), player_rows, batch_size)
+        graph.write_batches(queries.upsert_action_features(),
+                            [self.action_features(actor) for actor in actors], batch_size)
+        return len(actors)
+
+
+def read_jsonl_events(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields events from a JSON-lines file, skipping lines that don't parse."""
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping malformed event on line {line_number} of {path}")
+
+
+def queue_events(event_queue: "queue.Queue", timeout: float = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields events from a local queue standing in for a message broker.
+
+    Stops on a ``None`` sentinel, or when no event arrives within ``timeout`` seconds.
+    """
+    while True:
+        try:
+            event = event_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        if event is None:
+            return
+        yield event
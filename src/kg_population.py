@@ -0,0 +1,91 @@
+import time
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from src.data_ingestion.load_data import (
+    load_action_data,
+    load_group_data,
+    load_network_data,
+    load_player_data,
+    load_social_data,
+)
+from src.data_ingestion.feature_join import player_properties
+from src.data_ingestion.neo4j_driver import Neo4jDataAccess, connect_from_env
+from src.data_ingestion.queries import CypherQueries
+
+# Players are matched by Actor in every relationship and property stage
+PLAYER_ACTOR_INDEX = "CREATE INDEX player_actor IF NOT EXISTS FOR (p:Player) ON (p.Actor)"
+
+
+def _records(df: pd.DataFrame, drop: tuple = ("Type",)) -> List[Dict[str, Any]]:
+    """Rows as dicts for UNWIND, without the label column and with NaN left out of each row."""
+    if df is None:
+        return []
+    df = df.drop(columns=[c for c in drop if c in df.columns])
+    return [{k: v for k, v in row.items() if v is not None and v == v} for row in df.to_dict(orient="records")]
+
+
+class KnowledgeGraphPopulator:
+    """
+    Loads the five HCRL feature tables into the knowledge graph.
+
+    Follows the ingestion in ``Notebooks/knowledge_graph.ipynb``, except that the social,
+    group and network properties are joined onto the player rows up front (same names
+    and casts, see ``feature_join.player_properties``), so every Player node is written
+    once instead of being matched again for each table. Action nodes linked by
+    PERFORMED follow. Every stage is written through ``CypherQueries`` in
+    ``UNWIND $data_list`` batches, one transaction per batch. For a first load of
+    millions of players into an empty database, build ``neo4j-admin`` import files
+    with ``bulk_import`` instead.
+
+    Args:
+        graph: Data-access layer to write through; built from the NEO4J_* variables if omitted
+        batch_size: Rows per transaction
+        tables: Optional dict of DataFrames keyed player/action/social/group/network,
+            used instead of loading the CSVs (e.g. synthetic benchmark data)
+    """
+
+    def __init__(self, graph: Neo4jDataAccess = None, batch_size: int = 1000, tables: Dict[str, pd.DataFrame] = None):
+        self.graph = graph or connect_from_env()
+        self.batch_size = batch_size
+        self.tables = tables
+        self.queries = CypherQueries()
+
+    def load_tables(self) -> Dict[str, pd.DataFrame]:
+        if self.tables is not None:
+            return self.tables
+        return {
+            "player": load_player_data(),
+            "action": load_action_data(),
+            "social": load_social_data(),
+            "group": load_group_data(),
+            "network": load_network_data(),
+        }
+
+    def populate_knowledge_graph(self) -> Dict[str, float]:
+        """
+        Writes every table to the graph.
+
+        Returns:
+            Seconds spent in each stage, keyed by stage name.
+        """
+        tables = self.load_tables()
+        self.graph.write(PLAYER_ACTOR_INDEX)
+
+        # Players come from the player table; the other tables only add properties to them
+        action_rows = _records(tables.get("action"))
+        stages = [
+            ("player_nodes", self.queries.create_player_profiles(), _records(player_properties(tables))),
+            ("action_nodes", self.queries.create_action_nodes(), action_rows),
+            ("performed_relationships", self.queries.create_performed_relationships(), action_rows),
+        ]
+
+        timings = {}
+        for name, query, rows in stages:
+            start = time.perf_counter()
+            written = self.graph.write_batches(query, rows, self.batch_size)
+            timings[name] = time.perf_counter() - start
+            print(f"{name}: {written} rows in {timings[name]:.1f}s")
+        print("Knowledge Graph Creation Complete!")
+        return timings
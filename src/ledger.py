@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class CompletionLedger:
+    """
+    Durable per-player completion ledger for classification sweeps.
+
+    Records which players have been classified for a given feature version so an
+    interrupted or repeated sweep can skip them instead of paying for the LLM calls again.
+
+    Args:
+        db_path: SQLite file backing the ledger
+        feature_version: Version tag of the features/prompts the classification was made with
+    """
+
+    def __init__(self, db_path: str, feature_version: str):
+        self.db_path = db_path
+        self.feature_version = feature_version
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completed_players (
+                player_id TEXT NOT NULL,
+                feature_version TEXT NOT NULL,
+                sweep_id TEXT,
+                classification TEXT,
+                feature_fingerprint TEXT,
+                completed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (player_id, feature_version)
+            )
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(completed_players)")}
+        if "feature_fingerprint" not in columns:
+            # Ledgers created before fingerprints were recorded
+            self.conn.execute("ALTER TABLE completed_players ADD COLUMN feature_fingerprint TEXT")
+        self.conn.commit()
+
+    def completed(self) -> Dict[str, str]:
+        """Returns player id -> feature fingerprint for players classified under the current feature version."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT player_id, feature_fingerprint FROM completed_players WHERE feature_version = ?",
+                (self.feature_version,),
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def pending(self, player_ids: Iterable[str], fingerprints: Dict[str, str] = None) -> List[str]:
+        """
+        Filters ``player_ids`` down to the players not yet classified, preserving order.
+
+        When ``fingerprints`` is given, players whose features changed since they were
+        classified are treated as pending too.
+        """
+        done = self.completed()
+        pending = []
+        for pid in player_ids:
+            pid = str(pid)
+            if pid not in done:
+                pending.append(pid)
+            elif fingerprints is not None and fingerprints.get(pid) != done[pid]:
+                pending.append(pid)
+        return pending
+
+    def mark_completed(self, player_id: str, classification: str = None, sweep_id: str = None,
+                       feature_fingerprint: str = None):
+        self.mark_reports([{
+            "player_id": player_id,
+            "classification_result": classification,
+            "sweep_id": sweep_id,
+            "feature_fingerprint": feature_fingerprint,
+        }])
+
+    def mark_reports(self, reports: List[Dict[str, Any]]):
+        """
+        Marks the players of durably written reports as completed, in one transaction.
+
+        Used as a report writer's ``on_durable`` callback; each report carries
+        ``player_id``, ``classification_result``, ``sweep_id`` and ``feature_fingerprint``.
+        """
+        with self._lock:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO completed_players
+                    (player_id, feature_version, sweep_id, classification, feature_fingerprint, completed_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                """,
+                [
+                    (str(report["player_id"]), self.feature_version, report.get("sweep_id"),
+                     report.get("classification_result"), report.get("feature_fingerprint"))
+                    for report in reports
+                ],
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class ExplanationCache:
+    """
+    Durable cache of the plain-English explanations written for reviewed players.
+
+    Explanations cost a full-length LLM call, so each is generated once per player and
+    feature version and then reused by later sweeps, the service and explicit requests.
+
+    Args:
+        db_path: SQLite file backing the cache (the sweep checkpoint database works)
+        feature_version: Version tag of the features/prompts the explanation was made with
+    """
+
+    def __init__(self, db_path: str, feature_version: str):
+        self.db_path = db_path
+        self.feature_version = feature_version
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS player_explanations (
+                player_id TEXT NOT NULL,
+                feature_version TEXT NOT NULL,
+                feature_fingerprint TEXT,
+                explanation TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (player_id, feature_version)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, player_id: str, feature_fingerprint: str = None) -> Optional[str]:
+        """
+        The cached explanation, or None. With ``feature_fingerprint`` given, an explanation
+        written for different features is treated as missing.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT explanation, feature_fingerprint FROM player_explanations "
+                "WHERE player_id = ? AND feature_version = ?",
+                (str(player_id), self.feature_version),
+            ).fetchone()
+        if row is None or (feature_fingerprint is not None and row[1] != feature_fingerprint):
+            return None
+        return row[0]
+
+    def put(self, player_id: str, explanation: str, feature_fingerprint: str = None):
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO player_explanations
+                    (player_id, feature_version, feature_fingerprint, explanation, created_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                """,
+                (str(player_id), self.feature_version, feature_fingerprint, explanation),
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
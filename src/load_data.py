@@ -11,7 +11,8 @@ load_dotenv()
 # NETWORK_FILE = '(after) Network measures features.csv'
 # GROUP_FILE = '(after) Group activities features.csv'
 
-DATA_DIR = 'data/sample/'  # Relative path to CSV files
+# Relative path to CSV files; HCRL_DATA_DIR points the loaders at another copy (e.g. synthetic data)
+DATA_DIR = os.getenv('HCRL_DATA_DIR', 'data/sample/')
 PLAYER_FILE = 'sample_player_data.csv'
 ACTION_FILE = 'sample_action_data.csv'
 SOCIAL_FILE = 'sample_social_data.csv'
@@ -1,19 +1,152 @@
 # Assuming neo4j_driver.py and queries.py contain the following classes
-from neo4j import GraphDatabase
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List
+
+from neo4j import AsyncGraphDatabase, GraphDatabase, READ_ACCESS, WRITE_ACCESS
 import os
 
 class Neo4jConnection:
 
-    def __init__(self, uri, username, password):
+    def __init__(self, uri, username, password, database=None,
+                 max_connection_pool_size=100, connection_acquisition_timeout=60.0,
+                 max_transaction_retry_time=30.0):
         self.uri = uri
         self.username = username
         self.password = password
-        self.driver = None
-        try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
-        except Exception as e:
-            print("Failed to create the driver", e)
+        self.database = database
+        self.driver_config = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "max_transaction_retry_time": max_transaction_retry_time,
+        }
+        self.async_driver = None
+        # Fails loudly: a connection without a driver only breaks later, on first use
+        self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password), **self.driver_config)
+
+    def get_async_driver(self):
+        """Creates the async driver on first use; it keeps its own connection pool."""
+        if self.async_driver is None:
+            self.async_driver = AsyncGraphDatabase.driver(
+                self.uri, auth=(self.username, self.password), **self.driver_config
+            )
+        return self.async_driver
 
     def close(self):
-        if self.driver is not None:
-            self.driver.close()
\ No newline at end of file
+        self.driver.close()
+
+    async def close_async(self):
+        if self.async_driver is not None:
+            await self.async_driver.close()
+
+
+class Neo4jDataAccess:
+    """
+    Data-access layer over a pooled ``Neo4jConnection``.
+
+    Reads and writes run as managed transactions (``execute_read``/``execute_write``),
+    so they are routed to readers/writers in a cluster and retried by the driver on
+    transient errors for up to ``max_transaction_retry_time``. Every call opens its own
+    session from the pool, which makes one instance safe to share between threads.
+
+    Callers route explicitly: ``read`` for queries, ``write`` for anything that changes
+    the graph. ``query`` mirrors ``Neo4jGraph.query`` for the agents' reads, so this can
+    be passed to them in place of the LangChain graph wrapper; it always reads.
+
+    Args:
+        connection: Pooled connection holding the drivers
+        fetch_size: Records fetched per round trip for reads and streams
+    """
+
+    def __init__(self, connection: Neo4jConnection, fetch_size: int = 1000):
+        self.connection = connection
+        self.fetch_size = fetch_size
+
+    def _session(self, access_mode, fetch_size=None):
+        return self.connection.driver.session(
+            database=self.connection.database,
+            default_access_mode=access_mode,
+            fetch_size=fetch_size or self.fetch_size,
+        )
+
+    @staticmethod
+    def _collect(tx, query, params):
+        return [record.data() for record in tx.run(query, params)]
+
+    def read(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        with self._session(READ_ACCESS) as session:
+            return session.execute_read(self._collect, query, params or {})
+
+    def write(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        with self._session(WRITE_ACCESS) as session:
+            return session.execute_write(self._collect, query, params or {})
+
+    def query(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Runs ``query`` as a read transaction; writes go through ``write``."""
+        return self.read(query, params)
+
+    def write_batches(self, query: str, rows: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Writes ``rows`` through an ``UNWIND $data_list`` query, one transaction per batch."""
+        written = 0
+        with self._session(WRITE_ACCESS) as session:
+            for i in range(0, len(rows), batch_size):
+                batch = rows[i:i + batch_size]
+                session.execute_write(lambda tx: tx.run(query, data_list=batch).consume())
+                written += len(batch)
+        return written
+
+    def stream(self, query: str, params: Dict[str, Any] = None, fetch_size: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields records lazily, ``fetch_size`` at a time, without materializing the result.
+
+        Streams run as auto-commit reads and are not retried, since a partially consumed
+        result cannot be replayed.
+        """
+        with self._session(READ_ACCESS, fetch_size) as session:
+            for record in session.run(query, params or {}):
+                yield record.data()
+
+    def _async_session(self, access_mode, fetch_size=None):
+        return self.connection.get_async_driver().session(
+            database=self.connection.database,
+            default_access_mode=access_mode,
+            fetch_size=fetch_size or self.fetch_size,
+        )
+
+    @staticmethod
+    async def _collect_async(tx, query, params):
+        result = await tx.run(query, params)
+        return [record.data() async for record in result]
+
+    async def async_read(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        async with self._async_session(READ_ACCESS) as session:
+            return await session.execute_read(self._collect_async, query, params or {})
+
+    async def async_write(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        async with self._async_session(WRITE_ACCESS) as session:
+            return await session.execute_write(self._collect_async, query, params or {})
+
+    async def async_query(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self.async_read(query, params)
+
+    async def async_stream(self, query: str, params: Dict[str, Any] = None,
+                           fetch_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+        async with self._async_session(READ_ACCESS, fetch_size) as session:
+            result = await session.run(query, params or {})
+            async for record in result:
+                yield record.data()
+
+    async def async_read_many(self, query: str, params_list: Iterable[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Runs the same read for many parameter sets concurrently over the async pool."""
+        return await asyncio.gather(*(self.async_read(query, params) for params in params_list))
+
+
+def connect_from_env(**kwargs) -> Neo4jDataAccess:
+    """Builds a pooled data-access layer from the NEO4J_* environment variables."""
+    connection = Neo4jConnection(
+        os.getenv("NEO4J_URI"),
+        os.getenv("NEO4J_USERNAME"),
+        os.getenv("NEO4J_PASSWORD"),
+        database=os.getenv("NEO4J_DATABASE"),
+        **kwargs,
+    )
+    return Neo4jDataAccess(connection)
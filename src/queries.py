@@ -6,6 +6,18 @@ class CypherQueries:
         SET p = playerData
         """
 
+    def create_player_profiles(self):
+        """Player nodes from ``feature_join.player_properties`` rows, with the per-table casts applied."""
+        return """
+        UNWIND $data_list AS playerData
+        CREATE (p:Player)
+        SET p = playerData,
+            p.Social_diversity = toFloat(playerData.Social_diversity),
+            p.Avg_PartyTime = toFloat(playerData.Avg_PartyTime),
+            p.GuildAct_count = toInteger(playerData.GuildAct_count),
+            p.GuildJoin_count = toInteger(playerData.GuildJoin_count)
+        """
+
     def create_action_nodes(self):
         return """
         UNWIND $data_list AS actionData
@@ -71,3 +83,35 @@ class CypherQueries:
         MATCH (p:Player {Actor: toInteger(networkData.Actor)})
         SET p += networkData
         """
+
+    def upsert_player_features(self):
+        return """
+        UNWIND $data_list AS playerData
+        MERGE (p:Player {Actor: toInteger(playerData.Actor)})
+        SET p += playerData
+        """
+
+    def upsert_action_features(self):
+        return """
+        UNWIND $data_list AS actionData
+        MATCH (p:Player {Actor: toInteger(actionData.Actor)})
+        MERGE (p)-[:PERFORMED]->(a:Action)
+        SET a += actionData
+        """
+
+    def create_similar_to_relationships(self):
+        return """
+        UNWIND $data_list AS edge
+        MATCH (p:Player {Actor: toInteger(edge.source)}), (n:Player {Actor: toInteger(edge.target)})
+        MERGE (p)-[s:SIMILAR_TO]->(n)
+        SET s.score = edge.score, s.rank = edge.rank, s.build_id = edge.build_id
+        """
+
+    def delete_stale_similar_to(self):
+        return """
+        MATCH ()-[s:SIMILAR_TO]->()
+        WHERE s.build_id IS NULL OR s.build_id <> $build_id
+        WITH s LIMIT $limit
+        DELETE s
+        RETURN count(*) AS deleted
+        """
@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+# Report fields handed to ``on_durable``: what the completion ledger records per player
+COMPLETION_FIELDS = ("player_id", "sweep_id", "classification_result", "feature_fingerprint")
+
+
+class ReportWriter:
+    """
+    Base class for streaming report sinks.
+
+    Reports are appended one at a time and written to numbered part files under
+    ``output_dir`` (``reports-00000.jsonl``, ``reports-00001.jsonl``, ...). A new part
+    is started every ``max_records_per_file`` reports, and buffered reports are flushed
+    every ``flush_every`` reports or ``flush_interval`` seconds, whichever comes first,
+    so downstream tools can tail results while a sweep is still running.
+
+    ``on_durable`` is called with the ``COMPLETION_FIELDS`` of every report once the
+    report is safely on disk (an fsync'd JSONL batch, or a closed Parquet part). Sweeps
+    record completion there rather than when a report is produced, so a crash never
+    leaves a player marked done whose report was still buffered.
+
+    Writers are callables, so an instance can be passed straight to ``run_sweep``
+    as its ``report_sink``.
+    """
+
+    extension = ""
+
+    def __init__(self, output_dir: str, prefix: str = "reports", max_records_per_file: int = 100_000,
+                 flush_every: int = 100, flush_interval: float = 30.0,
+                 on_durable: Callable[[List[Dict[str, Any]]], None] = None):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_records_per_file = max_records_per_file
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.on_durable = on_durable
+
+        self._lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+        self._part = self._next_part_number()
+        self._records_in_part = 0
+        self._last_flush = time.monotonic()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _next_part_number(self) -> int:
+        """Continues numbering after any parts left by an earlier run in the same directory."""
+        if not os.path.isdir(self.output_dir):
+            return 0
+        parts = [
+            int(name[len(self.prefix) + 1:-len(self.extension)])
+            for name in os.listdir(self.output_dir)
+            if name.startswith(self.prefix + "-") and name.endswith(self.extension)
+            and name[len(self.prefix) + 1:-len(self.extension)].isdigit()
+        ]
+        return max(parts) + 1 if parts else 0
+
+    @property
+    def current_path(self) -> str:
+        return os.path.join(self.output_dir, f"{self.prefix}-{self._part:05d}{self.extension}")
+
+    def __call__(self, report: Dict[str, Any]):
+        self.write(report)
+
+    def write(self, report: Dict[str, Any]):
+        with self._lock:
+            self._buffer.append(report)
+            if (len(self._buffer) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval
+                    or self._records_in_part + len(self._buffer) >= self.max_records_per_file):
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        while self._buffer:
+            room = self.max_records_per_file - self._records_in_part
+            batch, self._buffer = self._buffer[:room], self._buffer[room:]
+            self._write_batch(batch)
+            self._records_in_part += len(batch)
+            if self._records_in_part >= self.max_records_per_file:
+                self._close_part()
+                self._part += 1
+                self._records_in_part = 0
+        self._last_flush = time.monotonic()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def _durable(self, records: List[Dict[str, Any]]):
+        if self.on_durable is not None and records:
+            self.on_durable(records)
+
+    @staticmethod
+    def _completion_records(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{field: report.get(field) for field in COMPLETION_FIELDS} for report in batch]
+
+    def _close_part(self):
+        pass
+
+    def close(self):
+        self.flush()
+        self._close_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlReportWriter(ReportWriter):
+    """Appends one JSON object per line; each flush is fsync'd so readers never see partial batches."""
+
+    extension = ".jsonl"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._file = None
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        if self._file is None:
+            self._file = open(self.current_path, "a", encoding="utf-8")
+        self._file.write("".join(json.dumps(report, default=str) + "\n" for report in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._durable(self._completion_records(batch))
+
+    def _close_part(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetReportWriter(ReportWriter):
+    """
+    Writes each flush as a Parquet row group; a part file becomes readable once it is
+    closed, so its reports only count as durable from then on.
+    """
+
+    extension = ".parquet"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self._writer = None
+        self._schema = None
+        # Completion records of the open part, handed over when it is closed
+        self._unclosed: List[Dict[str, Any]] = []
+
+    def _infer_schema(self, batch: List[Dict[str, Any]]):
+        # Columns that are all-null in the first batch would otherwise be typed as null
+        # and reject later values; scores default to float, everything else to string
+        schema = self._pa.Table.from_pylist(batch).schema
+        fields = []
+        for field in schema:
+            if self._pa.types.is_null(field.type):
+                numeric = field.name.endswith("score") or field.name.endswith("confidence")
+                field = field.with_type(self._pa.float64() if numeric else self._pa.string())
+            fields.append(field)
+        return self._pa.schema(fields)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        if self._schema is None:
+            self._schema = self._infer_schema(batch)
+        table = self._pa.Table.from_pylist(batch, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.current_path, self._schema)
+        self._writer.write_table(table)
+        self._unclosed.extend(self._completion_records(batch))
+
+    def _close_part(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            fd = os.open(self.current_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            records, self._unclosed = self._unclosed, []
+            self._durable(records)
+
+
+REPORT_WRITERS = {
+    "jsonl": JsonlReportWriter,
+    "parquet": ParquetReportWriter,
+}
+
+
+def make_report_writer(output_dir: str, fmt: str = "jsonl", **kwargs) -> ReportWriter:
+    """Creates the report writer for ``fmt`` ("jsonl" or "parquet")."""
+    try:
+        writer_cls = REPORT_WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown report format '{fmt}', expected one of {sorted(REPORT_WRITERS)}")
+    return writer_cls(output_dir, **kwargs)
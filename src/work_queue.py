@@ -0,0 +1,161 @@
+import json
+import os
+import socket
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+PENDING, CLAIMED, DONE, FAILED = "pending", "claimed", "done", "failed"
+# Claimed shard files are named <shard>@<worker id> so a dead worker's shards can be found
+OWNER_SEPARATOR = "@"
+
+
+def shard_of(player_id: str, num_shards: int) -> int:
+    """Stable shard number for a player; crc32 keeps the assignment identical across processes and hosts."""
+    return zlib.crc32(str(player_id).encode("utf-8")) % num_shards
+
+
+def partition(player_ids: Iterable[str], num_shards: int) -> List[List[str]]:
+    """Hash-partitions ``player_ids`` into ``num_shards`` lists, keeping their order within a shard."""
+    shards: List[List[str]] = [[] for _ in range(num_shards)]
+    for player_id in player_ids:
+        shards[shard_of(player_id, num_shards)].append(str(player_id))
+    return shards
+
+
+def default_worker_id(index: int = 0) -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{index}"
+
+
+class WorkQueue:
+    """
+    File-based shard queue shared by workers on one host or across hosts on a shared filesystem.
+
+    Each shard is a JSON file that moves between ``pending/``, ``claimed/``, ``done/``
+    and ``failed/``. Every state change is an ``os.rename``, which is atomic on a single
+    filesystem, so exactly one worker wins each claim. A claimed shard's modification
+    time is its lease: workers renew it with ``heartbeat``, and ``reclaim_expired``
+    returns shards whose lease ran out to ``pending/`` for another worker.
+
+    Args:
+        root: Queue directory
+        max_attempts: Claims a shard gets before it is parked in ``failed/``
+    """
+
+    def __init__(self, root: str, max_attempts: int = 3):
+        self.root = root
+        self.max_attempts = max_attempts
+        for state in (PENDING, CLAIMED, DONE, FAILED):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    def _path(self, state: str, name: str) -> str:
+        return os.path.join(self.root, state, name)
+
+    def _list(self, state: str) -> List[str]:
+        return sorted(name for name in os.listdir(os.path.join(self.root, state)) if not name.startswith("."))
+
+    def _write(self, state: str, name: str, shard: Dict[str, Any]):
+        tmp_path = self._path(state, f".{name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(shard, f)
+        os.rename(tmp_path, self._path(state, name))
+
+    @staticmethod
+    def _shard_name(claimed_name: str) -> str:
+        return claimed_name.split(OWNER_SEPARATOR, 1)[0]
+
+    def enqueue(self, sweep_id: str, shards: List[List[str]], fingerprints: Dict[str, str] = None) -> int:
+        """Writes one pending file per non-empty shard; shards already known to the queue are left alone."""
+        known = {self._shard_name(name) for state in (PENDING, CLAIMED, DONE, FAILED) for name in self._list(state)}
+        written = 0
+        for number, player_ids in enumerate(shards):
+            name = f"shard-{number:05d}.json"
+            if not player_ids or name in known:
+                continue
+            self._write(PENDING, name, {
+                "sweep_id": sweep_id,
+                "shard": number,
+                "player_ids": player_ids,
+                "fingerprints": {pid: fingerprints.get(pid) for pid in player_ids} if fingerprints else None,
+                "attempts": 0,
+            })
+            written += 1
+        return written
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Claims the next pending shard, or returns None when nothing is pending."""
+        for name in self._list(PENDING):
+            claimed_name = f"{name}{OWNER_SEPARATOR}{worker_id}"
+            try:
+                os.rename(self._path(PENDING, name), self._path(CLAIMED, claimed_name))
+            except FileNotFoundError:
+                continue  # another worker won this one
+            os.utime(self._path(CLAIMED, claimed_name))
+            with open(self._path(CLAIMED, claimed_name)) as f:
+                shard = json.load(f)
+            shard["claim"] = claimed_name
+            return shard
+        return None
+
+    def heartbeat(self, shard: Dict[str, Any]) -> bool:
+        """Renews the lease; False means the shard was reclaimed and the worker should stop."""
+        try:
+            os.utime(self._path(CLAIMED, shard["claim"]))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, shard: Dict[str, Any]) -> bool:
+        try:
+            os.rename(self._path(CLAIMED, shard["claim"]), self._path(DONE, self._shard_name(shard["claim"])))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def release(self, claimed_name: str, reason: str = None):
+        """Returns a claimed shard to ``pending/``, or parks it in ``failed/`` once out of attempts."""
+        # Moved aside first so a worker completing the shard at the same moment can't be overridden
+        path = self._path(CLAIMED, f".{claimed_name}.releasing")
+        try:
+            os.rename(self._path(CLAIMED, claimed_name), path)
+        except FileNotFoundError:
+            return
+        with open(path) as f:
+            shard = json.load(f)
+        shard["attempts"] = shard.get("attempts", 0) + 1
+        shard["last_error"] = reason
+        state = FAILED if shard["attempts"] >= self.max_attempts else PENDING
+        self._write(state, self._shard_name(claimed_name), shard)
+        os.remove(path)
+        print(f"Shard {shard['shard']} {'failed' if state == FAILED else 'requeued'}: {reason}")
+
+    def fail(self, shard: Dict[str, Any], reason: str):
+        self.release(shard["claim"], reason)
+
+    def release_worker(self, worker_id: str, reason: str = "worker exited"):
+        """Requeues every shard held by ``worker_id`` without waiting for its lease to expire."""
+        suffix = f"{OWNER_SEPARATOR}{worker_id}"
+        for name in self._list(CLAIMED):
+            if name.endswith(suffix):
+                self.release(name, reason)
+
+    def reclaim_expired(self, lease_seconds: float) -> int:
+        """Requeues claimed shards whose lease was not renewed within ``lease_seconds``."""
+        now = time.time()
+        reclaimed = 0
+        for name in self._list(CLAIMED):
+            try:
+                expired = now - os.path.getmtime(self._path(CLAIMED, name)) > lease_seconds
+            except FileNotFoundError:
+                continue
+            if expired:
+                self.release(name, f"lease expired after {lease_seconds:.0f}s")
+                reclaimed += 1
+        return reclaimed
+
+    def counts(self) -> Dict[str, int]:
+        return {state: len(self._list(state)) for state in (PENDING, CLAIMED, DONE, FAILED)}
+
+    def is_finished(self) -> bool:
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[CLAIMED] == 0
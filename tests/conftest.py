@@ -0,0 +1,6 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import import_paths  # noqa: E402,F401  (maps ml / src.data_ingestion onto this checkout)
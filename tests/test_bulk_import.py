@@ -0,0 +1,53 @@
+import csv
+import os
+
+import pandas as pd
+
+from src.data_ingestion.bulk_import import build_import_files, validate_import_files
+
+
+def _tables():
+    return {
+        "player": pd.DataFrame({"Actor": [1, 2], "A_Acc": [9, 8], "Level": [1, 2], "Type": ["Human", "Bot"]}),
+        "action": pd.DataFrame({"Actor": [1, 2, 5], "Sit_count": [0, 1, 2], "Sit_ratio": [0.0, 0.5, 1.0]}),
+        "social": pd.DataFrame({"Actor": [1], "A_Acc": [9], "Social_diversity": [0.5]}),
+        "group": pd.DataFrame({"Actor": [2], "Avg_PartyTime": [2.0]}),
+        "network": pd.DataFrame({"Actor": [1, 2], "A_Acc": [1, 1], "Level": [10, 20], "p_deg": [4, 5]}),
+    }
+
+
+def _header(output_dir, name):
+    with open(os.path.join(output_dir, f"{name}_header.csv"), newline="") as f:
+        return next(csv.reader(f))
+
+
+def test_built_files_validate(tmp_path):
+    output_dir = str(tmp_path)
+    counts = build_import_files(output_dir, _tables())
+    # Actor 5 has no player row
+    assert counts == {"players": 2, "actions": 2, "performed": 2}
+    assert validate_import_files(output_dir) == []
+
+    header = _header(output_dir, "players")
+    assert header[0] == "playerId:ID(Player)"
+    assert "Level:long" in header and "Social_diversity:double" in header
+    assert not any("_network" in field or "_social" in field for field in header)
+
+
+def test_validation_reports_corrupted_values(tmp_path):
+    output_dir = str(tmp_path)
+    build_import_files(output_dir, _tables())
+    path = os.path.join(output_dir, "actions.csv")
+    with open(path) as f:
+        lines = f.read().splitlines()
+    fields = lines[0].split(",")
+    fields[_header(output_dir, "actions").index("Sit_count:long")] = "lots"
+    lines[0] = ",".join(fields)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(output_dir, "performed.csv"), "a") as f:
+        f.write("1,99\n")
+
+    problems = validate_import_files(output_dir)
+    assert any(p.startswith("actions.csv:1: Sit_count is not a long") for p in problems)
+    assert any(p.startswith("performed.csv:3: END_ID(Action) has no node") for p in problems)
@@ -0,0 +1,76 @@
+import pytest
+
+from main import BotDetectionOrchestrator, parse_classification
+from ml.cascade import AgentCascade
+from ml.score_fusion import ScoreFusion
+
+
+def _scores(anomaly=None, social=None, action=None):
+    return {"anomaly_score": anomaly, "social_diversity_score": social, "player_action_score": action}
+
+
+def test_single_high_score_does_not_exit_as_bot():
+    cascade = AgentCascade()
+    assert cascade.decision(_scores(social=95)) is None
+    assert cascade.decision(_scores(social=95, anomaly=90)) == "Bot"
+
+
+def test_min_agents_bot_is_configurable():
+    assert AgentCascade(min_agents_bot=1).decision(_scores(social=95)) == "Bot"
+
+
+def test_contradicted_bot_score_keeps_the_cascade_running():
+    cascade = AgentCascade()
+    assert cascade.decision(_scores(social=95, anomaly=10)) is None
+
+
+def test_human_exit_needs_min_agents_human():
+    cascade = AgentCascade()
+    assert cascade.decision(_scores(social=5)) is None
+    assert cascade.decision(_scores(social=5, anomaly=10)) == "Human"
+
+
+def test_mid_range_scores_are_undecided():
+    assert AgentCascade().decision(_scores(social=60, anomaly=55)) is None
+
+
+def test_unknown_agent_in_order_is_rejected():
+    with pytest.raises(ValueError):
+        AgentCascade(order=("anomaly", "sentiment"))
+
+
+def test_rules_fusion_thresholds():
+    fusion = ScoreFusion()
+    bot = fusion.fuse(_scores(anomaly=85, social=70, action=75))
+    assert bot["classification"] == "Bot" and not bot["conflict"]
+    human = fusion.fuse(_scores(anomaly=10, social=20, action=30))
+    assert human["classification"] == "Human" and human["confidence"] == 80.0
+    assert fusion.fuse(_scores(anomaly=90, social=10))["conflict"]
+    assert fusion.fuse(_scores())["classification"] is None
+
+
+@pytest.mark.parametrize("scores", [_scores(anomaly=79, social=79, action=79), _scores(anomaly=45, social=30)])
+def test_rules_fusion_leaves_mid_range_agreement_to_the_llm(scores):
+    assert ScoreFusion().fuse(scores)["conflict"]
+    # A calibrated logistic fusion decides mid-range scores on its own probability
+    assert not ScoreFusion(method="logistic", weights=[10.0, 10.0, 10.0], bias=-5.0).fuse(scores)["conflict"]
+
+
+def _cascading_orchestrator():
+    orchestrator = BotDetectionOrchestrator.__new__(BotDetectionOrchestrator)
+    orchestrator.fusion = None
+    orchestrator.cascade = AgentCascade()
+    return orchestrator
+
+
+def test_cascade_decision_after_the_last_agent_skips_the_llm_classifier():
+    # Undecided after two agents; the last agent settles it, so nothing was skipped
+    state = {**_scores(social=70, anomaly=60, action=95), "skipped_agents": []}
+    local = _cascading_orchestrator().classify_locally(state)
+    assert local["classification_method"] == "cascade:rules"
+    assert parse_classification(local["classification_result"])["classification"] == "Bot"
+
+
+def test_undecided_cascade_without_fusion_uses_the_llm_classifier():
+    state = {**_scores(social=70, anomaly=60, action=65), "skipped_agents": []}
+    assert _cascading_orchestrator().classify_locally(state) is None
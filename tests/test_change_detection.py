@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from src.data_ingestion.change_detection import compute_feature_fingerprints
+
+
+def _tables(level=3, region="eu"):
+    player = pd.DataFrame({"Actor": [1, 2], "Level": [level, 7], "Region": [region, "us"], "Type": ["Human", "Bot"]})
+    action = pd.DataFrame({"Actor": [1, 3], "Moves": [0.5, 1.25]})
+    return [player, action]
+
+
+def test_non_numeric_columns_are_fingerprinted():
+    fingerprints = compute_feature_fingerprints(_tables())
+    assert set(fingerprints) == {"1", "2", "3"}
+    assert compute_feature_fingerprints(_tables(region="asia"))["1"] != fingerprints["1"]
+
+
+def test_only_changed_actors_change_fingerprint():
+    before = compute_feature_fingerprints(_tables())
+    after = compute_feature_fingerprints(_tables(level=4))
+    assert after["1"] != before["1"]
+    assert after["2"] == before["2"]
+    assert after["3"] == before["3"]
+
+
+def test_label_column_is_ignored():
+    tables = _tables()
+    relabeled = [tables[0].assign(Type=["Bot", "Bot"]), tables[1]]
+    assert compute_feature_fingerprints(relabeled) == compute_feature_fingerprints(tables)
+
+
+def test_missing_tables_raise_a_clear_error():
+    with pytest.raises(ValueError, match="No feature tables"):
+        compute_feature_fingerprints([None, None])
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from main import BotDetectionOrchestrator, parse_classification
+from ml.clustering import PlayerClusterer
+
+
+def _representative(classification="Bot", confidence=90.0):
+    return {"player_id": "1", "classification": classification, "classification_confidence": confidence,
+            "classification_reasoning": "Farms all day"}
+
+
+@pytest.mark.parametrize("classification,confidence,similarity,expected", [
+    ("Bot", 90.0, 1.0, 90.0),
+    ("Bot", 90.0, 0.5, 70.0),
+    # Regression: confidence * similarity gave 30, a confidence below 50 contradicting the verdict
+    ("Bot", 60.0, 0.5, 55.0),
+    ("Human", 80.0, 0.0, 50.0),
+])
+def test_propagated_confidence_shrinks_towards_50(classification, confidence, similarity, expected):
+    orchestrator = BotDetectionOrchestrator.__new__(BotDetectionOrchestrator)
+    state = orchestrator.propagate_verdict(_representative(classification, confidence), "2", similarity, cluster_id=0)
+    parsed = parse_classification(state["classification_result"])
+    assert parsed["classification"] == classification
+    assert parsed["confidence"] == expected
+    assert state["classification_method"] == "cluster:1"
+
+
+def test_plan_groups_near_duplicates_and_keeps_outliers():
+    rng = np.random.default_rng(0)
+    farm = rng.normal(0.0, 0.01, size=(6, 4)) + 5.0
+    others = np.array([[-5.0, 0, 0, 0], [0, 5.0, 0, 0], [0, 0, -5.0, 0]])
+    player_ids = [f"farm{i}" for i in range(6)] + ["a", "b", "c"]
+
+    plan = PlayerClusterer(n_clusters=2).plan(player_ids, np.vstack([farm, others]))
+    assert len(plan["clusters"]) == 1
+    cluster = plan["clusters"][0]
+    assert sorted(cluster["members"]) == player_ids[:6]
+    assert cluster["members"][0] == cluster["representative"]
+    assert cluster["similarity"][0] == 1.0
+    assert all(0.5 <= s <= 1.0 for s in cluster["similarity"])
+    assert sorted(plan["outliers"]) == ["a", "b", "c"]
+
+
+def test_plan_scores_small_populations_individually():
+    plan = PlayerClusterer().plan(["1", "2"], np.zeros((2, 3)))
+    assert plan == {"clusters": [], "outliers": ["1", "2"]}
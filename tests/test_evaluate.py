@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import evaluate
+
+
+@pytest.fixture
+def social_table(monkeypatch):
+    table = pd.DataFrame({"Actor": range(20), "Type": ["Bot"] * 10 + ["Human"] * 10})
+    monkeypatch.setattr(evaluate, "load_social_data", lambda: table)
+    return table
+
+
+def test_split_is_stratified_disjoint_and_reproducible(social_table):
+    test = evaluate.load_labelled_split("test", test_fraction=0.3, seed=1)
+    train = evaluate.load_labelled_split("train", test_fraction=0.3, seed=1)
+
+    assert sorted(label for _, label in test) == [0, 0, 0, 1, 1, 1]
+    assert len(train) == 14
+    assert not {pid for pid, _ in test} & {pid for pid, _ in train}
+    assert all(label == (int(pid) < 10) for pid, label in test + train)
+    assert evaluate.load_labelled_split("test", test_fraction=0.3, seed=1) == test
+    assert len(evaluate.load_labelled_split("test", test_fraction=0.3, seed=1, limit=4)) == 4
+
+
+def test_split_is_empty_without_data(monkeypatch):
+    monkeypatch.setattr(evaluate, "load_social_data", lambda: None)
+    assert evaluate.load_labelled_split() == []
+
+
+@pytest.mark.parametrize("result,expected", [
+    ({"bot_score": 12, "classification": "Bot", "confidence": 90}, 12.0),
+    ({"classification": "Bot", "confidence": 80.0}, 80.0),
+    ({"classification": "Human", "confidence": 80.0}, 20.0),
+    ({"classification": "Unknown", "confidence": 80.0, "agent_scores": [30, None, 70]}, 70.0),
+    ({"agent_scores": [None]}, 50.0),
+])
+def test_bot_probability(result, expected):
+    assert evaluate.bot_probability(result) == expected
+
+
+def test_compute_quality():
+    pytest.importorskip("sklearn")
+    quality = evaluate.compute_quality([1, 1, 0, 0], [1, 0, 0, 0], [90.0, 40.0, 30.0, 10.0])
+    assert quality["accuracy"] == 0.75
+    assert (quality["precision"], quality["recall"]) == (1.0, 0.5)
+    assert quality["confusion_matrix"] == [[2, 0], [1, 1]]
+    assert quality["roc_auc"] == 1.0
+
+
+def test_compute_quality_omits_roc_auc_for_a_single_class():
+    pytest.importorskip("sklearn")
+    quality = evaluate.compute_quality([0, 0], [0, 1], [10.0, 60.0])
+    assert quality["roc_auc"] is None
+    assert quality["precision"] == 0.0
+    assert quality["confusion_matrix"] == [[1, 1], [0, 0]]
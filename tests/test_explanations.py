@@ -0,0 +1,39 @@
+from main import BotDetectionOrchestrator
+from src.data_ingestion.ledger import ExplanationCache
+
+
+def _orchestrator(tmp_path, fingerprints):
+    orchestrator = BotDetectionOrchestrator.__new__(BotDetectionOrchestrator)
+    orchestrator.explanations = ExplanationCache(str(tmp_path / "explanations.sqlite"), "v1")
+    orchestrator.fingerprints = fingerprints
+    orchestrator.scored = []
+
+    def score_players(player_ids):
+        orchestrator.scored += player_ids
+        return {pid: {"current_player_id": pid, "feature_fingerprint": fingerprints.get(pid),
+                      "explanation": f"fresh explanation of {pid}"} for pid in player_ids}
+
+    orchestrator.score_players = score_players
+    return orchestrator
+
+
+def test_explain_reuses_explanation_for_current_features(tmp_path):
+    orchestrator = _orchestrator(tmp_path, {"1": "fp-1"})
+    orchestrator.explanations.put("1", "cached explanation", "fp-1")
+    assert orchestrator.explain("1") == "cached explanation"
+    assert orchestrator.scored == []
+
+
+def test_explain_ignores_explanation_written_for_old_features(tmp_path):
+    # Regression: explain() looked the cache up without a fingerprint and served stale text
+    orchestrator = _orchestrator(tmp_path, {"1": "fp-1-changed"})
+    orchestrator.explanations.put("1", "stale explanation", "fp-1")
+    assert orchestrator.explain("1") == "fresh explanation of 1"
+    assert orchestrator.scored == ["1"]
+
+
+def test_explanation_cache_is_per_feature_version(tmp_path):
+    path = str(tmp_path / "explanations.sqlite")
+    ExplanationCache(path, "v1").put("1", "old prompts", "fp")
+    assert ExplanationCache(path, "v2").get("1", "fp") is None
+    assert ExplanationCache(path, "v1").get("1") == "old prompts"
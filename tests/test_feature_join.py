@@ -0,0 +1,64 @@
+import pandas as pd
+
+from src.data_ingestion.feature_join import join_actor_features, player_properties
+from src.data_ingestion.kg_population import KnowledgeGraphPopulator
+
+
+def _tables():
+    return {
+        "player": pd.DataFrame({"Actor": [1, 2, 3], "A_Acc": [9, 9, 8], "Level": [1, 2, 3], "Type": ["Human"] * 3}),
+        "social": pd.DataFrame({"Actor": [1, 2], "A_Acc": [9, 9], "Social_diversity": ["0.5", 1],
+                                "Type": ["Human"] * 2}),
+        "group": pd.DataFrame({"Actor": [1], "Avg_PartyTime": [2], "GuildAct_count": [3.0], "GuildJoin_count": [1]}),
+        "network": pd.DataFrame({"Actor": [2, 3], "A_Acc": [1, 1], "Level": [20, 30], "p_deg": [4, 5]}),
+    }
+
+
+def test_player_properties_keep_the_graph_property_names():
+    profiles = player_properties(_tables())
+    assert list(profiles.columns) == ["Actor", "A_Acc", "Level", "Social_diversity", "Avg_PartyTime",
+                                      "GuildAct_count", "GuildJoin_count", "p_deg"]
+    # Network values replace same-named player properties where the network table has the actor
+    assert profiles["Level"].tolist() == [1, 20, 30]
+    # A_Acc always comes from the player table
+    assert profiles["A_Acc"].tolist() == [9, 9, 8]
+
+
+def test_player_properties_apply_the_ingestion_casts():
+    profiles = player_properties(_tables())
+    assert profiles["Social_diversity"].dtype == "float64"
+    assert profiles["Social_diversity"].tolist()[:2] == [0.5, 1.0]
+    assert str(profiles["GuildAct_count"].dtype) == "Int64"
+    assert profiles["GuildAct_count"].isna().tolist() == [False, True, True]
+
+
+def test_join_actor_features_suffixes_clashing_columns():
+    joined = join_actor_features(_tables(), drop=("Type",))
+    assert "Level_network" in joined.columns
+    assert joined.loc[3, "Level"] == 3
+
+
+class _RecordingGraph:
+    def __init__(self):
+        self.batches = {}
+
+    def write(self, query, params=None):
+        return []
+
+    def write_batches(self, query, rows, batch_size=1000):
+        self.batches[query] = rows
+        return len(rows)
+
+
+def test_populator_writes_each_player_once_with_unsuffixed_properties():
+    tables = _tables()
+    tables["action"] = pd.DataFrame({"Actor": [1, 2, 3], "Sit_count": [0, 1, 2]})
+    graph = _RecordingGraph()
+    populator = KnowledgeGraphPopulator(graph=graph, tables=tables)
+    populator.populate_knowledge_graph()
+
+    players = graph.batches[populator.queries.create_player_profiles()]
+    assert [row["Actor"] for row in players] == [1, 2, 3]
+    assert players[0] == {"Actor": 1, "A_Acc": 9, "Level": 1, "Social_diversity": 0.5, "Avg_PartyTime": 2.0,
+                          "GuildAct_count": 3, "GuildJoin_count": 1}
+    assert "toFloat(playerData.Social_diversity)" in populator.queries.create_player_profiles()
@@ -0,0 +1,123 @@
+import math
+
+import pytest
+
+from src.data_ingestion.feature_stream import SECONDS_PER_DAY, FeatureStream
+
+DAY = SECONDS_PER_DAY
+
+
+def _stream(events, window_days=None):
+    stream = FeatureStream(window_days=window_days)
+    for event in events:
+        assert stream.update(event)
+    return stream
+
+
+def test_sessions_add_playtime_over_login_days():
+    stream = _stream([
+        {"actor": 1, "ts": 0, "type": "login", "ip": "10.0.0.1", "a_acc": 7, "money": 100},
+        {"actor": 1, "ts": 3600, "type": "logout", "money": 300},
+        {"actor": 1, "ts": DAY, "type": "login", "ip": "10.0.0.1"},
+        {"actor": 1, "ts": DAY + 1800, "type": "logout", "level": 12},
+        {"actor": 1, "ts": "1970-01-03T00:00:00", "type": "login", "ip": "10.0.0.2"},
+    ])
+    row = stream.player_features(1)
+    assert row["A_Acc"] == 7
+    assert (row["Login_day_count"], row["Logout_day_count"], row["Login_count"]) == (3, 2, 3)
+    assert row["Playtime"] == 5400
+    assert row["playtime_per_day"] == 1800
+    assert row["avg_money"] == 200
+    assert row["ip_count"] == 2
+    assert row["Max_level"] == 12
+
+
+def test_action_ratios_are_percentages_and_rates_are_per_login_day():
+    stream = _stream([
+        {"actor": 1, "ts": 0, "type": "login"},
+        {"actor": 1, "ts": 10, "type": "action", "action": "Sit", "count": 3},
+        {"actor": 1, "ts": 20, "type": "action", "action": "Item_get"},
+        {"actor": 1, "ts": DAY, "type": "login"},
+        {"actor": 1, "ts": DAY + 10, "type": "action", "action": "Item_get", "count": 4},
+        {"actor": 1, "ts": DAY + 20, "type": "action", "action": "Teleport", "count": 2},
+    ])
+    row = stream.action_features(1)
+    assert row["Sit_ratio"] == 30.0
+    assert row["Item_get_ratio"] == 50.0
+    assert row["Item_get_count"] == 5
+    assert row["item_get_count_per_day"] == 2.5
+    assert row["Teleport_count_per_day"] == 1.0
+    # The busiest collecting day, not the total
+    assert row["collect_max_count"] == 4
+
+
+def test_social_diversity_is_the_entropy_of_interaction_types():
+    stream = _stream([{"actor": 1, "ts": i, "type": "social", "interaction": kind}
+                      for i, kind in enumerate(["party", "party", "trade", "trade"])])
+    assert stream.social_features(1)["Social_diversity"] == pytest.approx(math.log(2))
+    stream = _stream([{"actor": 2, "ts": 0, "type": "social", "interaction": "mail"}])
+    assert stream.social_features(2)["Social_diversity"] == 0.0
+
+
+def test_window_drops_expired_days():
+    stream = _stream([
+        {"actor": 1, "ts": 0, "type": "login", "ip": "10.0.0.1"},
+        {"actor": 1, "ts": 10, "type": "action", "action": "Exp_get", "count": 9},
+        {"actor": 1, "ts": 2 * DAY, "type": "login", "ip": "10.0.0.2"},
+        {"actor": 1, "ts": 2 * DAY + 10, "type": "action", "action": "Exp_get", "count": 1},
+    ], window_days=2)
+    player, actions = stream.player_features(1), stream.action_features(1)
+    assert (player["Login_day_count"], player["Login_count"], player["ip_count"]) == (1, 1, 1)
+    assert actions["Exp_get_count"] == 1
+    assert actions["collect_max_count"] == 1
+
+    # Idle actors age with the stream clock
+    stream.update({"actor": 2, "ts": 4 * DAY, "type": "login"})
+    assert stream.player_features(1)["Login_count"] == 0
+
+
+def test_late_logins_do_not_count_an_ip_twice():
+    stream = _stream([
+        {"actor": 1, "ts": 5 * DAY, "type": "login", "ip": "a"},
+        # Day 3 is no longer held, so this login is credited to day 5
+        {"actor": 1, "ts": 3 * DAY, "type": "login", "ip": "b"},
+        {"actor": 1, "ts": 5 * DAY + 10, "type": "login", "ip": "b"},
+    ], window_days=7)
+    assert stream.player_features(1)["ip_count"] == 2
+
+
+def test_late_logins_keep_the_latest_day_an_ip_was_seen():
+    stream = _stream([
+        {"actor": 1, "ts": 0, "type": "login", "ip": "a"},
+        {"actor": 1, "ts": 2 * DAY, "type": "login", "ip": "b"},
+        {"actor": 1, "ts": 10, "type": "login", "ip": "b"},
+        {"actor": 1, "ts": 3 * DAY, "type": "login"},
+    ], window_days=3)
+    # Day 0 expired; b was last seen on day 2 and is still in the window
+    assert stream.player_features(1)["ip_count"] == 1
+
+
+@pytest.mark.parametrize("event", [
+    {"actor": "x", "ts": 0, "type": "login"},
+    {"actor": 1, "type": "login"},
+    {"actor": 1, "ts": 0, "type": "teleported"},
+    {"actor": 1, "ts": 0, "type": "action", "action": "Bogus"},
+    {"actor": 1, "ts": 0, "type": "social", "interaction": "telepathy"},
+    {"actor": 1, "ts": 0, "type": "action", "action": "Sit", "count": "x"},
+    {"actor": 1, "ts": 0, "type": "login", "money": "lots"},
+])
+def test_malformed_events_are_rejected_without_creating_state(event):
+    stream = FeatureStream()
+    assert not stream.update(event)
+    assert (stream.rejected, stream.events) == (1, 0)
+    assert stream.actors == {}
+    assert stream.current_day is None
+
+
+def test_consume_flushes_changed_actors():
+    stream = FeatureStream()
+    flushed = []
+    events = [{"actor": actor, "ts": 0, "type": "login"} for actor in (3, 1, 3, 2)]
+    assert stream.consume(events, on_flush=flushed.append, flush_every=2) == 4
+    assert flushed == [[1, 3], [2, 3]]
+    assert stream.take_dirty() == []
@@ -0,0 +1,43 @@
+import sqlite3
+
+from src.data_ingestion.ledger import CompletionLedger
+
+
+def test_pending_skips_completed_players(tmp_path):
+    ledger = CompletionLedger(str(tmp_path / "ledger.db"), "v1")
+    ledger.mark_completed("1", "Bot", sweep_id="s")
+    ledger.mark_completed(2, "Human", sweep_id="s")
+
+    assert set(ledger.completed()) == {"1", "2"}
+    assert ledger.pending(["1", "2", "3"]) == ["3"]
+
+
+def test_completions_are_per_feature_version(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    CompletionLedger(path, "v1").mark_completed("1", "Bot")
+    assert CompletionLedger(path, "v2").pending(["1"]) == ["1"]
+    assert CompletionLedger(path, "v1").pending(["1"]) == []
+
+
+def test_players_with_changed_features_are_pending(tmp_path):
+    ledger = CompletionLedger(str(tmp_path / "ledger.db"), "v1")
+    ledger.mark_completed("1", "Bot", feature_fingerprint="a")
+    ledger.mark_completed("2", "Human", feature_fingerprint="b")
+
+    assert ledger.completed() == {"1": "a", "2": "b"}
+    assert ledger.pending(["1", "2", "3"], {"1": "a", "2": "changed", "3": "c"}) == ["2", "3"]
+
+
+def test_ledgers_without_fingerprints_are_migrated(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE completed_players (player_id TEXT NOT NULL, feature_version TEXT NOT NULL, "
+                 "sweep_id TEXT, classification TEXT, completed_at TEXT, PRIMARY KEY (player_id, feature_version))")
+    conn.execute("INSERT INTO completed_players VALUES ('1', 'v1', 's', 'Bot', NULL)")
+    conn.commit()
+    conn.close()
+
+    ledger = CompletionLedger(path, "v1")
+    assert ledger.completed() == {"1": None}
+    ledger.mark_completed("2", "Human", feature_fingerprint="f")
+    assert ledger.completed() == {"1": None, "2": "f"}
@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from ml.llm_metering import MeteredLLM  # noqa: E402
+
+
+class FakeChatModel:
+    """Echoes the prompt back; prompts containing "fail" raise."""
+
+    def __init__(self, **bound):
+        self.bound = bound
+        self.calls = 0
+
+    def _respond(self, messages):
+        self.calls += 1
+        if "fail" in messages:
+            raise RuntimeError(f"rate limited: {messages}")
+        return AIMessage(content=f"echo {messages}",
+                         usage_metadata={"input_tokens": 10, "output_tokens": 2, "total_tokens": 12})
+
+    def invoke(self, messages, **kwargs):
+        return self._respond(messages)
+
+    def batch(self, messages_list, config=None, return_exceptions=False, **kwargs):
+        responses = []
+        for messages in messages_list:
+            try:
+                responses.append(self._respond(messages))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                responses.append(e)
+        return responses
+
+    def bind(self, **kwargs):
+        return FakeChatModel(**{**self.bound, **kwargs})
+
+
+def test_batch_returns_exceptions_per_prompt():
+    llm = MeteredLLM(FakeChatModel(), cache={})
+    responses = llm.batch(["a", "fail", "b"], return_exceptions=True)
+    assert [r.content for r in (responses[0], responses[2])] == ["echo a", "echo b"]
+    assert isinstance(responses[1], RuntimeError)
+    # Failures are neither metered nor cached
+    assert llm.stats.calls == 2
+    assert len(llm.cache) == 2
+
+
+def test_batch_raises_without_return_exceptions():
+    with pytest.raises(RuntimeError):
+        MeteredLLM(FakeChatModel()).batch(["a", "fail"])
+
+
+def test_cache_answers_repeated_prompts():
+    model = FakeChatModel()
+    llm = MeteredLLM(model, cache={})
+    assert llm.invoke("a").content == "echo a"
+    assert llm.invoke("a").content == "echo a"
+    assert llm.batch(["a", "b"])[0].content == "echo a"
+    assert model.calls == 2
+    assert llm.stats.cache_hits == 2
+    assert llm.stats.as_dict()["total_tokens"] == 24
+
+
+def test_bound_model_shares_stats_and_keys_cache_by_options():
+    llm = MeteredLLM(FakeChatModel(), cache={})
+    capped = llm.bind(max_tokens=16)
+    llm.invoke("a")
+    capped.invoke("a")
+    assert llm.stats is capped.stats
+    # Same prompt under different call options is a separate cache entry
+    assert llm.stats.calls == 2 and llm.stats.cache_hits == 0
+    capped.invoke("a")
+    assert llm.stats.cache_hits == 1
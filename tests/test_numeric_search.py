@@ -0,0 +1,35 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("faiss")
+
+from ml.numeric_search import NumericFeatureIndex  # noqa: E402
+
+
+def _features(level=3.0):
+    return pd.DataFrame({"Level": [level, 7.0, 1.0], "Gold": [10.0, 2000.0, 5.0]},
+                        index=pd.Index([1, 2, 3], name="Actor"))
+
+
+def test_save_and_load_use_the_npz_path(tmp_path):
+    path = str(tmp_path / "numeric_index")
+    NumericFeatureIndex().build(_features()).save(path)
+    assert os.listdir(tmp_path) == ["numeric_index.npz"]
+
+    index = NumericFeatureIndex().load(path)
+    assert index.player_ids == ["1", "2", "3"]
+    assert index.search("1", top_k=1) == ["3"]
+
+
+def test_cached_index_is_rebuilt_when_the_tables_change(tmp_path):
+    path = str(tmp_path / "numeric_index.npz")
+    built = NumericFeatureIndex().load_or_build(path, _features())
+
+    cached = NumericFeatureIndex().load_or_build(path, _features())
+    assert cached.fingerprint == built.fingerprint
+
+    changed = NumericFeatureIndex().load_or_build(path, _features(level=50.0))
+    assert changed.fingerprint != built.fingerprint
+    assert NumericFeatureIndex().load(path).fingerprint == changed.fingerprint
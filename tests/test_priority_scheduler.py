@@ -0,0 +1,25 @@
+from ml.llm_metering import LLMUsageStats
+from ml.priority_scheduler import BudgetScheduler
+
+
+def _spend(stats, tokens):
+    stats.record_call(tokens, 0)
+
+
+def test_dispatches_most_suspicious_first_until_budget():
+    stats = LLMUsageStats()
+    scheduler = BudgetScheduler({"a": 0.1, "b": 0.9, "c": 0.5, "d": 0.3}, stats, token_budget=250)
+    dispatched = []
+    for player_id in scheduler:
+        dispatched.append(player_id)
+        _spend(stats, 100)
+    # After two players at 100 tokens each, a third would overrun 250
+    assert dispatched == ["b", "c"]
+    assert [p["player_id"] for p in scheduler.unscored()] == ["d", "a"]
+
+
+def test_expected_bots_only_reported_for_a_fitted_prior():
+    priorities = {"a": 0.25, "b": 0.5}
+    assert BudgetScheduler(priorities, LLMUsageStats(), token_budget=0).summary()["expected_bots_unscored"] is None
+    calibrated = BudgetScheduler(priorities, LLMUsageStats(), token_budget=0, calibrated=True)
+    assert calibrated.summary()["expected_bots_unscored"] == 0.8
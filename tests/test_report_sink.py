@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from src.data_ingestion.ledger import CompletionLedger
+from src.data_ingestion.report_sink import make_report_writer
+
+
+def _report(player_id, sweep_id="sweep"):
+    return {
+        "player_id": player_id,
+        "sweep_id": sweep_id,
+        "feature_fingerprint": f"fp-{player_id}",
+        "classification_result": "Classification: Human\nConfidence: 80%",
+        "classification": "Human",
+    }
+
+
+def test_jsonl_rotates_parts(tmp_path):
+    with make_report_writer(str(tmp_path), "jsonl", max_records_per_file=2, flush_every=1) as writer:
+        for i in range(5):
+            writer(_report(str(i)))
+    parts = sorted(os.listdir(tmp_path))
+    assert len(parts) == 3
+    lines = [json.loads(line) for part in parts for line in open(tmp_path / part)]
+    assert [report["player_id"] for report in lines] == ["0", "1", "2", "3", "4"]
+
+
+def test_jsonl_reports_durable_only_after_flush(tmp_path):
+    durable = []
+    writer = make_report_writer(str(tmp_path), "jsonl", flush_every=100, on_durable=durable.extend)
+    writer(_report("a"))
+    writer(_report("b"))
+    assert durable == []
+    writer.flush()
+    assert [record["player_id"] for record in durable] == ["a", "b"]
+    assert set(durable[0]) == {"player_id", "sweep_id", "classification_result", "feature_fingerprint"}
+    writer.close()
+
+
+def test_parquet_reports_durable_only_once_part_is_closed(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    durable = []
+    writer = make_report_writer(str(tmp_path), "parquet", flush_every=1, on_durable=durable.extend)
+    writer(_report("a"))
+    # Flushed as a row group, but the part has no footer yet and can't be read back
+    assert durable == []
+    writer.close()
+    assert [record["player_id"] for record in durable] == ["a"]
+    (part,) = os.listdir(tmp_path)
+    assert pq.read_table(tmp_path / part).column("player_id").to_pylist() == ["a"]
+
+
+def test_crash_before_flush_leaves_players_pending(tmp_path):
+    # Regression: players used to be marked completed when the report was produced, so
+    # reports still buffered in the writer at a crash were never rescored on resume
+    ledger = CompletionLedger(str(tmp_path / "ledger.sqlite"), "v1")
+    writer = make_report_writer(str(tmp_path / "reports"), "jsonl", flush_every=100,
+                                on_durable=ledger.mark_reports)
+    writer(_report("a"))
+    writer(_report("b"))
+    # Crash: the writer is never flushed or closed
+    assert ledger.pending(["a", "b"]) == ["a", "b"]
+
+    writer.flush()
+    assert ledger.pending(["a", "b", "c"]) == ["c"]
+    assert ledger.completed() == {"a": "fp-a", "b": "fp-b"}
+    ledger.close()
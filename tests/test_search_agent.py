@@ -0,0 +1,16 @@
+import faiss
+import numpy as np
+import pytest
+
+from ml.search_agent import FAISSIndex
+
+
+@pytest.mark.parametrize("storage,pq_nbits", [("float32", 8), ("float16", 8), ("int8", 8), ("pq", 4)])
+def test_index_memory_bytes_matches_the_serialized_index(storage, pq_nbits):
+    embeddings = np.random.default_rng(0).random((2000, 16), dtype="float32")
+    index = FAISSIndex(storage=storage, pq_m=4, pq_nbits=pq_nbits)
+    index.faiss_index = index.build_index(embeddings)
+
+    serialized = faiss.serialize_index(index.faiss_index).nbytes
+    # Only the small serialization header is unaccounted for
+    assert 0 <= serialized - index.index_memory_bytes() < 1024
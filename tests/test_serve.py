@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+from serve import ScoringService
+
+
+def _exchange(service, request: bytes) -> bytes:
+    async def run():
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    return asyncio.run(run())
+
+
+def test_malformed_request_line_gets_400():
+    response = _exchange(ScoringService(orchestrator=None), b"GARBAGE\r\n\r\n")
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"Connection: close" in head
+    assert "Malformed request" in json.loads(body)["error"]
+
+
+def test_invalid_content_length_gets_400():
+    response = _exchange(ScoringService(orchestrator=None),
+                         b"POST /score HTTP/1.1\r\nContent-Length: lots\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
+
+
+def test_unknown_route_keeps_answering():
+    response = _exchange(ScoringService(orchestrator=None),
+                         b"GET /nope HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 404 Not Found")
+
+
+def test_failed_verdicts_are_not_cached():
+    service = ScoringService(orchestrator=None)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        failed, scored = loop.create_future(), loop.create_future()
+        failed.set_result({"player_id": "1", "error": "Classification failed: timeout"})
+        scored.set_result({"player_id": "2", "classification": "Bot"})
+        service._cache_result("1", failed)
+        service._cache_result("2", scored)
+
+    asyncio.run(run())
+    assert service.cache.get("1") is None
+    assert service.cache.get("2") == {"player_id": "2", "classification": "Bot"}
+
+
+def test_warm_up_loads_nothing_in_graph_mode():
+    from serve import warm_up
+
+    class Untouchable:
+        def __getattr__(self, name):
+            raise AssertionError(f"graph mode touched {name}")
+
+    orchestrator = type("Orchestrator", (), {})()
+    orchestrator.similarity_mode = "graph"
+    orchestrator.faiss_index = Untouchable()
+    orchestrator.numeric_index = None
+    warm_up(orchestrator)
@@ -0,0 +1,157 @@
+import json
+import os
+import sys
+
+import pytest
+
+import main
+import sharded_sweep
+from src.data_ingestion.report_sink import make_report_writer
+from src.data_ingestion.work_queue import WorkQueue, partition
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+
+def _report(player_id, generated_at="2026-01-01T00:00:00"):
+    return {"player_id": player_id, "sweep_id": "sweep", "generated_at": generated_at,
+            "feature_fingerprint": None, "classification_result": "Classification: Human"}
+
+
+class _FlakyWorkflow:
+    """Stand-in for the compiled graph; players listed in ``broken`` raise."""
+
+    checkpointer = None
+
+    def __init__(self, broken):
+        self.broken = set(broken)
+
+    def invoke(self, state, config):
+        if state["current_player_id"] in self.broken:
+            raise RuntimeError("LLM unavailable")
+        return {"report": _report(state["current_player_id"])}
+
+
+class _Orchestrator:
+    similarity_mode = "numeric"
+
+    def __init__(self, workflow):
+        self.workflow = workflow
+        self.llm = type("LLM", (), {"close": lambda self: None})()
+
+    def create_workflow(self, checkpointer=None):
+        return self.workflow
+
+
+def _work_dir(tmp_path, player_ids, max_attempts=3):
+    work_dir = str(tmp_path / "work")
+    os.makedirs(work_dir)
+    with open(os.path.join(work_dir, sharded_sweep.SWEEP_FILE), "w") as f:
+        json.dump({"sweep_id": "sweep", "report_format": "jsonl", "lease_seconds": 60,
+                   "max_attempts": max_attempts, "index_file": None, "orchestrator": {}}, f)
+    queue = WorkQueue(os.path.join(work_dir, "queue"), max_attempts=max_attempts)
+    queue.enqueue("sweep", partition(player_ids, 1))
+    return work_dir, queue
+
+
+def test_run_sweep_collects_failed_players():
+    failed = []
+    reports = []
+    completed = main.run_sweep(_FlakyWorkflow({"b"}), ["a", "b", "c"], "sweep",
+                               report_sink=reports.append, failed=failed)
+    assert completed == 2
+    assert failed == ["b"]
+
+
+def test_shard_with_failed_players_is_requeued_then_retried(tmp_path, monkeypatch):
+    # Regression: failures were swallowed and the shard was marked done regardless
+    work_dir, queue = _work_dir(tmp_path, ["a", "b", "c"])
+    workflow = _FlakyWorkflow({"b"})
+    calls = []
+
+    def invoke(state, config):
+        calls.append(state["current_player_id"])
+        try:
+            return _FlakyWorkflow.invoke(workflow, state, config)
+        finally:
+            if state["current_player_id"] == "b":
+                workflow.broken.clear()  # only the first attempt at "b" fails
+
+    workflow.invoke = invoke
+    monkeypatch.setattr(main, "build_orchestrator", lambda **kwargs: _Orchestrator(workflow))
+
+    assert sharded_sweep.run_worker(work_dir, worker_id="w1") == 1
+    # The retry only swept the player that failed
+    assert calls == ["a", "b", "c", "b"]
+    assert queue.counts()["done"] == 1
+    with open(os.path.join(work_dir, "queue", "done", os.listdir(os.path.join(work_dir, "queue", "done"))[0])) as f:
+        shard = json.load(f)
+    assert shard["attempts"] == 1
+
+
+def test_shard_out_of_attempts_is_parked_as_failed(tmp_path, monkeypatch):
+    work_dir, queue = _work_dir(tmp_path, ["a"], max_attempts=2)
+    monkeypatch.setattr(main, "build_orchestrator", lambda **kwargs: _Orchestrator(_FlakyWorkflow({"a"})))
+    sharded_sweep.run_worker(work_dir, worker_id="w1")
+    assert queue.counts()["failed"] == 1
+
+
+def test_merge_keeps_newest_report_and_skips_unreadable_parts(tmp_path):
+    pytest.importorskip("pyarrow")
+    work_dir = tmp_path / "work"
+    shard_reports = str(work_dir / "shard_reports")
+    with make_report_writer(shard_reports, "parquet", prefix="shard-00000") as writer:
+        writer(_report("a", "2026-01-01T00:00:00"))
+        writer(_report("b"))
+    # A worker crashed mid-part: the file has row groups but no footer
+    crashed = make_report_writer(shard_reports, "parquet", prefix="shard-00000", flush_every=1)
+    crashed(_report("a", "2026-01-02T00:00:00"))
+    with open(crashed.current_path, "rb") as f:
+        assert f.read(4) == b"PAR1"
+    # ...and the retry reported the player again
+    with make_report_writer(shard_reports, "parquet", prefix="shard-00000") as writer:
+        writer(_report("a", "2026-01-03T00:00:00"))
+    with make_report_writer(shard_reports, "parquet", prefix="shard-00001") as writer:
+        writer(_report("c"))
+
+    output_dir = str(tmp_path / "merged")
+    assert sharded_sweep.merge_reports(str(work_dir), output_dir, "parquet", "sweep") == 3
+
+    import pyarrow.parquet as pq
+
+    (part,) = os.listdir(output_dir)
+    merged = {row["player_id"]: row for row in pq.read_table(os.path.join(output_dir, part)).to_pylist()}
+    assert set(merged) == {"a", "b", "c"}
+    assert merged["a"]["generated_at"] == "2026-01-03T00:00:00"
+
+
+def test_merge_skips_torn_jsonl_line(tmp_path):
+    shard_reports = tmp_path / "work" / "shard_reports"
+    shard_reports.mkdir(parents=True)
+    (shard_reports / "shard-00000-00000.jsonl").write_text(
+        json.dumps(_report("a")) + "\n" + '{"player_id": "b", "swe')
+    output_dir = str(tmp_path / "merged")
+    assert sharded_sweep.merge_reports(str(tmp_path / "work"), output_dir, "jsonl", "sweep") == 1
+
+
+def test_prepare_sweep_builds_the_numeric_index_without_an_orchestrator(tmp_path, monkeypatch):
+    pytest.importorskip("faiss")
+    from benchmarks.synthetic_data import generate
+    from src.data_ingestion import load_data
+
+    generate(str(tmp_path / "data"), actors=50)
+    monkeypatch.setattr(load_data, "DATA_DIR", str(tmp_path / "data"))
+
+    def build_orchestrator(**kwargs):
+        raise AssertionError("prepare_sweep should not build an orchestrator")
+
+    monkeypatch.setattr(main, "build_orchestrator", build_orchestrator)
+    monkeypatch.setattr(sys, "argv", ["sharded_sweep.py", "coordinate", "--work-dir", str(tmp_path / "work"),
+                                      "--shards", "4", "--similarity-mode", "numeric",
+                                      "--numeric-index", str(tmp_path / "numeric_index")])
+    args = sharded_sweep.parse_args()
+    sweep = sharded_sweep.prepare_sweep(args)
+
+    assert os.path.exists(tmp_path / "numeric_index.npz")
+    queue = WorkQueue(os.path.join(args.work_dir, "queue"))
+    assert queue.counts()["pending"] == 4
+    assert sharded_sweep.prepare_sweep(args) == sweep
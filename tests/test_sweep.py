@@ -0,0 +1,79 @@
+import sqlite3
+from typing import TypedDict
+
+import pytest
+
+from main import completion_recorder, run_sweep, thread_id
+from src.data_ingestion.ledger import CompletionLedger
+from src.data_ingestion.report_sink import make_report_writer
+
+StateGraph = pytest.importorskip("langgraph.graph").StateGraph
+SqliteSaver = pytest.importorskip("langgraph.checkpoint.sqlite").SqliteSaver
+
+
+class _State(TypedDict, total=False):
+    current_player_id: str
+    feature_fingerprint: str
+    report: dict
+
+
+def _workflow(checkpointer, calls):
+    def classify(state):
+        calls.append(state["current_player_id"])
+        return {"report": {
+            "player_id": state["current_player_id"],
+            "sweep_id": "sweep",
+            "feature_fingerprint": state.get("feature_fingerprint"),
+            "classification_result": "Classification: Human",
+        }}
+
+    graph = StateGraph(_State)
+    graph.add_node("classify", classify)
+    graph.set_entry_point("classify")
+    graph.set_finish_point("classify")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def _threads(checkpointer):
+    return {config["configurable"]["thread_id"] for config in
+            (item.config for item in checkpointer.list(None))}
+
+
+def test_completed_players_lose_their_checkpoints(tmp_path):
+    db_path = str(tmp_path / "sweep.sqlite")
+    ledger = CompletionLedger(db_path, "v1")
+    checkpointer = SqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+    workflow = _workflow(checkpointer, [])
+
+    with make_report_writer(str(tmp_path / "reports"), "jsonl", flush_every=100,
+                            on_durable=completion_recorder(ledger, "sweep", checkpointer)) as writer:
+        assert run_sweep(workflow, ["a", "b"], "sweep", report_sink=writer) == 2
+        # Still buffered: not completed, so the checkpoints are kept for a resume
+        assert _threads(checkpointer) == {thread_id("sweep", "a"), thread_id("sweep", "b")}
+    assert ledger.pending(["a", "b"]) == []
+    assert _threads(checkpointer) == set()
+
+
+def test_lost_report_is_recovered_from_checkpoint_without_rescoring(tmp_path):
+    db_path = str(tmp_path / "sweep.sqlite")
+    ledger = CompletionLedger(db_path, "v1")
+    checkpointer = SqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+    calls = []
+    workflow = _workflow(checkpointer, calls)
+    fingerprints = {"a": "fp-a"}
+
+    # First run "crashes" with the report still buffered
+    writer = make_report_writer(str(tmp_path / "lost"), "jsonl", flush_every=100,
+                                on_durable=completion_recorder(ledger, "sweep", checkpointer))
+    run_sweep(workflow, ["a"], "sweep", report_sink=writer, fingerprints=fingerprints)
+    assert ledger.pending(["a"], fingerprints) == ["a"]
+
+    reports = []
+    run_sweep(workflow, ledger.pending(["a"], fingerprints), "sweep", report_sink=reports.append,
+              fingerprints=fingerprints)
+    assert calls == ["a"]
+    assert [report["player_id"] for report in reports] == ["a"]
+
+    # Changed features are rescored rather than served from the checkpoint
+    run_sweep(workflow, ["a"], "sweep", report_sink=reports.append, fingerprints={"a": "fp-a2"})
+    assert calls == ["a", "a"]
@@ -0,0 +1,77 @@
+import os
+import time
+
+from src.data_ingestion.work_queue import WorkQueue, partition, shard_of
+
+
+def _queue(tmp_path, **kwargs):
+    queue = WorkQueue(str(tmp_path / "queue"), **kwargs)
+    queue.enqueue("sweep", [["1", "2"], [], ["3"]], {"1": "a", "2": "b", "3": "c"})
+    return queue
+
+
+def test_enqueue_skips_empty_and_known_shards(tmp_path):
+    queue = _queue(tmp_path)
+    assert queue.counts()["pending"] == 2
+    assert queue.enqueue("sweep", [["1", "2"], [], ["3"]]) == 0
+
+
+def test_each_shard_is_claimed_once(tmp_path):
+    queue = _queue(tmp_path)
+    first, second = queue.claim("w1"), queue.claim("w2")
+    assert (first["shard"], second["shard"]) == (0, 2)
+    assert first["fingerprints"] == {"1": "a", "2": "b"}
+    assert queue.claim("w3") is None
+
+    assert queue.heartbeat(first)
+    assert queue.complete(first)
+    assert not queue.heartbeat(first)
+    assert not queue.complete(first)
+    assert not queue.is_finished()
+    queue.complete(second)
+    assert queue.is_finished()
+    assert queue.counts()["done"] == 2
+
+
+def test_failed_shards_are_retried_until_out_of_attempts(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2)
+    shard = queue.claim("w1")
+    queue.fail(shard, "boom")
+    retry = queue.claim("w1")
+    assert retry["shard"] == shard["shard"]
+    assert (retry["attempts"], retry["last_error"]) == (1, "boom")
+
+    queue.fail(retry, "boom again")
+    assert queue.counts()["failed"] == 1
+    assert queue.claim("w1")["shard"] != shard["shard"]
+
+
+def test_expired_leases_are_reclaimed(tmp_path):
+    queue = _queue(tmp_path)
+    stale, fresh = queue.claim("w1"), queue.claim("w2")
+    old = time.time() - 600
+    os.utime(os.path.join(queue.root, "claimed", stale["claim"]), (old, old))
+
+    assert queue.reclaim_expired(lease_seconds=60) == 1
+    assert not queue.heartbeat(stale)
+    assert queue.heartbeat(fresh)
+    assert queue.claim("w3")["shard"] == stale["shard"]
+
+
+def test_release_worker_requeues_only_its_shards(tmp_path):
+    queue = _queue(tmp_path)
+    mine, theirs = queue.claim("w1"), queue.claim("w2")
+    queue.release_worker("w1")
+    assert not queue.heartbeat(mine)
+    assert queue.heartbeat(theirs)
+    assert queue.counts()["pending"] == 1
+
+
+def test_partition_is_stable_and_keeps_order():
+    player_ids = [str(i) for i in range(100)]
+    shards = partition(player_ids, 4)
+    assert sorted(pid for shard in shards for pid in shard) == sorted(player_ids)
+    for number, shard in enumerate(shards):
+        assert all(shard_of(pid, 4) == number for pid in shard)
+        assert shard == sorted(shard, key=int)
+    assert partition(player_ids, 4) == shards